@@ -0,0 +1,51 @@
+"""
+High-throughput JSON responses for read-only endpoints.
+
+Rows come straight from Core SELECTs and are encoded with orjson when it is installed
+(stdlib json otherwise), skipping response_model re-validation of data the database
+already typed. The output matches what the Pydantic response models produce.
+"""
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Sequence
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+FAST_JSON_ENABLED = os.getenv("FAST_JSON_ENABLED", "true").lower() == "true"
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(data: Any, indent: bool = False) -> bytes:
+    """Encode to compact (or two-space indented) JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(data, default=_default, indent=2).encode("utf-8")
+    return json.dumps(data, default=_default, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def as_datetime(value):
+    """Dates are exposed as midnight datetimes, like the `hire_date: datetime` schema field"""
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+    return value
+
+def rows_to_dicts(keys: Sequence[str], rows: Iterable[Sequence]) -> List[Dict[str, Any]]:
+    return [dict(zip(keys, row)) for row in rows]
@@ -0,0 +1,49 @@
+"""
+Conditional GET and response compression helpers.
+
+ETags are derived from the data-version counters of the tables a response reads plus
+the request path and query string, so a client revalidating an unchanged list gets a
+304 after a single counter lookup instead of the full query.
+"""
+import hashlib
+import os
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from starlette.middleware.gzip import GZipMiddleware
+
+from ..db.data_versions import format_versions
+
+# Responses smaller than this are sent uncompressed
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+
+def make_etag(request: Request, versions: Dict[str, int]) -> str:
+    """Weak ETag: the body is equivalent (not byte-identical once compressed) for the same versions"""
+    key = f"{request.url.path}?{request.url.query}|{format_versions(versions)}"
+    return f'W/"{hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison: ignore W/ prefixes
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+def conditional_headers(request: Request, versions: Dict[str, int]) -> Tuple[Dict[str, str], Optional[Response]]:
+    """ETag headers for the response, and a ready 304 when the client's copy is current"""
+    headers = {"ETag": make_etag(request, versions), "Cache-Control": "no-cache"}
+    if etag_matches(request, headers["ETag"]):
+        return headers, Response(status_code=304, headers=headers)
+    return headers, None
+
+class ContentAwareGZipMiddleware(GZipMiddleware):
+    """GZip middleware that leaves already-compressed export artifacts and byte ranges alone"""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].endswith("/download"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
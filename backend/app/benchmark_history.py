@@ -0,0 +1,257 @@
+"""
+Stored benchmark runs and run-to-run comparison.
+
+Every POST /benchmark run is saved with the git revision, models, prompt version and
+per-query timings (translation vs SQL). Each result is normalized and checksummed, and
+checked against the answer of the reference SQL for the same question, so comparing
+two runs shows latency regressions, changed answers and accuracy drops.
+
+Usage:
+    python -m app.benchmark_history list
+    python -m app.benchmark_history diff [BASE_RUN] [HEAD_RUN] [--threshold 0.2]
+"""
+import hashlib
+import json
+import os
+import subprocess
+from collections import Counter
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import select, text
+
+from .db import models
+from .db.reference_queries import REFERENCE_QUERIES
+
+# Regression detection configuration
+BENCHMARK_REGRESSION_THRESHOLD = float(os.getenv("BENCHMARK_REGRESSION_THRESHOLD", "0.2"))
+BENCHMARK_REGRESSION_MIN_SECONDS = float(os.getenv("BENCHMARK_REGRESSION_MIN_SECONDS", "0.05"))
+
+@lru_cache(maxsize=None)
+def git_revision() -> str:
+    """Short commit hash of the running code (GIT_REVISION overrides, e.g. in images without .git)"""
+    revision = os.getenv("GIT_REVISION")
+    if revision:
+        return revision
+    try:
+        completed = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                   timeout=5, cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+    return completed.stdout.strip() or "unknown"
+
+def _normalize_value(value: Any):
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float, Decimal)):
+        # Backends differ in integer/float/decimal types and AVG precision
+        return round(float(value), 2)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+def normalize_rows(rows: Sequence[Sequence[Any]]) -> List[tuple]:
+    """Rows with comparable values, in a stable order"""
+    return sorted((tuple(_normalize_value(value) for value in row) for row in rows), key=repr)
+
+def result_checksum(rows: Sequence[Sequence[Any]]) -> str:
+    return hashlib.sha256(json.dumps(normalize_rows(rows), default=str).encode("utf-8")).hexdigest()[:16]
+
+def answers_match(expected: Sequence[Sequence[Any]], actual: Sequence[Sequence[Any]]) -> bool:
+    """Whether `actual` holds the reference answer, allowing extra columns and any column order"""
+    expected, remaining = normalize_rows(expected), [Counter(row) for row in normalize_rows(actual)]
+    if len(expected) != len(remaining):
+        return False
+    for row in expected:
+        wanted = Counter(row)
+        for index, candidate in enumerate(remaining):
+            if not wanted - candidate:
+                del remaining[index]
+                break
+        else:
+            return False
+    return True
+
+def expected_answers(db) -> Dict[str, List[tuple]]:
+    """Result rows of the reference SQL for each benchmark question, against the current data"""
+    answers = {}
+    for question, sql in REFERENCE_QUERIES:
+        try:
+            answers[question] = db.execute(text(sql)).fetchall()
+        except Exception:
+            db.rollback()
+    return answers
+
+def save_run(db, benchmark, expected_checksums: Dict[str, str], dialect: str, fast_model: str,
+             strong_model: str) -> int:
+    """Store a BenchmarkResponse and its per-query results; returns the run id"""
+    run = models.BenchmarkRun(
+        created_at=datetime.utcnow(),
+        git_revision=benchmark.git_revision or git_revision(),
+        dialect=dialect,
+        fast_model=fast_model,
+        strong_model=strong_model,
+        prompt_version=benchmark.prompt_version or "",
+        total_queries=benchmark.total_queries,
+        successful_queries=benchmark.successful_queries,
+        matched_answers=benchmark.matched_answers,
+        average_execution_time=benchmark.average_execution_time,
+    )
+    run.queries = [
+        models.BenchmarkQuery(
+            position=position,
+            query=result.query,
+            success=result.success,
+            model_tier=result.model_tier,
+            escalated=result.escalated,
+            execution_time=result.execution_time,
+            translate_time=result.translate_time,
+            execute_time=result.execute_time,
+            result_checksum=result.result_checksum,
+            expected_checksum=expected_checksums.get(result.query),
+            matches_expected=result.matches_expected,
+            sql_query=result.sql_query,
+            error=result.error,
+        )
+        for position, result in enumerate(benchmark.results)
+    ]
+    db.add(run)
+    db.commit()
+    return run.id
+
+def run_summary(run) -> Dict[str, Any]:
+    return {column: getattr(run, column) for column in (
+        "id", "created_at", "git_revision", "dialect", "fast_model", "strong_model", "prompt_version",
+        "total_queries", "successful_queries", "matched_answers", "average_execution_time",
+    )}
+
+def list_runs(db, limit: int = 20) -> List[Dict[str, Any]]:
+    """Most recent runs first"""
+    runs = db.execute(select(models.BenchmarkRun).order_by(models.BenchmarkRun.id.desc()).limit(limit)).scalars()
+    return [run_summary(run) for run in runs]
+
+def resolve_runs(db, base_id: Optional[int] = None, head_id: Optional[int] = None):
+    """(base, head) runs; head defaults to the latest run and base to the run before head"""
+    run = models.BenchmarkRun
+    head = db.get(run, head_id) if head_id is not None else \
+        db.execute(select(run).order_by(run.id.desc()).limit(1)).scalar()
+    if head is None:
+        raise LookupError(f"Benchmark run {head_id} not found" if head_id is not None else "No benchmark runs stored")
+    if base_id is not None:
+        base = db.get(run, base_id)
+    else:
+        base = db.execute(select(run).where(run.id < head.id).order_by(run.id.desc()).limit(1)).scalar()
+    if base is None:
+        raise LookupError(f"Benchmark run {base_id} not found" if base_id is not None
+                          else f"No run before {head.id} to compare with")
+    return base, head
+
+def compare_runs(base, head, threshold: float = BENCHMARK_REGRESSION_THRESHOLD,
+                 min_seconds: float = BENCHMARK_REGRESSION_MIN_SECONDS) -> Dict[str, Any]:
+    """Per-query latency and answer differences between two stored runs"""
+    base_queries = {query.query: query for query in base.queries}
+    head_queries = {query.query: query for query in head.queries}
+    questions = list(head_queries) + [question for question in base_queries if question not in head_queries]
+    diffs = []
+    for question in questions:
+        before, after = base_queries.get(question), head_queries.get(question)
+        diff = {
+            "query": question,
+            "answer_changed": False,
+            "latency_regression": False,
+            "accuracy_regression": False,
+        }
+        for prefix, query in (("base", before), ("head", after)):
+            if query is not None:
+                diff.update({
+                    f"{prefix}_time": query.execution_time,
+                    f"{prefix}_translate_time": query.translate_time,
+                    f"{prefix}_execute_time": query.execute_time,
+                    f"{prefix}_success": query.success,
+                    f"{prefix}_matches_expected": query.matches_expected,
+                })
+        if before is not None and after is not None:
+            diff["answer_changed"] = before.result_checksum != after.result_checksum
+            slowdown = after.execution_time - before.execution_time
+            # Only compare latency of queries that succeeded both times; failures end early
+            diff["latency_regression"] = (before.success and after.success and slowdown > min_seconds
+                                          and slowdown > before.execution_time * threshold)
+            diff["accuracy_regression"] = (before.success and not after.success) or \
+                (before.matches_expected is True and after.matches_expected is False)
+        elif after is None:
+            diff["accuracy_regression"] = True  # dropped from the benchmark
+        diffs.append(diff)
+
+    diffs.sort(key=lambda diff: not (diff["accuracy_regression"] or diff["latency_regression"]
+                                     or diff["answer_changed"]))
+    latency = sum(diff["latency_regression"] for diff in diffs)
+    accuracy = sum(diff["accuracy_regression"] for diff in diffs)
+    return {
+        "base": run_summary(base),
+        "head": run_summary(head),
+        "threshold": threshold,
+        "min_seconds": min_seconds,
+        "latency_regressions": latency,
+        "accuracy_regressions": accuracy,
+        "changed_answers": sum(diff["answer_changed"] for diff in diffs),
+        "regressed": bool(latency or accuracy),
+        "queries": diffs,
+    }
+
+def _print_comparison(comparison: Dict[str, Any]):
+    base, head = comparison["base"], comparison["head"]
+    for label, run in (("base", base), ("head", head)):
+        print(f"{label}: run {run['id']} @ {run['git_revision']} prompt {run['prompt_version']} "
+              f"({run['fast_model']}/{run['strong_model']}, {run['dialect']}): "
+              f"{run['successful_queries']}/{run['total_queries']} ok, {run['matched_answers']} matched, "
+              f"avg {run['average_execution_time']:.3f}s")
+    for diff in comparison["queries"]:
+        flags = [name for name, key in (("SLOWER", "latency_regression"), ("WORSE", "accuracy_regression"),
+                                         ("CHANGED", "answer_changed")) if diff[key]]
+        if not flags:
+            continue
+        times = " -> ".join(f"{diff[key]:.3f}s" if diff.get(key) is not None else "-"
+                            for key in ("base_time", "head_time"))
+        print(f"  {'/'.join(flags):<22} {times:<20} {diff['query']}")
+    print(f"{comparison['latency_regressions']} latency regressions, {comparison['accuracy_regressions']} "
+          f"accuracy regressions, {comparison['changed_answers']} changed answers")
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from .db.database import SessionLocal, engine
+    from .db.partitioning import prepare_schema
+
+    parser = argparse.ArgumentParser(description="List and compare stored benchmark runs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    listing = commands.add_parser("list", help="Show recent runs")
+    listing.add_argument("--limit", type=int, default=20)
+    diff = commands.add_parser("diff", help="Compare two runs; exits 1 on a regression")
+    diff.add_argument("base", type=int, nargs="?", help="Base run id (default: the run before head)")
+    diff.add_argument("head", type=int, nargs="?", help="Head run id (default: the latest run)")
+    diff.add_argument("--threshold", type=float, default=BENCHMARK_REGRESSION_THRESHOLD,
+                      help="Relative slowdown flagged as a regression (0.2 = 20%%)")
+    diff.add_argument("--min-seconds", type=float, default=BENCHMARK_REGRESSION_MIN_SECONDS,
+                      help="Ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args()
+
+    prepare_schema(engine)
+    db = SessionLocal()
+    try:
+        if args.command == "list":
+            for run in list_runs(db, args.limit):
+                print(f"{run['id']:>5}  {run['created_at']:%Y-%m-%d %H:%M}  {run['git_revision']:<10} "
+                      f"{run['prompt_version']:<14} {run['successful_queries']:>3}/{run['total_queries']:<3} ok "
+                      f"{run['matched_answers']:>3} matched  avg {run['average_execution_time']:.3f}s")
+        else:
+            try:
+                base, head = resolve_runs(db, args.base, args.head)
+            except LookupError as e:
+                sys.exit(str(e))
+            comparison = compare_runs(base, head, args.threshold, args.min_seconds)
+            _print_comparison(comparison)
+            sys.exit(1 if comparison["regressed"] else 0)
+    finally:
+        db.close()
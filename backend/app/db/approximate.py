@@ -0,0 +1,225 @@
+"""
+Approximate answers to exploratory aggregate questions from a sample of activity rows.
+
+Eligible questions are the SUM/AVG templates recognised by the columnar cache. With the
+cache enabled, a fixed-size simple random sample (without replacement) of the in-memory
+snapshot is aggregated; otherwise the equivalent SQL reads `employee_activities` through
+TABLESAMPLE (SYSTEM page sampling on PostgreSQL, Bernoulli on DuckDB; SQLite cannot
+sample and answers exactly).
+Either way about APPROXIMATE_SAMPLE_ROWS rows are aggregated, so latency stays flat as the
+table grows.
+
+Sums are scaled up by the sampling fraction and every estimate carries a normal-approximation
+confidence interval. When a group is too thin in the sample (or missing from it) the answer
+is computed exactly instead. PostgreSQL SYSTEM sampling picks whole pages, so its intervals
+are too narrow when similar rows share pages.
+"""
+import math
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .columnar import COLUMNAR_CACHE_ENABLED, columnar_cache, _quote
+from .database import SessionLocal, DIALECT
+
+# Approximate query configuration
+APPROXIMATE_SAMPLE_ROWS = int(os.getenv("APPROXIMATE_SAMPLE_ROWS", "100000"))
+APPROXIMATE_MIN_GROUP_ROWS = int(os.getenv("APPROXIMATE_MIN_GROUP_ROWS", "30"))
+APPROXIMATE_CONFIDENCE = float(os.getenv("APPROXIMATE_CONFIDENCE", "0.95"))
+REFINEMENT_WORKERS = int(os.getenv("REFINEMENT_WORKERS", "1"))
+REFINEMENT_TTL_SECONDS = float(os.getenv("REFINEMENT_TTL_SECONDS", "600"))
+
+ROW_ESTIMATE_SQL = {
+    "postgresql": """
+        SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0) FROM pg_class c
+        WHERE c.oid = 'employee_activities'::regclass
+           OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = 'employee_activities'::regclass)
+    """,
+    "duckdb": "SELECT estimated_size FROM duckdb_tables() WHERE table_name = 'employee_activities'",
+}
+SAMPLE_CLAUSES = {
+    "postgresql": "TABLESAMPLE SYSTEM ({percent})",
+    "duckdb": "TABLESAMPLE {percent}% (bernoulli)",
+}
+GROUP_EXPRESSIONS = {"department": "e.department", "employee": "e.full_name", "week": "ea.week_number"}
+
+def _directory(db: Session) -> Tuple[List[str], List[Tuple[int, str, str]]]:
+    """Departments and employees from the columnar snapshot, or from the employees table"""
+    if COLUMNAR_CACHE_ENABLED:
+        columnar_cache.ensure_fresh(db)
+        return columnar_cache.directory()
+    employees = [tuple(row) for row in db.execute(text("SELECT id, full_name, department FROM employees"))]
+    return sorted({department or "Unknown" for _, _, department in employees}), employees
+
+def expected_groups(spec: Dict[str, Any], employees: List[Tuple[int, str, str]]) -> Optional[int]:
+    """How many groups an exact answer has, when that follows from the filters (None for weeks)"""
+    group_by = spec["group_by"]
+    if group_by is None:
+        return 1
+    if group_by == "week":
+        return None
+    if spec["employee"] is not None:
+        return 1
+    if spec["department"] is not None:
+        if group_by == "department":
+            return 1
+        employees = [employee for employee in employees if employee[2] == spec["department"]]
+    return len({employee[2] or "Unknown" for employee in employees}) if group_by == "department" else len(employees)
+
+def moments_sql(spec: Dict[str, Any], sample_clause: str = "") -> str:
+    """Per-group count, sum and sum of squares of the metric, optionally over a table sample"""
+    metric, group = f"ea.{spec['metric']}", GROUP_EXPRESSIONS.get(spec["group_by"])
+    select = [f"{group} AS label"] if group else ["NULL AS label"]
+    select += [f"COUNT({metric}) AS n", f"SUM({metric}) AS s", f"SUM({metric} * {metric}) AS ss"]
+    conditions = [f"{metric} IS NOT NULL"]
+    if spec["week"] is not None:
+        conditions.append(f"ea.week_number = {int(spec['week'])}")
+    if spec["department"] is not None:
+        conditions.append(f"e.department = {_quote(spec['department'])}")
+    if spec["employee"] is not None:
+        conditions.append(f"ea.employee_id = {int(spec['employee'][0])}")
+    sql = (f"SELECT {', '.join(select)} FROM employee_activities ea {sample_clause} "
+           f"JOIN employees e ON e.id = ea.employee_id WHERE {' AND '.join(conditions)}")
+    if group:
+        sql += f" GROUP BY {group} ORDER BY {group}"
+    return " ".join(sql.split())
+
+def _sample_percent(db: Session) -> Optional[float]:
+    """Sampling percentage that reads about APPROXIMATE_SAMPLE_ROWS rows, or None to read everything"""
+    estimate_sql = ROW_ESTIMATE_SQL.get(DIALECT)
+    if estimate_sql is None:
+        return None
+    estimated_rows = float(db.execute(text(estimate_sql)).scalar() or 0)
+    if estimated_rows <= APPROXIMATE_SAMPLE_ROWS:
+        return None
+    return round(100.0 * APPROXIMATE_SAMPLE_ROWS / estimated_rows, 6)
+
+def _moments(spec: Dict[str, Any], db: Session, sample: bool) -> Tuple[float, List[tuple], str]:
+    """(fraction, groups, SQL shown to the user) from the snapshot or the database"""
+    employee_id = spec["employee"][0] if spec["employee"] else None
+    if COLUMNAR_CACHE_ENABLED:
+        fraction, groups = columnar_cache.moments(
+            spec["metric"], spec["group_by"], spec["week"], spec["department"], employee_id,
+            sample_rows=APPROXIMATE_SAMPLE_ROWS if sample else None,
+        )
+        return fraction, groups, columnar_cache.to_sql(spec)
+    percent = _sample_percent(db) if sample else None
+    sql = moments_sql(spec, SAMPLE_CLAUSES[DIALECT].format(percent=percent) if percent else "")
+    groups = [(label, int(n), float(s or 0), float(ss or 0)) for label, n, s, ss in db.execute(text(sql))]
+    return (percent / 100.0 if percent else 1.0), groups, sql
+
+def _round(metric: str, value: float):
+    return int(round(value)) if metric == "meetings_attended" else round(value, 2)
+
+def estimate(spec: Dict[str, Any], fraction: float, groups: List[tuple], level: float = APPROXIMATE_CONFIDENCE):
+    """Rows and confidence intervals for sampled moments (Bernoulli-sampling variance)"""
+    metric, func = spec["metric"], spec["func"]
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    rows, intervals = [], []
+    for label, n, s, ss in groups:
+        if func == "sum":
+            value = s / fraction
+            error = z * math.sqrt(max((1 - fraction) * ss, 0.0)) / fraction
+        else:
+            value = s / n
+            variance = max(ss - s * s / n, 0.0) / (n - 1) if n > 1 else 0.0
+            error = z * math.sqrt(variance / n * (1 - fraction))
+        rows.append(((label,) if spec["group_by"] else ()) + (_round(metric, value),))
+        intervals.append({
+            "group": None if label is None else str(label),
+            "estimate": _round(metric, value),
+            "lower": _round(metric, value - error),
+            "upper": _round(metric, value + error),
+            "level": level,
+        })
+    return rows, intervals
+
+def _columns(spec: Dict[str, Any]) -> List[str]:
+    label_column = {"department": "department", "employee": "full_name", "week": "week_number"}.get(spec["group_by"])
+    return [label_column, spec["metric"]] if label_column else [f"{spec['func']}_{spec['metric']}"]
+
+def exact(spec: Dict[str, Any], db: Session) -> Dict[str, Any]:
+    """Exact answer to a matched template"""
+    _, groups, sql = _moments(spec, db, sample=False)
+    rows = [((label,) if spec["group_by"] else ()) +
+            (columnar_cache._finish(spec["metric"], spec["func"], s, n),) for label, n, s, _ in groups]
+    if not rows and spec["group_by"] is None:
+        rows = [(None,)]
+    return {"columns": _columns(spec), "rows": rows, "sql": sql, "approximate": False,
+            "sample_fraction": 1.0, "intervals": None}
+
+def match(question: str, db: Session):
+    """(template spec, employees) for an eligible question, or None"""
+    if not columnar_cache.may_match(question):
+        return None
+    departments, employees = _directory(db)
+    spec = columnar_cache.match(question, departments, [(employee_id, name) for employee_id, name, _ in employees])
+    return (spec, employees) if spec is not None else None
+
+def approximate(question: str, db: Session) -> Optional[Dict[str, Any]]:
+    """Sampled answer with confidence intervals; exact when sampling cannot help; None if ineligible"""
+    matched = match(question, db)
+    if matched is None:
+        return None
+    spec, employees = matched
+    fraction, groups, sql = _moments(spec, db, sample=True)
+    if fraction >= 1.0:
+        return {**exact(spec, db), "spec": spec}
+    wanted = expected_groups(spec, employees)
+    if (wanted is not None and len(groups) < wanted) or \
+            any(n < APPROXIMATE_MIN_GROUP_ROWS for _, n, _, _ in groups) or not groups:
+        # Groups too small for the sample to say anything useful about
+        return {**exact(spec, db), "spec": spec}
+    rows, intervals = estimate(spec, fraction, groups)
+    return {"columns": _columns(spec), "rows": rows, "sql": sql, "approximate": True,
+            "sample_fraction": fraction, "intervals": intervals, "spec": spec}
+
+class Refinements:
+    """Exact answers computed in the background after an approximate one (kept per worker)"""
+
+    def __init__(self, workers: int = REFINEMENT_WORKERS):
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="refine")
+
+    def submit(self, spec: Dict[str, Any]) -> str:
+        self.prune()
+        refinement_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[refinement_id] = {"id": refinement_id, "status": "running", "created_at": time.time()}
+        self.executor.submit(self._run, refinement_id, spec)
+        return refinement_id
+
+    def _run(self, refinement_id: str, spec: Dict[str, Any]):
+        db = SessionLocal()
+        try:
+            update = {"status": "done", "result": exact(spec, db)}
+        except Exception as e:
+            update = {"status": "failed", "error": str(e)}
+        finally:
+            db.close()
+        with self._lock:
+            if refinement_id in self._jobs:
+                self._jobs[refinement_id].update(update, finished_at=time.time())
+
+    def get(self, refinement_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(refinement_id)
+            return dict(job) if job is not None else None
+
+    def prune(self):
+        """Forget refinements older than REFINEMENT_TTL_SECONDS"""
+        cutoff = time.time() - REFINEMENT_TTL_SECONDS
+        with self._lock:
+            for refinement_id in [key for key, job in self._jobs.items() if job["created_at"] < cutoff]:
+                del self._jobs[refinement_id]
+
+# Process-wide refinement jobs for this worker
+refinements = Refinements()
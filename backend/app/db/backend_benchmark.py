@@ -0,0 +1,95 @@
+"""
+Compare startup time and analytic query latency across database backends.
+
+Usage:
+    python -m app.db.backend_benchmark sqlite:///./bench.db duckdb:///./bench.duckdb
+"""
+import argparse
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from .database import make_engine
+from .reference_queries import REFERENCE_QUERIES
+from . import models
+from .seed_data import seed_database
+
+SUMMARY_SQL = """
+    SELECT e.department, COUNT(DISTINCT e.id) AS employee_count, AVG(ea.hours_worked) AS avg_hours,
+           SUM(ea.total_sales) AS total_sales, AVG(ea.meetings_attended) AS avg_meetings
+    FROM employees e
+    LEFT JOIN employee_activities ea ON e.id = ea.employee_id
+    GROUP BY e.department
+"""
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+def benchmark_backend(url: str, repeat: int = 20, warmup: int = 3, seed: bool = True):
+    """Measure startup and per-query latency for one database URL"""
+    started = time.perf_counter()
+    engine = make_engine(url)
+    models.Base.metadata.create_all(bind=engine)
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    startup_seconds = time.perf_counter() - started
+
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Session()
+    try:
+        if seed and db.query(models.Employee).count() == 0:
+            seed_database(db)
+
+        queries = [(f"Q{i}", sql) for i, (_, sql) in enumerate(REFERENCE_QUERIES, 1)]
+        queries.append(("summary", SUMMARY_SQL))
+
+        results = []
+        for name, sql in queries:
+            for _ in range(warmup):
+                db.execute(text(sql)).fetchall()
+            samples = []
+            for _ in range(repeat):
+                query_started = time.perf_counter()
+                db.execute(text(sql)).fetchall()
+                samples.append((time.perf_counter() - query_started) * 1000)
+            results.append({
+                "query": name,
+                "median_ms": statistics.median(samples),
+                "p95_ms": percentile(samples, 0.95),
+            })
+    finally:
+        db.close()
+        engine.dispose()
+
+    return {"url": url, "dialect": engine.dialect.name, "startup_seconds": startup_seconds, "queries": results}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare analytic query latency between database backends")
+    parser.add_argument("urls", nargs="+", help="SQLAlchemy database URLs to compare")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed repetitions per query")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed warmup runs per query")
+    parser.add_argument("--no-seed", action="store_true", help="Do not seed empty databases")
+    args = parser.parse_args()
+
+    reports = [benchmark_backend(url, args.repeat, args.warmup, not args.no_seed) for url in args.urls]
+
+    print("\nStartup (engine + create_all + first connection)")
+    for report in reports:
+        print(f"  {report['dialect']:<12} {report['startup_seconds'] * 1000:8.1f} ms")
+
+    header = f"\n{'query':<10}" + "".join(f"{report['dialect'] + ' p50/p95 ms':>28}" for report in reports)
+    print(header)
+    for index, row in enumerate(reports[0]["queries"]):
+        line = f"{row['query']:<10}"
+        for report in reports:
+            query = report["queries"][index]
+            line += f"{query['median_ms']:>18.3f} / {query['p95_ms']:<7.3f}"
+        print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Change feed for employees and employee_activities.
+
+Every ORM write appends (seq, table, row id, operation) rows to `change_log` in the
+same transaction, so consumers can page through `GET /changes?since=<seq>` and fetch
+only what changed. Bulk query updates/deletes do not know their row ids and are logged
+as a bulk_update/bulk_delete marker; consumers should resync that table when they see one.
+
+Sequence numbers are assigned when the entries are inserted, but transactions may commit
+out of order, so a consumer could move its cursor past a sequence number that a slower
+transaction is about to commit. Two measures keep that window small:
+
+- session writes collect their entries and insert them just before commit, so a sequence
+  number is outstanding only for the commit itself, not for the whole transaction;
+- entries are stamped with the database clock, and reads stop at entries younger than
+  CHANGE_FEED_SETTLE_SECONDS by the same clock, so worker clock skew does not matter.
+
+The settle window is a heuristic, not a guarantee: an entry whose commit takes longer
+than CHANGE_FEED_SETTLE_SECONDS after its insert can still be skipped by a consumer.
+Raise the setting on a database with slow commits.
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from sqlalchemy import DateTime, event, insert, delete, func, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+from .database import Base, SessionLocal
+
+# Change feed configuration
+CHANGE_FEED_SETTLE_SECONDS = float(os.getenv("CHANGE_FEED_SETTLE_SECONDS", "1"))
+CHANGE_LOG_RETENTION_DAYS = float(os.getenv("CHANGE_LOG_RETENTION_DAYS", "30"))
+
+FEED_TABLES = ("employees", "employee_activities")
+PENDING_KEY = "change_log_entries"  # Session.info key: entries to insert when the transaction commits
+
+class utc_now(FunctionElement):
+    """Current UTC time by the database clock, as a naive timestamp like `changed_at`"""
+    type = DateTime()
+    inherit_cache = True
+
+@compiles(utc_now)
+def _utc_now(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+@compiles(utc_now, "sqlite")
+def _utc_now_sqlite(element, compiler, **kw):
+    # CURRENT_TIMESTAMP has whole seconds only
+    return "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+@compiles(utc_now, "postgresql")
+def _utc_now_postgresql(element, compiler, **kw):
+    # now() is the transaction start; clock_timestamp() is when the entry is written
+    return "(clock_timestamp() AT TIME ZONE 'UTC')"
+
+@compiles(utc_now, "duckdb")
+def _utc_now_duckdb(element, compiler, **kw):
+    return "CAST(get_current_timestamp() AT TIME ZONE 'UTC' AS TIMESTAMP)"
+
+def _change_log():
+    return Base.metadata.tables["change_log"]
+
+def record_changes(connection, table: str, row_ids: Iterable, operation: str):
+    """Append change entries for `row_ids` of `table`; call as late in the transaction as possible"""
+    rows = [{"table_name": table, "row_id": row_id, "operation": operation} for row_id in row_ids]
+    if rows:
+        connection.execute(insert(_change_log()).values(changed_at=utc_now()), rows)
+
+def database_now(db) -> datetime:
+    return db.execute(select(utc_now())).scalar()
+
+def settled_before(db) -> datetime:
+    """Entries written after this instant (database clock) may still have uncommitted predecessors"""
+    return database_now(db) - timedelta(seconds=CHANGE_FEED_SETTLE_SECONDS)
+
+def oldest_seq(db):
+    return db.execute(select(func.min(_change_log().c.seq))).scalar()
+
+def latest_seq(db) -> int:
+    """Highest sequence number written so far; lower ones may still be uncommitted"""
+    return db.execute(select(func.max(_change_log().c.seq))).scalar() or 0
+
+def settled_seq(db) -> int:
+    """Highest sequence number older than the settle window: a safe cursor to start reading after"""
+    log = _change_log()
+    return db.execute(select(func.max(log.c.seq)).where(log.c.changed_at <= settled_before(db))).scalar() or 0
+
+def prune_change_log(db, retention_days: float = CHANGE_LOG_RETENTION_DAYS) -> int:
+    """Delete entries older than the retention window; cursors before them expire"""
+    cutoff = database_now(db) - timedelta(days=retention_days)
+    result = db.execute(delete(_change_log()).where(_change_log().c.changed_at < cutoff))
+    db.commit()
+    return result.rowcount
+
+def _pending(session, table: str, row_ids, operation: str):
+    session.info.setdefault(PENDING_KEY, []).append((table, row_ids, operation))
+
+@event.listens_for(SessionLocal, "after_flush")
+def _track_flushed_rows(session, flush_context):
+    for objects, operation in ((session.new, "insert"), (session.dirty, "update"), (session.deleted, "delete")):
+        changed = {}
+        for obj in objects:
+            table = getattr(obj, "__tablename__", None)
+            if table not in FEED_TABLES or (operation == "update" and not session.is_modified(obj)):
+                continue
+            changed.setdefault(table, []).append(obj.id)
+        for table, row_ids in changed.items():
+            _pending(session, table, sorted(row_ids), operation)
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _track_bulk_writes(orm_execute_state):
+    # Bulk inserts log their ids themselves once RETURNING has them (see group_commit.py)
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    table = mapper.local_table.name if mapper is not None else None
+    if table in FEED_TABLES:
+        operation = "bulk_update" if orm_execute_state.is_update else "bulk_delete"
+        _pending(orm_execute_state.session, table, [None], operation)
+
+@event.listens_for(SessionLocal, "before_commit")
+def _log_written_rows(session):
+    # Objects still pending in the unit of work are flushed (and tracked) here, not after the hook
+    session.flush()
+    entries = session.info.pop(PENDING_KEY, None)
+    if entries:
+        connection = session.connection()
+        for table, row_ids, operation in entries:
+            record_changes(connection, table, row_ids, operation)
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _forget_rolled_back_rows(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(PENDING_KEY, None)
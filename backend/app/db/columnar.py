@@ -0,0 +1,513 @@
+import os
+import re
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Columnar cache configuration
+COLUMNAR_CACHE_ENABLED = os.getenv("COLUMNAR_CACHE_ENABLED", "true").lower() == "true"
+COLUMNAR_SYNC_SECONDS = float(os.getenv("COLUMNAR_SYNC_SECONDS", "30"))
+
+METRICS = ("hours_worked", "total_sales", "meetings_attended")
+
+ACTIVITY_ROWS_SQL = """
+    SELECT ea.id, ea.employee_id, e.full_name, e.department, ea.week_number,
+           ea.hours_worked, ea.total_sales, ea.meetings_attended
+    FROM employee_activities ea
+    JOIN employees e ON e.id = ea.employee_id
+    WHERE ea.id > :after_id
+    ORDER BY ea.id
+"""
+
+# Keyword patterns used to recognise simple aggregate questions
+METRIC_PATTERNS = {
+    "hours_worked": re.compile(r"\bhours?\b"),
+    "total_sales": re.compile(r"\b(?:sales|revenue)\b"),
+    "meetings_attended": re.compile(r"\bmeetings?\b"),
+}
+SUM_PATTERN = re.compile(r"\b(?:total|sum|how much|how many meetings)\b")
+AVG_PATTERN = re.compile(r"\b(?:average|avg|mean)\b")
+GROUP_PATTERNS = {
+    "department": re.compile(r"\b(?:by|per|for each|each|every)\s+department\b"),
+    "employee": re.compile(r"\b(?:by|per|for each|each|every)\s+employee\b"),
+    "week": re.compile(r"\b(?:by|per|for each|each|every)\s+week\b"),
+}
+WEEK_PATTERN = re.compile(r"\bweek\s+(\d+)\b")
+# Words a template question may contain once its department, employee and week are bound;
+# anything else (another department, a job title, a name, a number) is a filter the
+# templates cannot apply, so the question goes to the LLM instead
+TEMPLATE_WORDS = frozenset("""
+    what what's whats is are was were the a an of for in on at by to from during across over so far
+    all our whole entire company company's organization overall total sum how much many average avg mean
+    hours hour worked work working sales revenue generated made earned brought meetings meeting attended
+    attend did do does has have had been employees employee staff everyone everybody people person
+    per each every department departments dept team teams week weeks weekly grouped group broken down
+    show me tell give calculate compute find get list there value amount number
+""".split())
+WORD_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+# Anything that needs ranking, comparison, thresholds or dates goes to the LLM
+UNSUPPORTED_PATTERN = re.compile(
+    r"\b(?:compare|versus|vs|top|most|highest|lowest|least|best|worst|more than|less than|"
+    r"fewer than|greater|above|below|between|last|first|hired|starting|month|year|"
+    r"january|february|march|april|may|june|july|august|september|october|november|december)\b"
+    r"|\d{4}-\d{2}-\d{2}"
+)
+
+
+def _quote(value: str) -> str:
+    """Quote a string literal for the equivalent SQL shown to users"""
+    return "'" + value.replace("'", "''") + "'"
+
+
+class ColumnarActivityCache:
+    """In-memory columnar snapshot of employee_activities joined with employees"""
+
+    def __init__(self, initial_capacity: int = 1024):
+        self._lock = threading.RLock()
+        self._initial_capacity = initial_capacity
+        self.loaded = False
+        self.stale = False
+        self.last_load_seconds = 0.0
+        self.last_sync_seconds = 0.0
+        self.last_sync_at = 0.0
+        self.full_loads = 0
+        self.syncs = 0
+        self.incremental_rows = 0
+        self.hits = 0
+        self.misses = 0
+        self._reset()
+
+    def _reset(self):
+        """Drop all rows and categories"""
+        capacity = self._initial_capacity
+        self.size = 0
+        self.max_id = 0
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._employee_codes = np.zeros(capacity, dtype=np.int32)
+        self._department_codes = np.zeros(capacity, dtype=np.int32)
+        self._weeks = np.zeros(capacity, dtype=np.int32)
+        self._metrics = {metric: np.zeros(capacity, dtype=np.float64) for metric in METRICS}
+
+        # Categorical dictionaries (code -> value and value -> code)
+        self.employee_ids: List[int] = []
+        self.employee_names: List[str] = []
+        self.departments: List[str] = []
+        self._employee_code_by_id: Dict[int, int] = {}
+        self._department_code_by_name: Dict[str, int] = {}
+        self._employee_department: Dict[int, int] = {}
+
+    def _grow(self, required: int):
+        """Double array capacity until it can hold `required` rows"""
+        capacity = len(self._ids)
+        if required <= capacity:
+            return
+        while capacity < required:
+            capacity *= 2
+
+        def grown(array):
+            new_array = np.zeros(capacity, dtype=array.dtype)
+            new_array[:self.size] = array[:self.size]
+            return new_array
+
+        self._ids = grown(self._ids)
+        self._employee_codes = grown(self._employee_codes)
+        self._department_codes = grown(self._department_codes)
+        self._weeks = grown(self._weeks)
+        self._metrics = {metric: grown(values) for metric, values in self._metrics.items()}
+
+    def _department_code(self, department: Optional[str]) -> int:
+        department = department or "Unknown"
+        code = self._department_code_by_name.get(department)
+        if code is None:
+            code = len(self.departments)
+            self.departments.append(department)
+            self._department_code_by_name[department] = code
+        return code
+
+    def _register_employee(self, employee_id: int, full_name: str, department: Optional[str]) -> int:
+        code = self._employee_code_by_id.get(employee_id)
+        if code is None:
+            code = len(self.employee_ids)
+            self.employee_ids.append(employee_id)
+            self.employee_names.append(full_name)
+            self._employee_code_by_id[employee_id] = code
+        self._employee_department[code] = self._department_code(department)
+        return code
+
+    def _append_rows(self, rows) -> int:
+        """Append (id, employee_id, full_name, department, week, hours, sales, meetings) rows"""
+        rows = list(rows)
+        if not rows:
+            return 0
+        self._grow(self.size + len(rows))
+        start = self.size
+        for offset, row in enumerate(rows):
+            (activity_id, employee_id, full_name, department, week_number,
+             hours_worked, total_sales, meetings_attended) = row
+            employee_code = self._register_employee(employee_id, full_name, department)
+            index = start + offset
+            self._ids[index] = activity_id
+            self._employee_codes[index] = employee_code
+            self._department_codes[index] = self._employee_department[employee_code]
+            self._weeks[index] = week_number if week_number is not None else 0
+            for metric, value in zip(METRICS, (hours_worked, total_sales, meetings_attended)):
+                self._metrics[metric][index] = np.nan if value is None else float(value)
+            self.max_id = max(self.max_id, activity_id)
+        self.size = start + len(rows)
+        return len(rows)
+
+    def load(self, db: Session):
+        """Build the snapshot from scratch"""
+        started = time.perf_counter()
+        rows = db.execute(text(ACTIVITY_ROWS_SQL), {"after_id": 0}).fetchall()
+        with self._lock:
+            self._reset()
+            self._append_rows(rows)
+            self.loaded = True
+            self.stale = False
+            self.full_loads += 1
+            self.last_load_seconds = time.perf_counter() - started
+            self.last_sync_at = time.time()
+
+    def sync(self, db: Session):
+        """Pull rows written by other workers since the last load, reloading if rows were deleted"""
+        started = time.perf_counter()
+        new_rows = db.execute(text(ACTIVITY_ROWS_SQL), {"after_id": self.max_id}).fetchall()
+        total_rows = db.execute(text("SELECT COUNT(*) FROM employee_activities")).scalar() or 0
+        with self._lock:
+            self.incremental_rows += self._append_rows(new_rows)
+            consistent = self.size == total_rows
+        if not consistent:
+            self.load(db)
+            return
+        with self._lock:
+            self.stale = False
+            self.syncs += 1
+            self.last_sync_seconds = time.perf_counter() - started
+            self.last_sync_at = time.time()
+
+    def ensure_fresh(self, db: Session):
+        """Load on first use and sync periodically or after an unapplied write"""
+        if not self.loaded:
+            self.load(db)
+        elif self.stale or time.time() - self.last_sync_at > COLUMNAR_SYNC_SECONDS:
+            self.sync(db)
+
+    def record_employee(self, employee):
+        """Apply a committed employee insert to the categorical dictionaries"""
+        if not self.loaded:
+            return
+        with self._lock:
+            self._register_employee(employee.id, employee.full_name, employee.department)
+
+    def record_activity(self, activity):
+        """Apply a committed activity insert without a database round trip"""
+        if not self.loaded:
+            return
+        with self._lock:
+            code = self._employee_code_by_id.get(activity.employee_id)
+            if code is None or activity.id <= self.max_id:
+                # Unknown employee or out-of-order id: catch up on next read
+                self.stale = True
+                return
+            self._append_rows([(
+                activity.id,
+                activity.employee_id,
+                self.employee_names[code],
+                self.departments[self._employee_department[code]],
+                activity.week_number,
+                activity.hours_worked,
+                activity.total_sales,
+                activity.meetings_attended,
+            )])
+            self.incremental_rows += 1
+
+    def _filtered(self, metric: str, index, week, department, employee_id):
+        """Metric values at `index` (a slice or row positions) and the mask of rows passing the filters"""
+        values = self._metrics[metric][index]
+        mask = np.ones(len(values), dtype=bool)
+        if week is not None:
+            mask &= self._weeks[index] == week
+        if department is not None:
+            code = self._department_code_by_name.get(department)
+            mask &= self._department_codes[index] == (code if code is not None else -1)
+        if employee_id is not None:
+            code = self._employee_code_by_id.get(employee_id)
+            mask &= self._employee_codes[index] == (code if code is not None else -1)
+        return values, mask
+
+    def _groups(self, group_by: str, index):
+        """(codes at `index`, label per code, label column) for a grouping"""
+        if group_by == "department":
+            return self._department_codes[index], self.departments, "department"
+        if group_by == "employee":
+            return self._employee_codes[index], self.employee_names, "full_name"
+        codes = self._weeks[index]
+        return codes, list(range(int(codes.max()) + 1 if len(codes) else 0)), "week_number"
+
+    def aggregate(
+        self,
+        metric: str,
+        func: str,
+        group_by: Optional[str] = None,
+        week: Optional[int] = None,
+        department: Optional[str] = None,
+        employee_id: Optional[int] = None,
+    ) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+        """Vectorized SUM/AVG of a metric, optionally filtered and grouped"""
+        with self._lock:
+            n = self.size
+            values, mask = self._filtered(metric, slice(0, n), week, department, employee_id)
+            valid = mask & ~np.isnan(values)
+
+            if group_by is None:
+                count = int(valid.sum())
+                value = self._finish(metric, func, float(values[valid].sum()), count)
+                return [f"{func}_{metric}"], [(value,)]
+
+            codes, labels, label_column = self._groups(group_by, slice(0, n))
+            minlength = len(labels)
+            present = np.bincount(codes[mask], minlength=minlength)
+            counts = np.bincount(codes[valid], minlength=minlength)
+            sums = np.bincount(codes[valid], weights=values[valid], minlength=minlength)
+            rows = [
+                (labels[code], self._finish(metric, func, float(sums[code]), int(counts[code])))
+                for code in np.nonzero(present)[0]
+            ]
+        rows.sort(key=lambda row: row[0])
+        return [label_column, metric], rows
+
+    def moments(
+        self,
+        metric: str,
+        group_by: Optional[str] = None,
+        week: Optional[int] = None,
+        department: Optional[str] = None,
+        employee_id: Optional[int] = None,
+        sample_rows: Optional[int] = None,
+        rng: Optional[np.random.Generator] = None,
+    ) -> Tuple[float, List[Tuple[Any, int, float, float]]]:
+        """(sampling fraction, per-group count/sum/sum of squares) over all rows or a uniform sample"""
+        with self._lock:
+            n = self.size
+            if sample_rows is None or sample_rows >= n:
+                index, fraction = slice(0, n), 1.0
+            else:
+                # Simple random sample of distinct positions, as the finite-population
+                # corrections in approximate.estimate assume
+                index = (rng or np.random.default_rng()).choice(n, sample_rows, replace=False)
+                fraction = sample_rows / n
+            values, mask = self._filtered(metric, index, week, department, employee_id)
+            valid = mask & ~np.isnan(values)
+            values = values[valid]
+
+            if group_by is None:
+                return fraction, [(None, len(values), float(values.sum()), float(np.dot(values, values)))]
+
+            codes, labels, _ = self._groups(group_by, index)
+            codes = codes[valid]
+            minlength = len(labels)
+            counts = np.bincount(codes, minlength=minlength)
+            sums = np.bincount(codes, weights=values, minlength=minlength)
+            squares = np.bincount(codes, weights=values * values, minlength=minlength)
+            groups = [(labels[code], int(counts[code]), float(sums[code]), float(squares[code]))
+                      for code in np.nonzero(counts)[0]]
+        return fraction, sorted(groups, key=lambda group: group[0])
+
+    def directory(self) -> Tuple[List[str], List[Tuple[int, str, str]]]:
+        """(departments, (employee id, name, department) per employee) of the snapshot"""
+        with self._lock:
+            return list(self.departments), [
+                (employee_id, name, self.departments[self._employee_department[code]])
+                for code, (employee_id, name) in enumerate(zip(self.employee_ids, self.employee_names))
+            ]
+
+    @staticmethod
+    def _finish(metric: str, func: str, total: float, count: int):
+        """Apply SQL NULL semantics and tidy floating point output"""
+        if count == 0:
+            return None
+        if func == "avg":
+            return round(total / count, 2)
+        if metric == "meetings_attended":
+            return int(total)
+        return round(total, 2)
+
+    def match(self, question: str, departments: Optional[List[str]] = None,
+              employees: Optional[List[Tuple[int, str]]] = None) -> Optional[Dict[str, Any]]:
+        """Match a question against the simple aggregate templates (names default to the snapshot's)
+
+        Returns None unless every filter the question names is bound: a department, job title,
+        employee or time range the templates cannot express must not be silently dropped.
+        """
+        lowered = question.lower()
+        if UNSUPPORTED_PATTERN.search(lowered):
+            return None
+
+        if departments is None or employees is None:
+            with self._lock:
+                departments = list(self.departments)
+                employees = list(zip(self.employee_ids, self.employee_names))
+
+        # Bound filters are cut out of `remaining`, which keeps the original case
+        remaining = question
+
+        # Department filter ("the Sales department")
+        department = None
+        for name in departments:
+            if name.lower() not in lowered:
+                continue
+            pattern = re.compile(r"'?\b" + re.escape(name) + r"\b'?\s+(?:department|dept|team)\b", re.IGNORECASE)
+            if pattern.search(remaining):
+                if department is not None:
+                    return None
+                department = name
+                remaining = pattern.sub(" ", remaining)
+
+        # Employee filter by exact full name
+        employee = None
+        for employee_id, full_name in employees:
+            # Substring check first: compiling a pattern per employee dominates with many employees
+            if full_name.lower() not in lowered:
+                continue
+            pattern = re.compile(r"\b" + re.escape(full_name) + r"(?:'s)?\b", re.IGNORECASE)
+            if pattern.search(remaining):
+                if employee is not None:
+                    return None
+                employee = (employee_id, full_name)
+                remaining = pattern.sub(" ", remaining)
+
+        weeks = set(WEEK_PATTERN.findall(remaining.lower()))
+        if len(weeks) > 1:
+            return None
+        remaining = re.sub(WEEK_PATTERN.pattern, " ", remaining, flags=re.IGNORECASE)
+        if not self._only_template_words(remaining, departments):
+            return None
+
+        lowered = remaining.lower()
+        metrics = [metric for metric, pattern in METRIC_PATTERNS.items() if pattern.search(lowered)]
+        is_sum = bool(SUM_PATTERN.search(lowered))
+        is_avg = bool(AVG_PATTERN.search(lowered))
+        if len(metrics) != 1 or is_sum == is_avg:
+            return None
+        func = "avg" if is_avg else "sum"
+
+        groups = [group for group, pattern in GROUP_PATTERNS.items() if pattern.search(lowered)]
+        if func == "avg" and "week" in groups and re.search(r"\bper week\b", lowered):
+            # "Average hours per week" is already a per-row average
+            groups.remove("week")
+        if len(groups) > 1:
+            return None
+
+        return {
+            "metric": metrics[0],
+            "func": func,
+            "group_by": groups[0] if groups else None,
+            "week": int(weeks.pop()) if weeks else None,
+            "department": department,
+            "employee": employee,
+        }
+
+    @staticmethod
+    def _only_template_words(remaining: str, departments: List[str]) -> bool:
+        """True when nothing but template vocabulary is left after binding the filters"""
+        if any(word not in TEMPLATE_WORDS for word in WORD_PATTERN.findall(remaining.lower())):
+            return False
+        # Departments named like a metric ("Sales employees") count when capitalized mid-sentence
+        body = remaining.strip()
+        return not any(match.start() > 0 for name in departments
+                       for match in re.finditer(r"\b" + re.escape(name) + r"\b", body))
+
+    @staticmethod
+    def to_sql(spec: Dict[str, Any]) -> str:
+        """Equivalent SQL for a matched template, reported back to the user"""
+        metric, func = spec["metric"], spec["func"].upper()
+        select, group = [], None
+        if spec["group_by"] == "department":
+            select, group = ["e.department"], "e.department"
+        elif spec["group_by"] == "employee":
+            select, group = ["e.full_name"], "e.full_name"
+        elif spec["group_by"] == "week":
+            select, group = ["ea.week_number"], "ea.week_number"
+        alias = metric if group else f"{spec['func']}_{metric}"
+        select.append(f"{func}(ea.{metric}) AS {alias}")
+
+        conditions = []
+        if spec["week"] is not None:
+            conditions.append(f"ea.week_number = {spec['week']}")
+        if spec["department"] is not None:
+            conditions.append(f"e.department = {_quote(spec['department'])}")
+        if spec["employee"] is not None:
+            conditions.append(f"e.full_name = {_quote(spec['employee'][1])}")
+
+        sql = f"SELECT {', '.join(select)} FROM employee_activities ea JOIN employees e ON e.id = ea.employee_id"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if group:
+            sql += f" GROUP BY {group} ORDER BY {group}"
+        return sql
+
+    @staticmethod
+    def may_match(question: str) -> bool:
+        """Cheap pre-check so unrelated questions never trigger a load"""
+        lowered = question.lower()
+        if not (SUM_PATTERN.search(lowered) or AVG_PATTERN.search(lowered)):
+            return False
+        return any(pattern.search(lowered) for pattern in METRIC_PATTERNS.values())
+
+    def answer(self, question: str, db: Session) -> Optional[Tuple[List[str], List[Tuple[Any, ...]], str]]:
+        """Answer a template-matched aggregate question from the snapshot, or return None"""
+        if not COLUMNAR_CACHE_ENABLED or not self.may_match(question):
+            return None
+
+        self.ensure_fresh(db)
+        spec = self.match(question)
+        if spec is None:
+            self.misses += 1
+            return None
+
+        columns, rows = self.aggregate(
+            spec["metric"],
+            spec["func"],
+            group_by=spec["group_by"],
+            week=spec["week"],
+            department=spec["department"],
+            employee_id=spec["employee"][0] if spec["employee"] else None,
+        )
+        self.hits += 1
+        return columns, rows, self.to_sql(spec)
+
+    def stats(self) -> Dict[str, Any]:
+        """Memory footprint and refresh cost of the snapshot"""
+        with self._lock:
+            arrays = [self._ids, self._employee_codes, self._department_codes, self._weeks]
+            arrays += list(self._metrics.values())
+            array_bytes = sum(array.nbytes for array in arrays)
+            category_bytes = sum(sys.getsizeof(name) for name in self.employee_names + self.departments)
+            return {
+                "enabled": COLUMNAR_CACHE_ENABLED,
+                "loaded": self.loaded,
+                "rows": self.size,
+                "capacity": len(self._ids),
+                "employees": len(self.employee_ids),
+                "departments": len(self.departments),
+                "array_bytes": array_bytes,
+                "category_bytes": category_bytes,
+                "memory_bytes": array_bytes + category_bytes,
+                "full_loads": self.full_loads,
+                "last_load_seconds": self.last_load_seconds,
+                "syncs": self.syncs,
+                "last_sync_seconds": self.last_sync_seconds,
+                "incremental_rows": self.incremental_rows,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Process-wide snapshot shared by all requests in this worker
+columnar_cache = ColumnarActivityCache()
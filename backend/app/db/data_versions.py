@@ -0,0 +1,93 @@
+"""
+Per-table data-version counters, bumped by every ORM write in its own transaction.
+
+Versions are stored in the `data_versions` table so all workers see the same value.
+They back HTTP ETags and artifact reuse: a response or export built at version N is
+still valid while the counters of the tables it reads are unchanged.
+
+The bump runs just before the write commits, in the same transaction, so the data and
+its version become visible together and a failed bump rolls the write back. The cost is
+that the table's counter row stays locked for the last moment of each write, which
+serializes the commits of concurrent writers to that table on PostgreSQL. Readers take
+the versions before the data, so a request racing a write can only label newer data
+with an older version, which costs a later cache miss but never serves stale data as current.
+"""
+import itertools
+from typing import Dict, Iterable
+
+from sqlalchemy import event, text
+
+from .database import SessionLocal
+
+PENDING_KEY = "data_version_tables"  # Session.info key: tables written in the open transaction
+
+TRACKED_TABLES = ("employees", "employee_activities", "calendar_weeks")
+
+def bump_versions(connection, tables: Iterable[str]):
+    """Increment the counters of `tables`, creating missing rows"""
+    for table in sorted(set(tables)):
+        result = connection.execute(
+            text("UPDATE data_versions SET version = version + 1 WHERE table_name = :table"),
+            {"table": table},
+        )
+        if result.rowcount == 0:
+            connection.execute(
+                text("INSERT INTO data_versions (table_name, version) VALUES (:table, 1)"),
+                {"table": table},
+            )
+
+def ensure_versions(connection):
+    """Create a counter row for every tracked table (no-op for existing ones)"""
+    existing = {row[0] for row in connection.execute(text("SELECT table_name FROM data_versions"))}
+    for table in TRACKED_TABLES:
+        if table not in existing:
+            connection.execute(
+                text("INSERT INTO data_versions (table_name, version) VALUES (:table, 0)"),
+                {"table": table},
+            )
+
+def read_versions(db, tables: Iterable[str]) -> Dict[str, int]:
+    """Current counters for `tables`; a missing row reads as 0"""
+    tables = sorted(set(tables))
+    rows = db.execute(text("SELECT table_name, version FROM data_versions")).fetchall()
+    versions = {name: version for name, version in rows}
+    return {table: versions.get(table, 0) for table in tables}
+
+def format_versions(versions: Dict[str, int]) -> str:
+    return ",".join(f"{table}:{version}" for table, version in sorted(versions.items()))
+
+def _pending(session, tables: Iterable[str]):
+    session.info.setdefault(PENDING_KEY, set()).update(tables)
+
+@event.listens_for(SessionLocal, "after_flush")
+def _track_flushed_tables(session, flush_context):
+    tables = {
+        obj.__tablename__
+        for obj in itertools.chain(session.new, session.dirty, session.deleted)
+        if getattr(obj, "__tablename__", None) in TRACKED_TABLES
+    }
+    if tables:
+        _pending(session, tables)
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _track_bulk_writes(orm_execute_state):
+    # query(...).delete() / .update() and bulk inserts bypass the flush
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    mapper = orm_execute_state.bind_mapper
+    table = mapper.local_table.name if mapper is not None else None
+    if table in TRACKED_TABLES:
+        _pending(orm_execute_state.session, [table])
+
+@event.listens_for(SessionLocal, "before_commit")
+def _bump_written_tables(session):
+    # Objects still pending in the unit of work are flushed (and tracked) here, not after the hook
+    session.flush()
+    tables = session.info.pop(PENDING_KEY, None)
+    if tables:
+        bump_versions(session.connection(), tables)
+
+@event.listens_for(SessionLocal, "after_soft_rollback")
+def _forget_rolled_back_tables(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,166 @@
+"""
+Group commit for single-record activity inserts.
+
+Concurrent `POST /activities/` calls hand their row to a flusher thread, which waits
+up to GROUP_COMMIT_MAX_DELAY_MS for more rows (or until GROUP_COMMIT_MAX_ROWS), writes
+them with one multi-row INSERT ... RETURNING and commits once. Each caller blocks until
+that commit has finished and then gets its own generated id.
+
+Durability is unchanged: a request is only acknowledged after the transaction holding
+its row has committed. A failed batch is retried row by row, so a bad row (e.g. an
+unknown employee_id) fails only its own request.
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import insert
+
+from .database import SessionLocal, engine
+from . import models
+from .change_log import record_changes
+
+# Group commit configuration
+GROUP_COMMIT_ENABLED = os.getenv("GROUP_COMMIT_ENABLED", "false").lower() == "true"
+GROUP_COMMIT_MAX_DELAY_MS = float(os.getenv("GROUP_COMMIT_MAX_DELAY_MS", "5"))
+GROUP_COMMIT_MAX_ROWS = int(os.getenv("GROUP_COMMIT_MAX_ROWS", "200"))
+
+class ActivityGroupCommitter:
+    """Buffers activity inserts and commits them in batches on a background thread"""
+
+    def __init__(self, max_delay_ms: float = GROUP_COMMIT_MAX_DELAY_MS, max_rows: int = GROUP_COMMIT_MAX_ROWS,
+                 session_factory=SessionLocal):
+        self.max_delay = max_delay_ms / 1000.0
+        self.max_rows = max_rows
+        self.session_factory = session_factory
+        self._pending: List[Tuple[Dict[str, Any], Future]] = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self.stats = {"rows": 0, "batches": 0, "failed_rows": 0, "largest_batch": 0}
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="activity-group-commit", daemon=True)
+            self._thread.start()
+
+    def submit(self, values: Dict[str, Any]) -> models.EmployeeActivity:
+        """Insert one activity; returns the committed row (with id) once its batch commits"""
+        future: Future = Future()
+        with self._cond:
+            self._ensure_thread()
+            self._pending.append((values, future))
+            self._cond.notify_all()
+        return future.result()
+
+    def _take_batch(self) -> List[Tuple[Dict[str, Any], Future]]:
+        """Wait for a first row, then for more until the delay or size limit"""
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            deadline = time.monotonic() + self.max_delay
+            while len(self._pending) < self.max_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch, self._pending = self._pending[:self.max_rows], self._pending[self.max_rows:]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            try:
+                self._commit(batch)
+            except Exception:
+                # Isolate the offending rows
+                for item in batch:
+                    try:
+                        self._commit([item])
+                    except Exception as e:
+                        self.stats["failed_rows"] += 1
+                        item[1].set_exception(e)
+
+    def _commit(self, batch: List[Tuple[Dict[str, Any], Future]]):
+        rows = [values for values, _ in batch]
+        db = self.session_factory()
+        try:
+            statement = insert(models.EmployeeActivity).returning(
+                models.EmployeeActivity.id, models.EmployeeActivity.week_start, sort_by_parameter_order=True
+            )
+            inserted = db.execute(statement, rows).all()
+            record_changes(db.connection(), "employee_activities", [row.id for row in inserted], "insert")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        self.stats["rows"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+        for (values, future), row in zip(batch, inserted):
+            future.set_result(models.EmployeeActivity(id=row.id, week_start=row.week_start, **values))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            queued = len(self._pending)
+        batches = self.stats["batches"]
+        return {
+            "enabled": GROUP_COMMIT_ENABLED,
+            "queued": queued,
+            "average_batch": self.stats["rows"] / batches if batches else 0.0,
+            **self.stats,
+        }
+
+# Process-wide committer used by POST /activities/ when GROUP_COMMIT_ENABLED is set
+activity_committer = ActivityGroupCommitter()
+
+def _insert_benchmark(threads: int, rows_per_thread: int, grouped: bool) -> float:
+    """Rows/second for `threads` writers each inserting `rows_per_thread` single rows"""
+    committer = ActivityGroupCommitter()
+
+    def writer():
+        for _ in range(rows_per_thread):
+            values = {"employee_id": 1, "week_number": 1, "meetings_attended": 1, "total_sales": None,
+                      "hours_worked": 40.0, "activities": "group commit benchmark"}
+            if grouped:
+                committer.submit(values)
+            else:
+                db = SessionLocal()
+                try:
+                    activity = models.EmployeeActivity(**values)
+                    db.add(activity)
+                    db.commit()
+                    db.refresh(activity)
+                finally:
+                    db.close()
+
+    workers = [threading.Thread(target=writer) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return threads * rows_per_thread / (time.perf_counter() - started)
+
+if __name__ == "__main__":
+    import argparse
+    from sqlalchemy import delete
+    from .partitioning import prepare_schema
+
+    parser = argparse.ArgumentParser(description="Compare per-row commits with group commit")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--rows", type=int, default=50, help="Rows per thread")
+    args = parser.parse_args()
+
+    prepare_schema(engine)
+    for grouped in (False, True):
+        rate = _insert_benchmark(args.threads, args.rows, grouped)
+        print(f"{'group commit' if grouped else 'per-row commit':<15} {rate:>8.0f} rows/s")
+    db = SessionLocal()
+    db.execute(delete(models.EmployeeActivity).where(models.EmployeeActivity.activities == "group commit benchmark"))
+    db.commit()
+    db.close()
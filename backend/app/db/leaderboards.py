@@ -0,0 +1,413 @@
+"""
+Incrementally maintained top-K leaderboards over employee activities.
+
+For each metric the worker keeps the K highest single activity rows (overall, per week and
+per department) and the K employees with the highest totals, over all weeks and over rolling
+windows of the latest weeks (LEADERBOARD_WINDOWS), overall and per department. Every activity
+write updates them: rows go into bounded min-heaps, and since totals only grow an employee
+enters a top-K only by passing its weakest member. Ranking questions ("most meetings in week
+2", "top 3 employees by hours over the last 4 weeks") are answered in O(K) instead of
+sorting the activity table.
+
+Like the columnar cache the leaderboards are per worker: writes from other workers are picked
+up by a periodic sync, and a new latest week (which shifts every rolling window), deleted rows
+or negative values trigger a reload.
+"""
+import heapq
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .columnar import ACTIVITY_ROWS_SQL, METRICS, METRIC_PATTERNS, TEMPLATE_WORDS, WEEK_PATTERN, WORD_PATTERN, _quote
+
+# Leaderboard configuration
+LEADERBOARDS_ENABLED = os.getenv("LEADERBOARDS_ENABLED", "true").lower() == "true"
+LEADERBOARD_K = int(os.getenv("LEADERBOARD_K", "10"))
+LEADERBOARD_WINDOWS = tuple(int(weeks) for weeks in os.getenv("LEADERBOARD_WINDOWS", "4,12").split(",") if weeks)
+LEADERBOARD_SYNC_SECONDS = float(os.getenv("LEADERBOARD_SYNC_SECONDS", "30"))
+
+RANKED_ROWS_SQL = """
+    SELECT id, employee_id, week_number, value FROM (
+        SELECT ea.id, ea.employee_id, ea.week_number, ea.{metric} AS value,
+               ROW_NUMBER() OVER (ORDER BY ea.{metric} DESC, ea.id) AS overall_rank,
+               ROW_NUMBER() OVER (PARTITION BY ea.week_number ORDER BY ea.{metric} DESC, ea.id) AS week_rank,
+               ROW_NUMBER() OVER (PARTITION BY e.department ORDER BY ea.{metric} DESC, ea.id) AS department_rank
+        FROM employee_activities ea
+        JOIN employees e ON e.id = ea.employee_id
+        WHERE ea.{metric} IS NOT NULL AND ea.id <= :max_id
+    ) ranked
+    WHERE overall_rank <= :k OR week_rank <= :k OR department_rank <= :k
+"""
+TOTALS_SQL = """
+    SELECT employee_id, SUM(hours_worked), SUM(total_sales), SUM(meetings_attended)
+    FROM employee_activities
+    WHERE id <= :max_id {window}
+    GROUP BY employee_id
+"""
+
+# Keyword patterns used to recognise ranking questions
+RANK_PATTERN = re.compile(r"\b(?:most|highest|largest|biggest|greatest|top|best)\b")
+SUBJECT_PATTERN = re.compile(r"\b(?:who|whom|employees?|people|persons?|staff|workers?)\b")
+TOP_PATTERN = re.compile(r"\btop\s+(\d+|one|two|three|four|five|six|seven|eight|nine|ten)\b")
+NUMBER_WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8,
+                "nine": 9, "ten": 10}
+DEFAULT_TOP = 5
+LAST_WEEKS_PATTERN = re.compile(r"\b(?:last|past|latest|recent|previous)\s+(\d+)\s+weeks\b")
+SINGLE_WEEK_PATTERN = re.compile(r"\b(?:single|one|a|any)\s+week\b")
+TOTAL_PATTERN = re.compile(r"\b(?:total|overall|combined|cumulative|altogether|all time)\b")
+# Lowest-first rankings, averages, groupings, comparisons and dates go elsewhere
+UNSUPPORTED_PATTERN = re.compile(
+    r"\b(?:least|lowest|fewest|bottom|worst|smallest|average|avg|mean|compare|versus|vs|between|"
+    r"more than|less than|fewer than|above|below|hired|per|each|every|month|year|first week|"
+    r"january|february|march|april|may|june|july|august|september|october|november|december)\b"
+    r"|\d{4}-\d{2}-\d{2}"
+)
+# Words a ranking question may contain once its department, week, window and K are bound;
+# anything else ("in Finance", "Data Analysts") is a filter the leaderboards cannot apply
+RANKING_WORDS = TEMPLATE_WORDS | frozenset("""
+    who whom which when where and most highest largest biggest greatest top best achieved recorded
+    logged single one any workers worker persons
+""".split())
+
+class Leaderboards:
+    """Top-K activity rows and employee totals per metric, kept current on every write"""
+
+    def __init__(self, k: int = LEADERBOARD_K, windows: Tuple[int, ...] = LEADERBOARD_WINDOWS):
+        self._lock = threading.RLock()
+        self.k = k
+        self.windows = windows
+        self.loaded = False
+        self.stale = False
+        self.full_loads = 0
+        self.syncs = 0
+        self.last_load_seconds = 0.0
+        self.last_sync_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self._reset()
+
+    def _reset(self):
+        self.max_id = 0
+        self.row_count = 0
+        self.latest_week = 0
+        self._employees: Dict[int, Tuple[str, str]] = {}
+        self._weeks: Dict[int, Tuple[Any, Any]] = {}
+        # (metric, "all" | "week" | "department", scope value) -> min-heap of (value, -id, employee_id, week)
+        self._rows: Dict[tuple, List[tuple]] = {}
+        # (metric, window) -> employee_id -> total; window None is all weeks
+        self._totals: Dict[tuple, Dict[int, float]] = {}
+        # (metric, window, department or None) -> employee_id -> total for the current top K
+        self._top_totals: Dict[tuple, Dict[int, float]] = {}
+
+    def _offer_row(self, key: tuple, entry: tuple):
+        heap = self._rows.setdefault(key, [])
+        if len(heap) < self.k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    def _offer_total(self, key: tuple, employee_id: int, total: float):
+        """Totals only grow, so a newcomer can only displace the weakest member"""
+        top = self._top_totals.setdefault(key, {})
+        if employee_id in top or len(top) < self.k:
+            top[employee_id] = total
+            return
+        weakest = min(top, key=lambda member: (top[member], -member))
+        if (total, -employee_id) > (top[weakest], -weakest):
+            del top[weakest]
+            top[employee_id] = total
+
+    @staticmethod
+    def _value(metric: str, value: float):
+        return int(round(value)) if metric == "meetings_attended" else round(value, 2)
+
+    def _in_window(self, week: Optional[int], window: Optional[int]) -> bool:
+        return window is None or (week is not None and week > self.latest_week - window)
+
+    def load(self, db: Session):
+        """Build every leaderboard from the database"""
+        started = time.perf_counter()
+        max_id = db.execute(text("SELECT COALESCE(MAX(id), 0) FROM employee_activities")).scalar()
+        row_count = db.execute(text("SELECT COUNT(*) FROM employee_activities WHERE id <= :max_id"),
+                               {"max_id": max_id}).scalar()
+        latest_week = db.execute(text("SELECT COALESCE(MAX(week_number), 0) FROM employee_activities "
+                                      "WHERE id <= :max_id"), {"max_id": max_id}).scalar()
+        employees = db.execute(text("SELECT id, full_name, department FROM employees")).fetchall()
+        weeks = db.execute(text("SELECT week_number, start_date, end_date FROM calendar_weeks")).fetchall()
+        ranked = {metric: db.execute(text(RANKED_ROWS_SQL.format(metric=metric)),
+                                     {"max_id": max_id, "k": self.k}).fetchall() for metric in METRICS}
+        totals = {}
+        for window in (None,) + self.windows:
+            clause = "" if window is None else "AND week_number > :since"
+            totals[window] = db.execute(text(TOTALS_SQL.format(window=clause)),
+                                        {"max_id": max_id, "since": latest_week - (window or 0)}).fetchall()
+
+        with self._lock:
+            self._reset()
+            self.max_id, self.row_count, self.latest_week = max_id, row_count, latest_week
+            self._employees = {row[0]: (row[1], row[2] or "Unknown") for row in employees}
+            self._weeks = {row[0]: (row[1], row[2]) for row in weeks}
+            for metric, rows in ranked.items():
+                for activity_id, employee_id, week, value in rows:
+                    self._offer_ranked(metric, (float(value), -activity_id, employee_id, week))
+            for window, rows in totals.items():
+                for employee_id, *sums in rows:
+                    department = self._employees.get(employee_id, ("", "Unknown"))[1]
+                    for metric, total in zip(METRICS, sums):
+                        if total is None:
+                            continue
+                        self._totals.setdefault((metric, window), {})[employee_id] = float(total)
+                        self._offer_total((metric, window, None), employee_id, float(total))
+                        self._offer_total((metric, window, department), employee_id, float(total))
+            self.loaded = True
+            self.stale = False
+            self.full_loads += 1
+            self.last_load_seconds = time.perf_counter() - started
+            self.last_sync_at = time.time()
+
+    def _offer_ranked(self, metric: str, entry: tuple):
+        week, department = entry[3], self._employees.get(entry[2], ("", "Unknown"))[1]
+        self._offer_row((metric, "all", None), entry)
+        self._offer_row((metric, "department", department), entry)
+        if week is not None:
+            self._offer_row((metric, "week", week), entry)
+
+    def _apply(self, activity_id: int, employee_id: int, week: Optional[int], values) -> bool:
+        """Apply one committed activity; False when the leaderboards need a reload instead"""
+        if employee_id not in self._employees or activity_id <= self.max_id:
+            return False
+        if week is not None and week > self.latest_week and self.windows:
+            return False  # every rolling window shifts
+        if any(value is not None and value < 0 for value in values):
+            return False  # totals would shrink
+        department = self._employees[employee_id][1]
+        for metric, value in zip(METRICS, values):
+            if value is None:
+                continue
+            value = float(value)
+            self._offer_ranked(metric, (value, -activity_id, employee_id, week))
+            for window in (None,) + self.windows:
+                if not self._in_window(week, window):
+                    continue
+                totals = self._totals.setdefault((metric, window), {})
+                totals[employee_id] = totals.get(employee_id, 0.0) + value
+                self._offer_total((metric, window, None), employee_id, totals[employee_id])
+                self._offer_total((metric, window, department), employee_id, totals[employee_id])
+        self.max_id = activity_id
+        self.row_count += 1
+        if week is not None:
+            self.latest_week = max(self.latest_week, week)
+        return True
+
+    def sync(self, db: Session):
+        """Apply rows written by other workers, reloading when that is not possible"""
+        new_rows = db.execute(text(ACTIVITY_ROWS_SQL), {"after_id": self.max_id}).fetchall()
+        total_rows = db.execute(text("SELECT COUNT(*) FROM employee_activities")).scalar() or 0
+        with self._lock:
+            for activity_id, employee_id, full_name, department, week, *values in new_rows:
+                self._employees.setdefault(employee_id, (full_name, department or "Unknown"))
+                if not self._apply(activity_id, employee_id, week, values):
+                    self.stale = True
+                    break
+            consistent = not self.stale and self.row_count == total_rows
+        if not consistent:
+            self.load(db)
+            return
+        with self._lock:
+            self.syncs += 1
+            self.last_sync_at = time.time()
+
+    def ensure_fresh(self, db: Session):
+        """Load on first use and sync periodically or after an unapplied write"""
+        if not self.loaded or self.stale:
+            self.load(db)
+        elif time.time() - self.last_sync_at > LEADERBOARD_SYNC_SECONDS:
+            self.sync(db)
+
+    def record_employee(self, employee):
+        if not self.loaded:
+            return
+        with self._lock:
+            self._employees[employee.id] = (employee.full_name, employee.department or "Unknown")
+
+    def record_activity(self, activity):
+        """Apply a committed activity insert without a database round trip"""
+        if not self.loaded:
+            return
+        values = (activity.hours_worked, activity.total_sales, activity.meetings_attended)
+        with self._lock:
+            if not self._apply(activity.id, activity.employee_id, activity.week_number, values):
+                self.stale = True
+
+    def top_activities(self, metric: str, k: int, week: Optional[int] = None,
+                       department: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """Highest single activity rows, overall or within one week or department; None if not kept"""
+        if k > self.k or (week is not None and department is not None):
+            return None
+        key = (metric, "week", week) if week is not None else \
+            (metric, "department", department) if department is not None else (metric, "all", None)
+        with self._lock:
+            entries = heapq.nlargest(k, self._rows.get(key, []))
+            return [
+                {"rank": rank, "activity_id": -negative_id, "employee_id": employee_id,
+                 "full_name": self._employees[employee_id][0], "department": self._employees[employee_id][1],
+                 "week_number": entry_week, "value": self._value(metric, value)}
+                for rank, (value, negative_id, employee_id, entry_week) in enumerate(entries, 1)
+            ]
+
+    def top_employees(self, metric: str, k: int, window: Optional[int] = None,
+                      department: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """Employees with the highest totals over all weeks or the latest `window` weeks; None if not kept"""
+        if k > self.k or (window is not None and window not in self.windows):
+            return None
+        with self._lock:
+            top = self._top_totals.get((metric, window, department), {})
+            ranked = sorted(top.items(), key=lambda item: (-item[1], item[0]))[:k]
+            return [
+                {"rank": rank, "employee_id": employee_id, "full_name": self._employees[employee_id][0],
+                 "department": self._employees[employee_id][1], "value": self._value(metric, total)}
+                for rank, (employee_id, total) in enumerate(ranked, 1)
+            ]
+
+    def match(self, question: str) -> Optional[Dict[str, Any]]:
+        """Match a question against the ranking templates"""
+        lowered = question.lower()
+        if UNSUPPORTED_PATTERN.search(lowered) or not SUBJECT_PATTERN.search(lowered):
+            return None
+        metrics = [metric for metric, pattern in METRIC_PATTERNS.items() if pattern.search(lowered)]
+        if len(metrics) != 1:
+            return None
+
+        with self._lock:
+            departments = sorted({department for _, department in self._employees.values()})
+            names = [name.lower() for name, _ in self._employees.values()]
+        if any(name in lowered for name in names):
+            return None  # questions about a named employee are not rankings of everyone
+        # Bound filters are cut out of `remaining`, which keeps the original case
+        remaining = question
+        department = None
+        for name in departments:
+            if name.lower() not in lowered:
+                continue
+            pattern = re.compile(r"'?\b" + re.escape(name) + r"\b'?\s+(?:department|dept|team)\b", re.IGNORECASE)
+            if pattern.search(remaining):
+                if department is not None:
+                    return None
+                department = name
+                remaining = pattern.sub(" ", remaining)
+
+        top = TOP_PATTERN.search(lowered)
+        if top:
+            k = int(top.group(1)) if top.group(1).isdigit() else NUMBER_WORDS[top.group(1)]
+        else:
+            k = DEFAULT_TOP if re.search(r"\btop\b", lowered) else 1
+
+        weeks = set(WEEK_PATTERN.findall(lowered))
+        last = LAST_WEEKS_PATTERN.search(lowered)
+        if len(weeks) > 1 or (weeks and last):
+            return None
+        for pattern in (TOP_PATTERN, LAST_WEEKS_PATTERN, SINGLE_WEEK_PATTERN, WEEK_PATTERN):
+            remaining = re.sub(pattern.pattern, " ", remaining, flags=re.IGNORECASE)
+        if not self._only_ranking_words(remaining, departments):
+            return None
+        if last:
+            spec = {"by": "employee", "window": int(last.group(1)), "week": None}
+        elif SINGLE_WEEK_PATTERN.search(lowered):
+            spec = {"by": "activity", "window": None, "week": None}
+        elif weeks:
+            if TOTAL_PATTERN.search(lowered):
+                return None  # per-week employee totals are not kept
+            spec = {"by": "activity", "window": None, "week": int(weeks.pop())}
+        else:
+            spec = {"by": "employee", "window": None, "week": None}
+        if spec["week"] is not None and department is not None:
+            return None
+        return {**spec, "metric": metrics[0], "k": k, "department": department}
+
+    @staticmethod
+    def _only_ranking_words(remaining: str, departments: List[str]) -> bool:
+        """True when nothing but ranking vocabulary is left after binding the filters"""
+        if any(word not in RANKING_WORDS for word in WORD_PATTERN.findall(remaining.lower())):
+            return False
+        # Departments named like a metric ("Sales employees") count when capitalized mid-sentence
+        body = remaining.strip()
+        return not any(match.start() > 0 for name in departments
+                       for match in re.finditer(r"\b" + re.escape(name) + r"\b", body))
+
+    @staticmethod
+    def to_sql(spec: Dict[str, Any]) -> str:
+        """Equivalent SQL for a matched template, reported back to the user"""
+        metric = spec["metric"]
+        conditions = [f"ea.{metric} IS NOT NULL"]
+        if spec["week"] is not None:
+            conditions.append(f"ea.week_number = {spec['week']}")
+        if spec["window"] is not None:
+            conditions.append(f"ea.week_number > (SELECT MAX(week_number) FROM employee_activities) - {spec['window']}")
+        if spec["department"] is not None:
+            conditions.append(f"e.department = {_quote(spec['department'])}")
+        where = " AND ".join(conditions)
+        if spec["by"] == "activity":
+            return (f"SELECT e.full_name, ea.{metric}, ea.week_number, cw.start_date, cw.end_date "
+                    f"FROM employee_activities ea JOIN employees e ON e.id = ea.employee_id "
+                    f"LEFT JOIN calendar_weeks cw ON cw.week_number = ea.week_number "
+                    f"WHERE {where} ORDER BY ea.{metric} DESC, ea.id LIMIT {spec['k']}")
+        return (f"SELECT e.full_name, SUM(ea.{metric}) AS {metric} "
+                f"FROM employee_activities ea JOIN employees e ON e.id = ea.employee_id "
+                f"WHERE {where} GROUP BY e.id, e.full_name ORDER BY SUM(ea.{metric}) DESC, e.id LIMIT {spec['k']}")
+
+    def answer(self, question: str, db: Session) -> Optional[Tuple[List[str], List[Tuple[Any, ...]], str]]:
+        """Answer a template-matched ranking question from the leaderboards, or return None"""
+        if not LEADERBOARDS_ENABLED:
+            return None
+        lowered = question.lower()
+        # Cheap pre-check so unrelated questions never trigger a load
+        if not RANK_PATTERN.search(lowered) or not any(pattern.search(lowered) for pattern in METRIC_PATTERNS.values()):
+            return None
+
+        self.ensure_fresh(db)
+        spec = self.match(question)
+        entries = None
+        if spec is not None and spec["by"] == "activity":
+            entries = self.top_activities(spec["metric"], spec["k"], spec["week"], spec["department"])
+        elif spec is not None:
+            entries = self.top_employees(spec["metric"], spec["k"], spec["window"], spec["department"])
+        with self._lock:
+            if entries is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        metric = spec["metric"]
+        if spec["by"] == "activity":
+            rows = [(entry["full_name"], entry["value"], entry["week_number"],
+                     *self._weeks.get(entry["week_number"], (None, None))) for entry in entries]
+            return ["full_name", metric, "week_number", "start_date", "end_date"], rows, self.to_sql(spec)
+        rows = [(entry["full_name"], entry["value"]) for entry in entries]
+        # Named like the column so format_query_results keeps it
+        return ["full_name", metric], rows, self.to_sql(spec)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": LEADERBOARDS_ENABLED,
+                "loaded": self.loaded,
+                "k": self.k,
+                "windows": list(self.windows),
+                "latest_week": self.latest_week,
+                "activities": self.row_count,
+                "employees": len(self._employees),
+                "row_leaderboards": len(self._rows),
+                "total_leaderboards": len(self._top_totals),
+                "full_loads": self.full_loads,
+                "last_load_seconds": self.last_load_seconds,
+                "syncs": self.syncs,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+# Process-wide leaderboards shared by all requests in this worker
+leaderboards = Leaderboards()
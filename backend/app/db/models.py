@@ -1,11 +1,15 @@
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, Boolean, Date, DateTime, ForeignKey, Text, Sequence, Index, DDL, event
 from sqlalchemy.orm import relationship
 from .database import Base
+from . import data_versions, change_log  # noqa: F401  (register the write hooks)
+from .partitioning import default_week_start
 
 class Employee(Base):
     __tablename__ = "employees"
 
-    id = Column(Integer, primary_key=True, index=True)
+    # Explicit sequence (same name Postgres SERIAL uses) so DuckDB can generate ids; it is also
+    # the column's server default, see _sequence_defaults below
+    id = Column(Integer, Sequence("employees_id_seq"), primary_key=True, index=True)
     email = Column(String, unique=True, index=True)
     full_name = Column(String, nullable=False)
     job_title = Column(String)
@@ -18,9 +22,15 @@ class Employee(Base):
 class EmployeeActivity(Base):
     __tablename__ = "employee_activities"
 
-    id = Column(Integer, primary_key=True, index=True)
+    # Mapped as the key on its own. The partitioned Postgres table's primary key is
+    # (id, week_start), since a partitioned table's unique constraints must include the
+    # partition key; id still identifies a row because every insert draws it from the
+    # shared sequence, and week_start is fixed by week_number.
+    id = Column(Integer, Sequence("employee_activities_id_seq"), primary_key=True, index=True)
     employee_id = Column(Integer, ForeignKey("employees.id"))
-    week_number = Column(Integer)  # 1-10 as per requirements
+    week_number = Column(Integer)  # Consecutive weeks; week 1 starts on CALENDAR_START_DATE
+    # First day of the week, derived from week_number; the partition key on PostgreSQL (see partitioning.py)
+    week_start = Column(Date, default=default_week_start, index=True)
     meetings_attended = Column(Integer)
     total_sales = Column(Float)  # In RMB as per requirements
     hours_worked = Column(Float)
@@ -30,11 +40,102 @@ class EmployeeActivity(Base):
     employee = relationship("Employee", back_populates="activities")
     # NOTE: Enforce 'Sales' department total_sales logic in application code, not as a DB constraint.
 
+    # Serves an employee's activities for a window of weeks without scanning the table
+    __table_args__ = (Index("ix_employee_activities_employee_week", "employee_id", "week_number"),)
+
 class CalendarWeek(Base):
     __tablename__ = "calendar_weeks"
 
-    week_number = Column(Integer, primary_key=True)
+    week_number = Column(Integer, primary_key=True, autoincrement=False)  # Natural key, not generated
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
 
- 
\ No newline at end of file
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+
+    # Bumped in the transaction of every write to the table; see data_versions.py
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class ChangeLogEntry(Base):
+    __tablename__ = "change_log"
+
+    # Monotonic change sequence; written by the hooks in change_log.py
+    seq = Column(Integer, Sequence("change_log_seq_seq"), primary_key=True)
+    table_name = Column(String, nullable=False)
+    row_id = Column(Integer)  # NULL for bulk updates/deletes that touched unknown rows
+    operation = Column(String, nullable=False)  # insert, update, delete, bulk_update, bulk_delete
+    changed_at = Column(DateTime, nullable=False)
+
+class LLMUsage(Base):
+    __tablename__ = "llm_usage"
+
+    # One row per translation request; written in batches by llm/usage_ledger.py
+    id = Column(Integer, Sequence("llm_usage_id_seq"), primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+    usage_date = Column(Date, nullable=False, index=True)  # UTC day the daily budget is charged to
+    endpoint = Column(String, nullable=False)
+    tier = Column(String, nullable=False)  # fast, strong or cache
+    model = Column(String)  # NULL for cache hits
+    cache_hit = Column(Boolean, nullable=False, default=False)
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    total_tokens = Column(Integer, nullable=False, default=0)
+    cost_usd = Column(Float, nullable=False, default=0.0)
+    latency_ms = Column(Float, nullable=False, default=0.0)
+    error = Column(String)
+
+class BenchmarkRun(Base):
+    __tablename__ = "benchmark_runs"
+
+    # One row per POST /benchmark; compared run to run by benchmark_history.py
+    id = Column(Integer, Sequence("benchmark_runs_id_seq"), primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+    git_revision = Column(String, nullable=False)
+    dialect = Column(String, nullable=False)
+    fast_model = Column(String, nullable=False)
+    strong_model = Column(String, nullable=False)
+    prompt_version = Column(String, nullable=False)
+    total_queries = Column(Integer, nullable=False)
+    successful_queries = Column(Integer, nullable=False)
+    matched_answers = Column(Integer, nullable=False)
+    average_execution_time = Column(Float, nullable=False)
+
+    queries = relationship("BenchmarkQuery", back_populates="run", order_by="BenchmarkQuery.position")
+
+class BenchmarkQuery(Base):
+    __tablename__ = "benchmark_queries"
+
+    id = Column(Integer, Sequence("benchmark_queries_id_seq"), primary_key=True)
+    run_id = Column(Integer, ForeignKey("benchmark_runs.id"), nullable=False, index=True)
+    position = Column(Integer, nullable=False)
+    query = Column(Text, nullable=False)
+    success = Column(Boolean, nullable=False)
+    model_tier = Column(String)
+    escalated = Column(Boolean, nullable=False, default=False)
+    execution_time = Column(Float, nullable=False)  # seconds, translation plus execution
+    translate_time = Column(Float, nullable=False, default=0.0)
+    execute_time = Column(Float, nullable=False, default=0.0)
+    result_checksum = Column(String)  # NULL when the query failed
+    expected_checksum = Column(String)
+    matches_expected = Column(Boolean)  # NULL when there is no reference answer
+    sql_query = Column(Text)
+    error = Column(Text)
+
+    run = relationship("BenchmarkRun", back_populates="queries")
+
+def _sequence_defaults():
+    """Make each explicit id sequence the column's server default on PostgreSQL and DuckDB.
+
+    SQLAlchemy only calls a Column's Sequence for its own inserts; raw INSERTs, COPY and other
+    clients would get no id. SQLite ignores the sequences and assigns rowids.
+    """
+    for table in Base.metadata.tables.values():
+        for column in table.primary_key.columns:
+            if isinstance(column.default, Sequence):
+                event.listen(table, "after_create", DDL(
+                    f"ALTER TABLE {table.name} ALTER COLUMN {column.name} "
+                    f"SET DEFAULT nextval('{column.default.name}')"
+                ).execute_if(dialect=("postgresql", "duckdb")))
+
+_sequence_defaults()
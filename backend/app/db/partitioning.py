@@ -0,0 +1,295 @@
+"""
+Week calendar and time-range partitioning of employee_activities.
+
+Every activity carries `week_start`, the first day of its week: week 1 starts on
+CALENDAR_START_DATE and weeks are consecutive, so the value follows from week_number
+and is filled in by a column default on every insert path. `calendar_weeks` is
+extended as data and time move past the weeks it already has.
+
+On PostgreSQL employee_activities is range-partitioned on week_start by quarter or
+year. Date-filtered queries and exports then scan only the partitions they need, and
+old history is retired with DETACH PARTITION (a catalog change) rather than a DELETE
+over millions of rows. SQLite and DuckDB keep a single table indexed on week_start.
+
+Usage:
+    python -m app.db.partitioning status
+    python -m app.db.partitioning migrate                  # convert an existing Postgres table
+    python -m app.db.partitioning detach --before 2023-01-01 [--drop]
+"""
+import os
+import re
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import inspect, insert, text
+
+from .database import Base
+from .change_log import record_changes
+from .data_versions import bump_versions
+
+# Calendar and partitioning configuration
+CALENDAR_START_DATE = date.fromisoformat(os.getenv("CALENDAR_START_DATE", "2024-08-26"))
+CALENDAR_WEEKS_AHEAD = int(os.getenv("CALENDAR_WEEKS_AHEAD", "12"))
+ACTIVITY_PARTITIONING_ENABLED = os.getenv("ACTIVITY_PARTITIONING_ENABLED", "true").lower() == "true"
+ACTIVITY_PARTITION_INTERVAL = os.getenv("ACTIVITY_PARTITION_INTERVAL", "quarter").lower()  # quarter or year
+ACTIVITY_PARTITIONS_AHEAD = int(os.getenv("ACTIVITY_PARTITIONS_AHEAD", "2"))
+
+ACTIVITY_TABLE = "employee_activities"
+DEFAULT_PARTITION = f"{ACTIVITY_TABLE}_default"
+
+# The primary key must include the partition key, so it is (id, week_start); the ORM
+# maps id alone, which stays unique as it always comes from the sequence (see models.py)
+PARTITIONED_TABLE_DDL = f"""
+    CREATE TABLE {ACTIVITY_TABLE} (
+        id INTEGER NOT NULL DEFAULT nextval('employee_activities_id_seq'),
+        employee_id INTEGER REFERENCES employees (id),
+        week_number INTEGER,
+        week_start DATE NOT NULL,
+        meetings_attended INTEGER,
+        total_sales FLOAT,
+        hours_worked FLOAT,
+        activities VARCHAR,
+        PRIMARY KEY (id, week_start)
+    ) PARTITION BY RANGE (week_start)
+"""
+
+EMPLOYEE_WEEK_INDEX = (
+    f"CREATE INDEX IF NOT EXISTS ix_employee_activities_employee_week ON {ACTIVITY_TABLE} (employee_id, week_number)"
+)
+
+PARTITIONED_INDEXES = (
+    f"CREATE INDEX IF NOT EXISTS ix_employee_activities_id ON {ACTIVITY_TABLE} (id)",
+    f"CREATE INDEX IF NOT EXISTS ix_employee_activities_week_start ON {ACTIVITY_TABLE} (week_start)",
+    f"CREATE INDEX IF NOT EXISTS ix_employee_activities_employee_id ON {ACTIVITY_TABLE} (employee_id)",
+    EMPLOYEE_WEEK_INDEX,
+)
+
+BOUND_PATTERN = re.compile(r"FROM \('(\d{4}-\d{2}-\d{2})'\) TO \('(\d{4}-\d{2}-\d{2})'\)")
+
+def week_start_for(week_number: int) -> date:
+    return CALENDAR_START_DATE + timedelta(weeks=week_number - 1)
+
+def week_number_for(day: date) -> int:
+    return (day - CALENDAR_START_DATE).days // 7 + 1
+
+def default_week_start(context) -> Optional[date]:
+    """Column default: derive week_start from the inserted week_number"""
+    week_number = context.get_current_parameters().get("week_number")
+    return week_start_for(week_number) if week_number is not None else None
+
+def ensure_calendar_weeks(connection, through: Optional[date] = None) -> int:
+    """Append consecutive calendar weeks up to `through` and the latest activity week"""
+    through = through or date.today() + timedelta(weeks=CALENDAR_WEEKS_AHEAD)
+    have = connection.execute(text("SELECT MAX(week_number) FROM calendar_weeks")).scalar() or 0
+    used = connection.execute(text(f"SELECT MAX(week_number) FROM {ACTIVITY_TABLE}")).scalar() or 0
+    last = max(week_number_for(through), used)
+    rows = [
+        {"week_number": week, "start_date": week_start_for(week), "end_date": week_start_for(week) + timedelta(days=6)}
+        for week in range(have + 1, last + 1)
+    ]
+    if rows:
+        connection.execute(insert(Base.metadata.tables["calendar_weeks"]), rows)
+        bump_versions(connection, ["calendar_weeks"])
+    return len(rows)
+
+def add_week_start_column(connection) -> bool:
+    """Add and backfill week_start on a table created before it existed"""
+    # Probe with a zero-row select: column reflection is not supported by every dialect (DuckDB)
+    columns = connection.execute(text(f"SELECT * FROM {ACTIVITY_TABLE} WHERE 1 = 0")).keys()
+    if "week_start" in columns:
+        return False
+    connection.execute(text(f"ALTER TABLE {ACTIVITY_TABLE} ADD COLUMN week_start DATE"))
+    connection.execute(text(f"CREATE INDEX IF NOT EXISTS ix_employee_activities_week_start ON {ACTIVITY_TABLE} (week_start)"))
+    backfill_week_start(connection)
+    return True
+
+def backfill_week_start(connection) -> int:
+    ensure_calendar_weeks(connection)
+    result = connection.execute(text(f"""
+        UPDATE {ACTIVITY_TABLE} SET week_start = (
+            SELECT cw.start_date FROM calendar_weeks cw WHERE cw.week_number = {ACTIVITY_TABLE}.week_number
+        )
+        WHERE week_start IS NULL AND week_number IS NOT NULL
+    """))
+    return result.rowcount
+
+def interval_start(day: date, interval: str = ACTIVITY_PARTITION_INTERVAL) -> date:
+    if interval == "year":
+        return date(day.year, 1, 1)
+    return date(day.year, 3 * ((day.month - 1) // 3) + 1, 1)
+
+def next_interval(start: date, interval: str = ACTIVITY_PARTITION_INTERVAL) -> date:
+    if interval == "year":
+        return date(start.year + 1, 1, 1)
+    return date(start.year + 1, 1, 1) if start.month == 10 else date(start.year, start.month + 3, 1)
+
+def partition_name(start: date, interval: str = ACTIVITY_PARTITION_INTERVAL) -> str:
+    if interval == "year":
+        return f"{ACTIVITY_TABLE}_{start.year}"
+    return f"{ACTIVITY_TABLE}_{start.year}q{(start.month - 1) // 3 + 1}"
+
+def is_partitioned(connection) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    return bool(connection.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :table"
+    ), {"table": ACTIVITY_TABLE}).scalar())
+
+def list_partitions(connection) -> List[Tuple[str, Optional[date], Optional[date]]]:
+    """(name, lower bound, upper bound) per partition; bounds are None for the default partition"""
+    rows = connection.execute(text("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:table AS regclass)
+        ORDER BY c.relname
+    """), {"table": ACTIVITY_TABLE}).fetchall()
+    partitions = []
+    for name, bound in rows:
+        match = BOUND_PATTERN.search(bound or "")
+        if match:
+            partitions.append((name, date.fromisoformat(match.group(1)), date.fromisoformat(match.group(2))))
+        else:
+            partitions.append((name, None, None))
+    return partitions
+
+def create_partitioned_table(connection):
+    """Create employee_activities as a range-partitioned table (employees must exist)"""
+    connection.execute(text("CREATE SEQUENCE IF NOT EXISTS employee_activities_id_seq"))
+    connection.execute(text(PARTITIONED_TABLE_DDL))
+    for statement in PARTITIONED_INDEXES:
+        connection.execute(text(statement))
+    connection.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {ACTIVITY_TABLE} DEFAULT"))
+
+def create_partition(connection, start: date, interval: str = ACTIVITY_PARTITION_INTERVAL) -> str:
+    """Create the partition for [start, next interval), moving matching rows out of the default partition"""
+    end, name = next_interval(start, interval), partition_name(start, interval)
+    bounds = {"start": start, "end": end}
+    in_range = "week_start >= :start AND week_start < :end"
+    stranded = connection.execute(text(f"SELECT COUNT(*) FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds).scalar()
+    if stranded:
+        # Postgres refuses to attach a range that rows in the default partition still cover
+        connection.execute(text(f"CREATE TEMP TABLE moved_activities (LIKE {ACTIVITY_TABLE}) ON COMMIT DROP"))
+        connection.execute(text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE {in_range} RETURNING *) "
+            f"INSERT INTO moved_activities SELECT * FROM moved"
+        ), bounds)
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {ACTIVITY_TABLE} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+    if stranded:
+        connection.execute(text(f"INSERT INTO {ACTIVITY_TABLE} SELECT * FROM moved_activities"))
+        connection.execute(text("DROP TABLE moved_activities"))
+    return name
+
+def _lock_partitions(connection):
+    """Serialize partition and calendar maintenance between workers starting together"""
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(hashtext('employee_activities_partitions'))"))
+
+def ensure_partitions(connection, ahead: int = ACTIVITY_PARTITIONS_AHEAD, source: str = ACTIVITY_TABLE) -> List[str]:
+    """Create missing partitions from the oldest week in `source` through `ahead` intervals past today"""
+    if not is_partitioned(connection):
+        return []
+    _lock_partitions(connection)
+    existing = {name for name, _, _ in list_partitions(connection)}
+    oldest = connection.execute(text(f"SELECT MIN(week_start) FROM {source}")).scalar()
+    newest = connection.execute(text(f"SELECT MAX(week_start) FROM {source}")).scalar()
+    start = interval_start(min(filter(None, [oldest, CALENDAR_START_DATE])))
+    last = interval_start(max(filter(None, [newest, date.today()])))
+    for _ in range(ahead):
+        last = next_interval(last)
+    created = []
+    while start <= last:
+        if partition_name(start) not in existing:
+            created.append(create_partition(connection, start))
+        start = next_interval(start)
+    return created
+
+def prepare_schema(engine):
+    """Create all tables, partitioning employee_activities on PostgreSQL, and bring existing ones up to date"""
+    tables = Base.metadata.sorted_tables
+    if engine.dialect.name == "postgresql" and ACTIVITY_PARTITIONING_ENABLED:
+        Base.metadata.create_all(bind=engine, tables=[table for table in tables if table.name != ACTIVITY_TABLE])
+        with engine.begin() as connection:
+            if not inspect(connection).has_table(ACTIVITY_TABLE):
+                create_partitioned_table(connection)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        _lock_partitions(connection)
+        add_week_start_column(connection)
+        connection.execute(text(EMPLOYEE_WEEK_INDEX))  # tables created before the index existed
+        ensure_calendar_weeks(connection)
+        ensure_partitions(connection)
+
+def migrate_to_partitioned(engine) -> int:
+    """Rebuild an existing unpartitioned Postgres employee_activities as a partitioned table; returns rows moved"""
+    with engine.begin() as connection:
+        if is_partitioned(connection):
+            return 0
+        add_week_start_column(connection)
+        backfill_week_start(connection)
+        undated = connection.execute(text(f"SELECT COUNT(*) FROM {ACTIVITY_TABLE} WHERE week_start IS NULL")).scalar()
+        if undated:
+            raise RuntimeError(f"{undated} activities have no week_number, so they cannot be placed in a partition")
+        legacy = f"{ACTIVITY_TABLE}_legacy"
+        connection.execute(text("ALTER SEQUENCE IF EXISTS employee_activities_id_seq OWNED BY NONE"))
+        connection.execute(text(f"ALTER TABLE {ACTIVITY_TABLE} RENAME TO {legacy}"))
+        connection.execute(text(f"ALTER TABLE {legacy} RENAME CONSTRAINT {ACTIVITY_TABLE}_pkey TO {legacy}_pkey"))
+        for index in ("ix_employee_activities_id", "ix_employee_activities_week_start",
+                      "ix_employee_activities_employee_week"):
+            connection.execute(text(f"ALTER INDEX IF EXISTS {index} RENAME TO {index.replace('activities', 'activities_legacy')}"))
+        create_partitioned_table(connection)
+        ensure_partitions(connection, source=legacy)
+        columns = "id, employee_id, week_number, week_start, meetings_attended, total_sales, hours_worked, activities"
+        moved = connection.execute(text(
+            f"INSERT INTO {ACTIVITY_TABLE} ({columns}) SELECT {columns} FROM {legacy}"
+        )).rowcount
+        connection.execute(text(f"DROP TABLE {legacy}"))
+        return moved
+
+def detach_partitions(engine, before: date, drop: bool = False) -> List[str]:
+    """Detach (and optionally drop) every partition whose range ends on or before `before`"""
+    detached = []
+    with engine.begin() as connection:
+        if not is_partitioned(connection):
+            raise RuntimeError(f"{ACTIVITY_TABLE} is not partitioned")
+        for name, _, upper in list_partitions(connection):
+            if upper is None or upper > before:
+                continue
+            connection.execute(text(f"ALTER TABLE {ACTIVITY_TABLE} DETACH PARTITION {name}"))
+            if drop:
+                connection.execute(text(f"DROP TABLE {name}"))
+            detached.append(name)
+        if detached:
+            # Rows vanished without per-row deletes: invalidate caches and tell feed consumers to resync
+            bump_versions(connection, [ACTIVITY_TABLE])
+            record_changes(connection, ACTIVITY_TABLE, [None], "bulk_delete")
+    return detached
+
+if __name__ == "__main__":
+    import argparse
+    from .database import engine
+    from . import models  # noqa: F401  (registers the tables on Base.metadata)
+
+    parser = argparse.ArgumentParser(description="Manage time-range partitions of employee_activities")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="List partitions and their bounds")
+    commands.add_parser("migrate", help="Convert an existing unpartitioned table and create partitions")
+    detach = commands.add_parser("detach", help="Detach partitions that end on or before a date")
+    detach.add_argument("--before", type=date.fromisoformat, required=True)
+    detach.add_argument("--drop", action="store_true", help="Drop detached partitions instead of keeping them")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        prepare_schema(engine)
+        print(f"Moved {migrate_to_partitioned(engine)} rows into the partitioned table")
+    elif args.command == "detach":
+        for name in detach_partitions(engine, args.before, args.drop):
+            print(f"{'Dropped' if args.drop else 'Detached'} {name}")
+    with engine.connect() as connection:
+        if not is_partitioned(connection):
+            print(f"{ACTIVITY_TABLE} is not partitioned ({engine.dialect.name})")
+        else:
+            for name, lower, upper in list_partitions(connection):
+                print(f"{name:<40} {lower or 'DEFAULT'} .. {upper or ''}")
@@ -0,0 +1,133 @@
+"""
+Connection pool instrumentation.
+
+`InstrumentedQueuePool` times how long each checkout waits for a free connection,
+and the pool's checkout/checkin events time how long a connection is held. Together
+with the pool's own counters this shows whether requests queue on the pool
+(saturation, waits, timeouts) or hold connections for too long (hold time).
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+SAMPLE_WINDOW = 1000  # most recent samples kept for percentiles
+
+def _summary(samples) -> Dict[str, float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    def at(fraction):
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 3)
+    return {"p50_ms": at(0.5), "p95_ms": at(0.95), "max_ms": round(ordered[-1] * 1000, 3)}
+
+class PoolMetrics:
+    """Checkout wait and hold times plus saturation for one pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=SAMPLE_WINDOW)
+        self._holds = deque(maxlen=SAMPLE_WINDOW)
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.stats = {"checkouts": 0, "waited_checkouts": 0, "timeouts": 0, "connects": 0, "invalidated": 0}
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self._waits.append(seconds)
+            if timed_out:
+                self.stats["timeouts"] += 1
+            elif seconds > 0.001:
+                self.stats["waited_checkouts"] += 1
+
+    def attach(self, pool):
+        @event.listens_for(pool, "connect")
+        def _connect(dbapi_connection, connection_record):
+            with self._lock:
+                self.stats["connects"] += 1
+
+        @event.listens_for(pool, "checkout")
+        def _checkout(dbapi_connection, connection_record, connection_proxy):
+            connection_record.info["checked_out_at"] = time.perf_counter()
+            with self._lock:
+                self.stats["checkouts"] += 1
+                self.in_use += 1
+                self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+        @event.listens_for(pool, "checkin")
+        def _checkin(dbapi_connection, connection_record):
+            started = connection_record.info.pop("checked_out_at", None)
+            if started is None:
+                return
+            with self._lock:
+                self.in_use -= 1
+                self._holds.append(time.perf_counter() - started)
+
+        @event.listens_for(pool, "invalidate")
+        def _invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.stats["invalidated"] += 1
+
+    def snapshot(self, pool) -> Dict[str, Any]:
+        # Only InstrumentedQueuePool keeps the configured overflow; QueuePool has it privately
+        max_overflow = getattr(pool, "max_overflow", None) if isinstance(pool, QueuePool) else None
+        capacity = None
+        if max_overflow is not None:
+            capacity = pool.size() + max(max_overflow, 0)
+        with self._lock:
+            waits, holds = list(self._waits), list(self._holds)
+            in_use, peak, stats = self.in_use, self.peak_in_use, dict(self.stats)
+        return {
+            "pool_class": type(pool).__name__,
+            "size": pool.size() if isinstance(pool, QueuePool) else None,
+            "max_overflow": max_overflow,
+            "capacity": capacity,
+            "checked_out": in_use,
+            "idle": pool.checkedin() if isinstance(pool, QueuePool) else None,
+            "overflow": max(pool.overflow(), 0) if isinstance(pool, QueuePool) else None,
+            "peak_checked_out": peak,
+            "saturation": round(in_use / capacity, 3) if capacity else None,
+            "peak_saturation": round(peak / capacity, 3) if capacity else None,
+            "checkout_wait": _summary(waits),
+            "hold": _summary(holds),
+            **stats,
+        }
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection (including opening one)"""
+
+    metrics: Optional[PoolMetrics] = None  # set by instrument(); until then checkouts are not timed
+
+    def __init__(self, creator, pool_size: int = 5, max_overflow: int = 10, **kwargs):
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kwargs)
+        self.max_overflow = max_overflow
+
+    def _do_get(self):
+        if self.metrics is None:
+            return super()._do_get()
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # Engine.dispose() recreates the pool (event listeners carry over); keep the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+def instrument(engine) -> PoolMetrics:
+    """Attach metrics to an engine's pool (built with poolclass=InstrumentedQueuePool)"""
+    metrics = PoolMetrics()
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.metrics = metrics
+    metrics.attach(engine.pool)
+    return metrics
@@ -0,0 +1,121 @@
+"""
+Canonical SQL for the 20 reference questions (see direct_sql_commands.md).
+
+The SQL is kept portable across PostgreSQL, SQLite and DuckDB, so ILIKE
+matches from the docs are written as LOWER(...) LIKE.
+"""
+
+REFERENCE_QUERIES = [
+    (
+        "What is the email address of the employee who is the Sales Manager?",
+        "SELECT email, full_name FROM employees WHERE job_title = 'Sales Manager'",
+    ),
+    (
+        "Which employee in the company works in the Product Development department?",
+        "SELECT full_name, job_title, email FROM employees WHERE department = 'Product Development'",
+    ),
+    (
+        "What was the sales revenue of 'Wei Zhang' for the week starting on '2024-08-28'?",
+        "SELECT e.full_name, ea.total_sales, cw.start_date, cw.end_date FROM employees e "
+        "JOIN employee_activities ea ON e.id = ea.employee_id "
+        "JOIN calendar_weeks cw ON ea.week_number = cw.week_number "
+        "WHERE e.full_name = 'Wei Zhang' AND cw.start_date <= '2024-08-28' AND cw.end_date >= '2024-08-28'",
+    ),
+    (
+        "Who are the employees working in the 'Finance' department?",
+        "SELECT full_name, job_title, email FROM employees WHERE department = 'Finance'",
+    ),
+    (
+        "Retrieve the total number of meetings attended by 'Na Li' in her weekly updates.",
+        "SELECT e.full_name, SUM(ea.meetings_attended) AS total_meetings FROM employees e "
+        "JOIN employee_activities ea ON e.id = ea.employee_id "
+        "WHERE e.full_name = 'Na Li' GROUP BY e.full_name",
+    ),
+    (
+        "Which employees worked more than 40 hours during week 1?",
+        "SELECT e.full_name, ea.hours_worked FROM employees e "
+        "JOIN employee_activities ea ON e.id = ea.employee_id "
+        "WHERE ea.week_number = 1 AND ea.hours_worked > 40 ORDER BY ea.hours_worked DESC",
+    ),
+    (
+        "How many employees does the company have in total?",
+        "SELECT COUNT(*) AS total_employees FROM employees",
+    ),
+    (
+        "What is the average hours worked by all employees during week 2?",
+        "SELECT AVG(hours_worked) AS average_hours FROM employee_activities WHERE week_number = 2",
+    ),
+    (
+        "How much total sales revenue has the Sales department generated to date?",
+        "SELECT SUM(ea.total_sales) AS total_sales_revenue FROM employees e "
+        "JOIN employee_activities ea ON e.id = ea.employee_id "
+        "WHERE e.department = 'Sales' AND ea.total_sales IS NOT NULL",
+    ),
+    (
+        "What is the total sales revenue generated by the company during week 1?",
+        "SELECT SUM(total_sales) AS total_week1_sales FROM employee_activities "
+        "WHERE week_number = 1 AND total_sales IS NOT NULL",
+    ),
+    (
+        "Who worked the most hours during the first week of September 2024?",
+        "SELECT e.full_name, ea.hours_worked, cw.start_date FROM employees e "
+        "JOIN employee_activities ea ON e.id = ea.employee_id "
+        "JOIN calendar_weeks cw ON ea.week_number = cw.week_number "
+        "WHERE cw.start_date >= '2024-09-01' AND cw.start_date < '2024-09-08' "
+        "ORDER BY ea.hours_worked DESC LIMIT 1",
+    ),
+    (
+        "Which employee attended the most meetings during week 2?",
+        "SELECT e.full_name, ea.meetings_attended FROM employees e "
+        "JOIN employee_activities ea ON e.id = ea.employee_id "
+        "WHERE ea.week_number = 2 ORDER BY ea.meetings_attended DESC LIMIT 1",
+    ),
+    (
+        "Which employees in the company were hired during a time of industry recession?",
+        "SELECT full_name, hire_date, department, job_title FROM employees "
+        "WHERE hire_date >= '2023-01-01' AND hire_date <= '2023-12-31' ORDER BY hire_date",
+    ),
+    (
+        "Who are the employees that faced challenges with customer retention, and what solutions did they propose?",
+        "SELECT e.full_name, ea.activities, ea.week_number FROM employees e "
+        "JOIN employee_activities ea ON e.id = ea.employee_id "
+        "WHERE LOWER(ea.activities) LIKE '%retention%' ORDER BY e.full_name, ea.week_number",
+    ),
+    (
+        "Which employees work in roles that likely require data analysis or reporting skills?",
+        "SELECT full_name, job_title, department FROM employees "
+        "WHERE LOWER(job_title) LIKE '%analyst%' OR LOWER(job_title) LIKE '%data%' "
+        "OR LOWER(job_title) LIKE '%report%' OR LOWER(job_title) LIKE '%financial%' "
+        "ORDER BY department, full_name",
+    ),
+    (
+        "List all employees who work in the IT department within the company.",
+        "SELECT full_name, job_title, email, hire_date FROM employees WHERE department = 'IT' ORDER BY full_name",
+    ),
+    (
+        "Compare the hours worked by 'Wei Zhang' and 'Tao Huang' during week 1.",
+        "SELECT e.full_name, ea.hours_worked, ea.week_number FROM employees e "
+        "JOIN employee_activities ea ON e.id = ea.employee_id "
+        "WHERE e.full_name IN ('Wei Zhang', 'Tao Huang') AND ea.week_number = 1 ORDER BY e.full_name",
+    ),
+    (
+        "Who are the top 3 employees by total hours worked during the last 4 weeks?",
+        "SELECT e.full_name, SUM(ea.hours_worked) AS total_hours FROM employees e "
+        "JOIN employee_activities ea ON e.id = ea.employee_id "
+        "WHERE ea.week_number >= 7 GROUP BY e.full_name ORDER BY total_hours DESC LIMIT 3",
+    ),
+    (
+        "Who achieved the highest sales revenue in a single week, and when?",
+        "SELECT e.full_name, ea.total_sales, ea.week_number, cw.start_date, cw.end_date FROM employees e "
+        "JOIN employee_activities ea ON e.id = ea.employee_id "
+        "JOIN calendar_weeks cw ON ea.week_number = cw.week_number "
+        "WHERE ea.total_sales IS NOT NULL ORDER BY ea.total_sales DESC LIMIT 1",
+    ),
+    (
+        "What is the total number of hours worked and average sales revenue for employees in the Business Development department?",
+        "SELECT SUM(ea.hours_worked) AS total_hours_worked, AVG(ea.total_sales) AS average_sales_revenue, "
+        "COUNT(DISTINCT e.id) AS employee_count FROM employees e "
+        "JOIN employee_activities ea ON e.id = ea.employee_id "
+        "WHERE e.department = 'Business Development'",
+    ),
+]
@@ -0,0 +1,265 @@
+"""
+Measure how the 20 reference queries scale with the number of activity rows.
+
+For each size, a database is seeded with the reference employees plus synthetic
+employees and weekly activities up to the requested row count. Each reference SQL
+then runs with warmups and repetitions. The report shows latency percentiles per
+size, the growth exponent between sizes (1.0 = linear in the row count) and the
+query plan, so queries that turn superlinear or switch plans as data grows stand out.
+
+Usage:
+    python -m app.db.scaling_benchmark --sizes 1k,100k,1m
+    python -m app.db.scaling_benchmark --url-template duckdb:///./scale_{rows}.duckdb --json scaling.json
+"""
+import argparse
+import json
+import math
+import re
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+import numpy as np
+from sqlalchemy import insert, text
+from sqlalchemy.orm import sessionmaker
+
+from .database import make_engine
+from .reference_queries import REFERENCE_QUERIES
+from .backend_benchmark import percentile
+from .partitioning import prepare_schema, week_start_for
+from .seed_data import get_department_activities, seed_database
+from . import models
+
+JOB_TITLES = {
+    "Sales": ["Sales Manager", "Sales Representative", "Account Executive"],
+    "Marketing": ["Marketing Manager", "Marketing Specialist", "Content Writer"],
+    "Product Development": ["Product Manager", "Software Engineer", "UX Designer"],
+    "Finance": ["Financial Analyst", "Accountant", "Finance Manager"],
+    "IT": ["IT Manager", "System Administrator", "Network Engineer"],
+    "Business Development": ["Business Development Manager", "Data Analyst", "Partnership Manager"],
+}
+DEPARTMENTS = list(JOB_TITLES)
+INSERT_CHUNK_ROWS = 50_000
+SIZE_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)([km]?)$")
+# DuckDB EXPLAIN draws one box per operator, with the operator name on the line below the top edge
+DUCKDB_BOX_TOP = re.compile(r"┌[─┴]+┐")
+
+def parse_size(value: str) -> int:
+    """'1k' -> 1000, '1m' -> 1000000"""
+    match = SIZE_PATTERN.match(value.strip().lower())
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid size: {value}")
+    return int(float(match.group(1)) * {"": 1, "k": 1_000, "m": 1_000_000}[match.group(2)])
+
+def activity_count(engine) -> int:
+    with engine.connect() as connection:
+        try:
+            return connection.execute(text("SELECT COUNT(*) FROM employee_activities")).scalar()
+        except Exception:
+            return -1
+
+def seed_scaled(engine, rows: int, weeks: int = 52, seed: int = 42):
+    """Reference data plus synthetic employees with `weeks` weekly activities each, `rows` activities in total"""
+    prepare_schema(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = Session()
+    try:
+        seed_database(db)  # clears the tables, then the 10 reference employees and their 10 weeks
+        reference_rows = db.query(models.EmployeeActivity).count()
+        next_employee_id = (db.query(models.Employee.id).order_by(models.Employee.id.desc()).limit(1).scalar() or 0) + 1
+    finally:
+        db.close()
+
+    synthetic_rows = max(rows - reference_rows, 0)
+    employee_count = math.ceil(synthetic_rows / weeks)
+    rng = np.random.default_rng(seed)
+    departments = rng.integers(0, len(DEPARTMENTS), employee_count)
+    titles = rng.integers(0, 3, employee_count)
+    hire_offsets = rng.integers(0, 5 * 365, employee_count)
+    employees = [
+        {
+            "id": next_employee_id + index,
+            "email": f"employee{next_employee_id + index}@example.com",
+            "full_name": f"Employee {next_employee_id + index}",
+            "job_title": JOB_TITLES[DEPARTMENTS[department]][title],
+            "department": DEPARTMENTS[department],
+            "hire_date": date(2019, 1, 1) + timedelta(days=int(offset)),
+        }
+        for index, (department, title, offset) in enumerate(zip(departments.tolist(), titles.tolist(),
+                                                                 hire_offsets.tolist()))
+    ]
+
+    positions = np.arange(synthetic_rows)
+    owners = positions // weeks
+    week_numbers = (positions % weeks + 1).tolist()
+    owner_departments = departments[owners]
+    selling = np.isin(owner_departments, [DEPARTMENTS.index("Sales"), DEPARTMENTS.index("Business Development")])
+    hours = np.round(rng.uniform(35, 55, synthetic_rows), 1).tolist()
+    meetings = rng.integers(2, 15, synthetic_rows).tolist()
+    sales = np.where(selling, np.round(rng.uniform(10000, 120000, synthetic_rows), 2), np.nan).tolist()
+    texts = {department: get_department_activities(department, 1) for department in DEPARTMENTS}
+    picks = rng.integers(0, 1 << 30, synthetic_rows).tolist()
+    week_starts = {week: week_start_for(week) for week in range(1, weeks + 1)}
+
+    with engine.begin() as connection:
+        for start in range(0, len(employees), INSERT_CHUNK_ROWS):
+            connection.execute(insert(models.Employee.__table__), employees[start:start + INSERT_CHUNK_ROWS])
+        for start in range(0, synthetic_rows, INSERT_CHUNK_ROWS):
+            chunk = []
+            for position in range(start, min(start + INSERT_CHUNK_ROWS, synthetic_rows)):
+                department = DEPARTMENTS[owner_departments[position]]
+                choices = texts[department]
+                chunk.append({
+                    "employee_id": next_employee_id + int(owners[position]),
+                    "week_number": week_numbers[position],
+                    "week_start": week_starts[week_numbers[position]],
+                    "meetings_attended": meetings[position],
+                    "total_sales": None if math.isnan(sales[position]) else sales[position],
+                    "hours_worked": hours[position],
+                    "activities": choices[picks[position] % len(choices)],
+                })
+            connection.execute(insert(models.EmployeeActivity.__table__), chunk)
+        if engine.dialect.name == "postgresql":
+            # Explicit ids bypassed the sequence
+            connection.execute(text("SELECT setval('employees_id_seq', (SELECT MAX(id) FROM employees))"))
+    # Extends the calendar to the synthetic weeks and creates their partitions
+    prepare_schema(engine)
+    if engine.dialect.name in ("sqlite", "postgresql"):
+        with engine.begin() as connection:
+            connection.execute(text("ANALYZE"))
+
+def _postgres_shape(node: Dict[str, Any]) -> str:
+    name = node["Node Type"]
+    if "Relation Name" in node:
+        name += f" {node['Relation Name']}"
+    children = node.get("Plans", [])
+    return f"{name}({', '.join(_postgres_shape(child) for child in children)})" if children else name
+
+def plan_shape(connection, sql: str) -> str:
+    """Compact description of the plan the database chose for `sql`"""
+    dialect = connection.dialect.name
+    try:
+        if dialect == "sqlite":
+            return "; ".join(row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+        if dialect == "postgresql":
+            plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            return _postgres_shape(plan[0]["Plan"])
+        if dialect == "duckdb":
+            lines = "\n".join(str(row[-1]) for row in connection.execute(text(f"EXPLAIN {sql}"))).splitlines()
+            operators = [
+                lines[number + 1][box.start():box.end()].strip("│ ")
+                for number, line in enumerate(lines[:-1]) for box in DUCKDB_BOX_TOP.finditer(line)
+            ]
+            return " > ".join(operators)
+    except Exception as e:
+        connection.rollback()
+        return f"unavailable ({type(e).__name__})"
+    return "unavailable"
+
+def time_queries(engine, repeat: int, warmup: int, max_seconds: float) -> List[Dict[str, Any]]:
+    """Latency samples and plan of every reference query against the current data"""
+    results = []
+    with engine.connect() as connection:
+        for index, (question, sql) in enumerate(REFERENCE_QUERIES, 1):
+            for _ in range(warmup):
+                connection.execute(text(sql)).fetchall()
+            samples, budget_ends = [], time.perf_counter() + max_seconds
+            for attempt in range(repeat):
+                started = time.perf_counter()
+                result_rows = len(connection.execute(text(sql)).fetchall())
+                samples.append((time.perf_counter() - started) * 1000)
+                # Slow queries at large sizes stop early, but always get a few samples
+                if attempt >= 2 and time.perf_counter() > budget_ends:
+                    break
+            results.append({
+                "query": f"Q{index}",
+                "question": question,
+                "samples": len(samples),
+                "result_rows": result_rows,
+                "min_ms": min(samples),
+                "median_ms": statistics.median(samples),
+                "p95_ms": percentile(samples, 0.95),
+                "p99_ms": percentile(samples, 0.99),
+                "max_ms": max(samples),
+                "plan": plan_shape(connection, sql),
+            })
+    return results
+
+def growth_exponents(reports: List[Dict[str, Any]], index: int) -> List[float]:
+    """log-log slope of median latency between consecutive sizes for one query"""
+    exponents = []
+    for smaller, larger in zip(reports, reports[1:]):
+        before, after = smaller["queries"][index]["median_ms"], larger["queries"][index]["median_ms"]
+        ratio = larger["rows"] / smaller["rows"]
+        exponents.append(math.log(max(after, 1e-6) / max(before, 1e-6)) / math.log(ratio) if ratio > 1 else 0.0)
+    return exponents
+
+def print_report(reports: List[Dict[str, Any]], superlinear: float):
+    sizes = [report["rows"] for report in reports]
+    header = f"{'query':<6}" + "".join(f"{f'{size:,} rows p50/p95 ms':>30}" for size in sizes)
+    header += "   growth" if len(reports) > 1 else ""
+    print(header)
+    flagged = []
+    for index, row in enumerate(reports[0]["queries"]):
+        line = f"{row['query']:<6}"
+        for report in reports:
+            query = report["queries"][index]
+            line += f"{query['median_ms']:>20.3f} / {query['p95_ms']:<7.3f}"
+        exponents = growth_exponents(reports, index)
+        if exponents:
+            line += "   " + " ".join(f"{exponent:5.2f}" for exponent in exponents)
+            if max(exponents) > superlinear:
+                line += "  SUPERLINEAR"
+                flagged.append(index)
+        plans = {report["queries"][index]["plan"] for report in reports}
+        if len(plans) > 1:
+            line += "  PLAN CHANGED"
+            flagged.append(index)
+        print(line)
+
+    print(f"\nPlans at {sizes[-1]:,} rows:")
+    for index, row in enumerate(reports[-1]["queries"]):
+        marker = "*" if index in flagged else " "
+        print(f" {marker}{row['query']:<5} {row['plan']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency of the reference queries at increasing data sizes")
+    parser.add_argument("--sizes", type=lambda value: [parse_size(size) for size in value.split(",")],
+                        default=[1_000, 100_000, 1_000_000], help="Activity row counts, e.g. 1k,100k,1m")
+    parser.add_argument("--url-template", default="sqlite:///./scale_{rows}.db",
+                        help="Database URL per size; {rows} is replaced by the row count")
+    parser.add_argument("--weeks", type=int, default=52, help="Weekly activities per synthetic employee")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed repetitions per query")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed warmup runs per query")
+    parser.add_argument("--max-seconds", type=float, default=10.0,
+                        help="Stop repeating a query after this long (at least 3 samples are taken)")
+    parser.add_argument("--superlinear", type=float, default=1.2,
+                        help="Flag queries whose latency grows faster than rows ** this")
+    parser.add_argument("--reseed", action="store_true", help="Reseed even if a database already has the size")
+    parser.add_argument("--json", help="Also write the full report to this file")
+    args = parser.parse_args()
+
+    reports = []
+    for rows in sorted(args.sizes):
+        url = args.url_template.format(rows=rows)
+        engine = make_engine(url)
+        try:
+            if args.reseed or activity_count(engine) != rows:
+                started = time.perf_counter()
+                seed_scaled(engine, rows, args.weeks)
+                print(f"Seeded {rows:,} activity rows into {url} in {time.perf_counter() - started:.1f}s")
+            queries = time_queries(engine, args.repeat, args.warmup, args.max_seconds)
+            reports.append({"rows": rows, "url": url, "dialect": engine.dialect.name, "queries": queries})
+        finally:
+            engine.dispose()
+
+    print()
+    print_report(reports, args.superlinear)
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump(reports, output, indent=2)
+
+if __name__ == "__main__":
+    main()
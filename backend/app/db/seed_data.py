@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from datetime import date, timedelta, datetime
 import random
 from . import models
+from .partitioning import ensure_calendar_weeks, prepare_schema
 
 fake = Faker()
 
@@ -67,18 +68,9 @@ def generate_activity_data(employee_id: int, week_number: int):
     }
 
 def seed_calendar_weeks(db: Session):
-    """Seed calendar weeks for 2024 (10 weeks starting from August)"""
-    # Start from August 26, 2024 to match query requirements
-    start_date = datetime(2024, 8, 26)
-    for week in range(1, 11):
-        week_start = start_date + timedelta(days=(week-1)*7)
-        week_end = week_start + timedelta(days=6)
-        calendar_week = models.CalendarWeek(
-            week_number=week,
-            start_date=week_start.date(),
-            end_date=week_end.date()
-        )
-        db.add(calendar_week)
+    """Seed calendar weeks from CALENDAR_START_DATE (2024-08-26) through CALENDAR_WEEKS_AHEAD weeks past today"""
+    # The same rows prepare_schema maintains, so reseeding keeps the weeks past the 10 seeded with activities
+    ensure_calendar_weeks(db.connection())
     db.commit()
 
 def seed_employees(db: Session):
@@ -373,7 +365,9 @@ def seed_database(db: Session):
     print("Database seeding completed successfully!")
 
 if __name__ == "__main__":
-    from .database import SessionLocal
+    from .database import SessionLocal, engine
+    # Embedded backends start empty, so make sure the tables (and Postgres partitions) exist
+    prepare_schema(engine)
     db = SessionLocal()
     try:
         seed_database(db)
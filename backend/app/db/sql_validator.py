@@ -0,0 +1,239 @@
+"""
+Static validation of generated SQL against the ORM schema, before touching the database.
+
+Only single read-only SELECT (or WITH ... SELECT) statements are accepted, and every
+table and column reference must resolve against the tables described in the prompt.
+Internal tables on `Base.metadata` (usage ledger, benchmark history, change feed, data
+versions) are unknown to generated SQL.
+"""
+import re
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from .database import Base
+from . import models  # noqa: F401  (registers the tables on Base.metadata)
+
+TOKEN_PATTERN = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<comment>--[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<quoted>"(?:[^"]|"")+")
+  | (?P<number>\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|\.\d+)
+  | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+  | (?P<op>::|<=|>=|<>|!=|\|\||.)
+""", re.VERBOSE | re.DOTALL)
+
+WRITE_KEYWORDS = {
+    "insert", "update", "delete", "drop", "alter", "create", "truncate", "grant", "revoke",
+    "copy", "merge", "call", "execute", "exec", "vacuum", "attach", "detach", "pragma",
+    "into", "lock", "reindex",
+}
+
+KEYWORDS = {
+    "select", "from", "where", "group", "by", "having", "order", "limit", "offset", "fetch",
+    "next", "only", "top", "union", "intersect", "except", "with", "recursive", "materialized",
+    "as", "on", "using", "natural", "join", "inner", "left", "right", "full", "outer", "cross",
+    "lateral", "distinct", "all", "any", "some", "exists", "in", "is", "not", "null", "and",
+    "or", "like", "ilike", "similar", "to", "glob", "regexp", "escape", "between", "case",
+    "when", "then", "else", "end", "asc", "desc", "nulls", "first", "last", "collate", "nocase",
+    "true", "false", "unknown", "over", "partition", "rows", "range", "groups", "preceding",
+    "following", "unbounded", "current", "row", "window", "filter", "within", "values",
+    "cast", "extract", "interval", "at", "zone", "current_date", "current_time",
+    "current_timestamp", "localtime", "localtimestamp", "year", "month", "day", "week",
+    "quarter", "dow", "doy", "isodow", "isoyear", "epoch", "hour", "minute", "second",
+    "integer", "int", "bigint", "smallint", "numeric", "decimal", "float", "real", "double",
+    "precision", "text", "varchar", "char", "character", "varying", "boolean", "bool", "date",
+    "time", "timestamp", "timestamptz",
+}
+
+# Words after which "(" opens a subquery or expression group rather than a function call
+GROUPING_KEYWORDS = {
+    "in", "exists", "from", "join", "as", "any", "all", "some", "on", "and", "or", "not",
+    "where", "select", "having", "when", "then", "else", "by", "union", "intersect", "except",
+    "with", "lateral", "values", "between", "is", "like", "ilike",
+}
+
+# Words that end a FROM list
+CLAUSE_KEYWORDS = {"where", "group", "order", "having", "limit", "offset", "union", "intersect",
+                   "except", "on", "using", "window", "fetch"}
+
+class SQLValidationError(Exception):
+    """Generated SQL was rejected before execution"""
+
+    def __init__(self, code: str, message: str, identifier: Optional[str] = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.identifier = identifier
+
+    def to_dict(self) -> Dict[str, Optional[str]]:
+        return {"code": self.code, "message": self.message, "identifier": self.identifier}
+
+# Tables generated SQL may read: the ones the system prompt describes
+QUERYABLE_TABLES = ("employees", "employee_activities", "calendar_weeks")
+
+def schema_columns(tables=QUERYABLE_TABLES) -> Dict[str, Set[str]]:
+    """Table name -> column names, from the ORM metadata"""
+    return {
+        name: {column.name.lower() for column in Base.metadata.tables[name].columns}
+        for name in tables
+    }
+
+SCHEMA = schema_columns()
+ALL_COLUMNS = set().union(*SCHEMA.values())
+
+# Rejection counters by error code
+validation_stats: Dict[str, int] = {}
+_stats_lock = threading.Lock()
+
+def tokenize(sql: str) -> List[Tuple[str, str]]:
+    """Split SQL into (kind, value) tokens; words are lower-cased, whitespace and comments dropped"""
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(sql):
+        kind = match.lastgroup
+        if kind in ("ws", "comment"):
+            continue
+        value = match.group()
+        if kind == "word":
+            value = value.lower()
+        elif kind == "quoted":
+            kind, value = "quoted_word", value[1:-1].replace('""', '"').lower()
+        tokens.append((kind, value))
+    return tokens
+
+def _is_name(token) -> bool:
+    """Identifier token that is not a reserved word"""
+    kind, value = token
+    return kind == "quoted_word" or (kind == "word" and value not in KEYWORDS)
+
+def _is_word(token) -> bool:
+    return token[0] in ("word", "quoted_word")
+
+def _collect_names(tokens):
+    """First pass: CTE names, table references and their aliases, and output aliases"""
+    cte_names: Set[str] = set()
+    table_aliases: Dict[str, Optional[str]] = {}
+    output_aliases: Set[str] = set()
+    table_refs: List[str] = []
+
+    # CTEs: WITH name AS ( ... ), name AS ( ... )
+    for i in range(len(tokens) - 2):
+        if (_is_word(tokens[i]) and tokens[i + 1] == ("word", "as") and tokens[i + 2] == ("op", "(")
+                and i > 0 and tokens[i - 1] in (("word", "with"), ("word", "recursive"), ("op", ","))):
+            cte_names.add(tokens[i][1])
+
+    parens: List[str] = []
+    expecting_table = False
+    from_depth = None
+    derived_depth = None
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        prev = tokens[i - 1] if i > 0 else None
+        nxt = tokens[i + 1] if i + 1 < len(tokens) else None
+
+        if token == ("op", "("):
+            is_call = prev is not None and _is_word(prev) and prev[1] not in GROUPING_KEYWORDS
+            if expecting_table:
+                # Derived table: FROM ( SELECT ... ) alias
+                expecting_table = False
+                derived_depth = len(parens)
+            parens.append("call" if is_call else "group")
+        elif token == ("op", ")"):
+            if parens:
+                parens.pop()
+            if derived_depth is not None and len(parens) == derived_depth:
+                derived_depth = None
+                j = i + 1
+                if j < len(tokens) and tokens[j] == ("word", "as"):
+                    j += 1
+                if j < len(tokens) and _is_name(tokens[j]):
+                    table_aliases[tokens[j][1]] = None
+        elif token == ("word", "from") and (not parens or parens[-1] == "group"):
+            expecting_table = True
+            from_depth = len(parens)
+        elif token == ("word", "join"):
+            expecting_table = True
+        elif token[0] == "word" and token[1] in CLAUSE_KEYWORDS:
+            if from_depth == len(parens):
+                from_depth = None
+        elif token == ("op", ",") and from_depth == len(parens):
+            expecting_table = True
+        elif expecting_table and _is_word(token):
+            expecting_table = False
+            name = token[1]
+            if nxt == ("op", ".") and i + 2 < len(tokens) and _is_word(tokens[i + 2]):
+                # schema-qualified name: keep the table part
+                i += 2
+                name = tokens[i][1]
+            if tokens[i + 1:i + 2] == [("op", "(")]:
+                i += 1
+                continue  # table function such as generate_series(...)
+            table_refs.append(name)
+            table_aliases[name] = name
+            j = i + 1
+            if j < len(tokens) and tokens[j] == ("word", "as"):
+                j += 1
+            if j < len(tokens) and _is_name(tokens[j]) and (j + 1 >= len(tokens) or tokens[j + 1] != ("op", "(")):
+                table_aliases[tokens[j][1]] = name
+        elif token == ("word", "as") and nxt is not None and _is_word(nxt):
+            output_aliases.add(nxt[1])
+        elif (_is_name(token) and prev is not None and nxt != ("op", "(") and nxt != ("op", ".")
+              and (prev == ("op", ")") or prev[0] in ("number", "string") or _is_name(prev))):
+            # Implicit alias: SUM(x) total_hours, e.full_name name
+            output_aliases.add(token[1])
+        i += 1
+
+    return cte_names, table_aliases, output_aliases, table_refs
+
+def _reject(code: str, message: str, identifier: Optional[str] = None):
+    with _stats_lock:
+        validation_stats[code] = validation_stats.get(code, 0) + 1
+    raise SQLValidationError(code, message, identifier)
+
+def validate_sql(sql: str):
+    """Raise SQLValidationError unless `sql` is a single SELECT over known tables and columns"""
+    tokens = tokenize(sql or "")
+    while tokens and tokens[-1] == ("op", ";"):
+        tokens.pop()
+    if not tokens:
+        _reject("empty", "No SQL statement found")
+    if ("op", ";") in tokens:
+        _reject("multiple_statements", "Only a single SQL statement is allowed")
+    if tokens[0] not in (("word", "select"), ("word", "with")):
+        _reject("not_select", f"Only SELECT statements are allowed, got {tokens[0][1].upper()}")
+    for kind, value in tokens:
+        if kind == "word" and value in WRITE_KEYWORDS:
+            _reject("write_operation", f"Write operation {value.upper()} is not allowed", value)
+    if tokens.count(("op", "(")) != tokens.count(("op", ")")):
+        _reject("syntax", "Unbalanced parentheses")
+
+    cte_names, table_aliases, output_aliases, table_refs = _collect_names(tokens)
+
+    for name in table_refs:
+        if name not in SCHEMA and name not in cte_names:
+            _reject("unknown_table", f"Unknown table '{name}'", name)
+
+    known_names = ALL_COLUMNS | output_aliases | set(table_aliases) | cte_names | set(SCHEMA)
+    skip = set()
+    for i, token in enumerate(tokens):
+        if i in skip or not _is_name(token):
+            continue
+        prev = tokens[i - 1] if i > 0 else None
+        nxt = tokens[i + 1] if i + 1 < len(tokens) else None
+        if nxt == ("op", "(") or prev == ("op", "::"):
+            continue  # function call or type name
+        if nxt == ("op", "."):
+            qualifier = token[1]
+            column = tokens[i + 2] if i + 2 < len(tokens) else None
+            skip.add(i + 2)
+            if qualifier not in table_aliases and qualifier not in cte_names:
+                _reject("unknown_table", f"Unknown table or alias '{qualifier}'", qualifier)
+            table = table_aliases.get(qualifier)
+            if column is None or column == ("op", "*") or table is None or table not in SCHEMA:
+                continue  # wildcard, derived table or CTE: columns are not checked
+            if column[1] not in SCHEMA[table] and _is_word(column):
+                _reject("unknown_column", f"Unknown column '{qualifier}.{column[1]}'", f"{qualifier}.{column[1]}")
+            continue
+        if token[1] not in known_names:
+            _reject("unknown_column", f"Unknown column '{token[1]}'", token[1])
@@ -0,0 +1,291 @@
+"""
+Background export jobs: compressed CSV/JSON artifacts built in a bounded worker pool.
+
+Jobs stream rows from the database in batches into a gzip (or zstd, when the
+`zstandard` package is installed) file under EXPORT_DIR. A JSON sidecar next to each
+artifact carries the job status, so any worker sharing the directory can report
+progress and serve the download. Identical requests reuse a finished artifact while
+the source tables' data versions are unchanged.
+"""
+import csv
+import gzip
+import io
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from .db.database import SessionLocal
+from .db import models
+from .db.data_versions import read_versions, format_versions
+from .api.fast_json import dumps
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+# Export job configuration
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "2"))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_ARTIFACT_TTL_SECONDS = float(os.getenv("EXPORT_ARTIFACT_TTL_SECONDS", "3600"))
+
+EXPORT_TABLES = ("employees", "activities")
+EXPORT_FORMATS = ("csv", "json")
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+class ExportError(Exception):
+    """An export request cannot be served"""
+
+def available_compressions() -> List[str]:
+    return ["gzip", "zstd"] if zstandard is not None else ["gzip"]
+
+def export_columns(table: str):
+    """(header, JSON keys, Core select) for an export table, matching the synchronous exports"""
+    if table == "employees":
+        e = models.Employee
+        return (
+            ["ID", "Full Name", "Email", "Department", "Job Title", "Hire Date"],
+            ["id", "full_name", "email", "department", "job_title", "hire_date"],
+            select(e.id, e.full_name, e.email, e.department, e.job_title, e.hire_date).order_by(e.id),
+        )
+    a, e = models.EmployeeActivity, models.Employee
+    return (
+        ["Activity ID", "Employee ID", "Employee Name", "Week Number",
+         "Hours Worked", "Total Sales", "Meetings Attended", "Activities"],
+        ["id", "employee_id", "employee_name", "week_number",
+         "hours_worked", "total_sales", "meetings_attended", "activities"],
+        select(a.id, a.employee_id, e.full_name, a.week_number, a.hours_worked,
+               a.total_sales, a.meetings_attended, a.activities).join(e).order_by(a.id),
+    )
+
+def data_version(db, table: str) -> str:
+    """Data-version counters of every source table; any write to them invalidates the artifact"""
+    sources = ["employees"] if table == "employees" else ["employees", "employee_activities"]
+    return format_versions(read_versions(db, sources))
+
+def _open_compressed(path: str, compression: str):
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"), closefd=True)
+    return gzip.open(path, "wb", compresslevel=6)
+
+class ExportJob:
+    """State of one export; persisted as a JSON sidecar"""
+
+    def __init__(self, table: str, format: str, compression: str, version: str):
+        self.id = uuid.uuid4().hex
+        self.table = table
+        self.format = format
+        self.compression = compression
+        self.data_version = version
+        self.status = "queued"
+        self.rows_written = 0
+        self.total_rows: Optional[int] = None
+        self.size_bytes = 0
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def key(self):
+        return (self.table, self.format, self.compression)
+
+    @property
+    def filename(self) -> str:
+        return f"{self.table}_{self.id}.{self.format}{COMPRESSION_SUFFIXES[self.compression]}"
+
+    @property
+    def path(self) -> str:
+        return os.path.join(EXPORT_DIR, self.filename)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "table": self.table,
+            "format": self.format,
+            "compression": self.compression,
+            "data_version": self.data_version,
+            "status": self.status,
+            "rows_written": self.rows_written,
+            "total_rows": self.total_rows,
+            "size_bytes": self.size_bytes,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "filename": self.filename,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ExportJob":
+        job = cls(data["table"], data["format"], data["compression"], data["data_version"])
+        for name in ("id", "status", "rows_written", "total_rows", "size_bytes", "error", "created_at", "finished_at"):
+            setattr(job, name, data[name])
+        return job
+
+class ExportManager:
+    """Runs export jobs in a bounded thread pool and reuses fresh artifacts"""
+
+    def __init__(self, workers: int = EXPORT_WORKERS):
+        self.directory = EXPORT_DIR
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="export")
+        self.jobs: Dict[str, ExportJob] = {}
+        self.lock = threading.Lock()
+        self.stats = {"submitted": 0, "reused": 0, "completed": 0, "failed": 0}
+
+    def _sidecar(self, job_id: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def _save(self, job: ExportJob):
+        """Atomically write the job status so other workers can read it"""
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = self._sidecar(job.id) + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(job.to_dict(), f)
+        os.replace(temp_path, self._sidecar(job.id))
+
+    def _load(self, job_id: str) -> Optional[ExportJob]:
+        """Job status written by this or another worker"""
+        if not job_id.isalnum():
+            return None
+        try:
+            with open(self._sidecar(job_id)) as f:
+                return ExportJob.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        with self.lock:
+            job = self.jobs.get(job_id)
+        return job if job is not None else self._load(job_id)
+
+    def _reusable(self, table: str, format: str, compression: str, version: str) -> Optional[ExportJob]:
+        """A queued, running or recent finished job for the same request and data version"""
+        now = time.time()
+        candidates = list(self.jobs.values())
+        if os.path.isdir(self.directory):
+            known = {job.id for job in candidates}
+            for name in os.listdir(self.directory):
+                if name.endswith(".json") and name[:-5] not in known:
+                    job = self._load(name[:-5])
+                    if job is not None:
+                        candidates.append(job)
+        for job in sorted(candidates, key=lambda job: job.created_at, reverse=True):
+            if job.key != (table, format, compression) or job.data_version != version:
+                continue
+            if job.status in ("queued", "running") and now - job.created_at < EXPORT_ARTIFACT_TTL_SECONDS:
+                return job
+            if (job.status == "done" and job.finished_at is not None
+                    and now - job.finished_at < EXPORT_ARTIFACT_TTL_SECONDS
+                    and os.path.exists(job.path)):
+                return job
+        return None
+
+    def submit(self, table: str, format: str, compression: str = "gzip"):
+        """Start an export, or return a reusable one; returns (job, reused)"""
+        if table not in EXPORT_TABLES:
+            raise ExportError(f"Table must be one of {', '.join(EXPORT_TABLES)}")
+        if format not in EXPORT_FORMATS:
+            raise ExportError("Format must be 'csv' or 'json'")
+        if compression not in available_compressions():
+            raise ExportError(f"Compression must be one of {', '.join(available_compressions())}")
+
+        db = SessionLocal()
+        try:
+            version = data_version(db, table)
+        finally:
+            db.close()
+
+        with self.lock:
+            self.prune()
+            job = self._reusable(table, format, compression, version)
+            if job is not None:
+                self.stats["reused"] += 1
+                return job, True
+            job = ExportJob(table, format, compression, version)
+            self.jobs[job.id] = job
+            self.stats["submitted"] += 1
+        self._save(job)
+        self.executor.submit(self._run, job)
+        return job, False
+
+    def _run(self, job: ExportJob):
+        header, keys, statement = export_columns(job.table)
+        temp_path = job.path + ".part"
+        job.status = "running"
+        db = SessionLocal()
+        try:
+            job.total_rows = db.execute(select(func.count()).select_from(statement.subquery())).scalar()
+            self._save(job)
+            with _open_compressed(temp_path, job.compression) as out:
+                text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+                writer = csv.writer(text) if job.format == "csv" else None
+                if writer is not None:
+                    writer.writerow(header)
+                else:
+                    text.write("[")
+                result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+                for batch in result.partitions():
+                    if writer is not None:
+                        writer.writerows(batch)
+                    else:
+                        for row in batch:
+                            text.write(",\n" if job.rows_written else "\n")
+                            text.write(dumps(dict(zip(keys, row))).decode("utf-8"))
+                            job.rows_written += 1
+                    if writer is not None:
+                        job.rows_written += len(batch)
+                    self._save(job)
+                if writer is None:
+                    text.write("\n]\n")
+                text.flush()
+                text.detach()
+            os.replace(temp_path, job.path)
+            job.size_bytes = os.path.getsize(job.path)
+            # finished_at first: other threads read it as soon as they see the final status
+            job.finished_at = time.time()
+            job.status = "done"
+            with self.lock:
+                self.stats["completed"] += 1
+        except Exception as e:
+            job.error = str(e)
+            job.finished_at = time.time()
+            job.status = "failed"
+            with self.lock:
+                self.stats["failed"] += 1
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        finally:
+            db.close()
+            self._save(job)
+
+    def prune(self):
+        """Drop finished jobs and artifacts older than the TTL (caller holds the lock)"""
+        now = time.time()
+        for job_id, job in list(self.jobs.items()):
+            if job.finished_at is not None and now - job.finished_at > EXPORT_ARTIFACT_TTL_SECONDS:
+                del self.jobs[job_id]
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            job = self._load(name[:-5]) if name.endswith(".json") else None
+            if job is None or job.finished_at is None or now - job.finished_at <= EXPORT_ARTIFACT_TTL_SECONDS:
+                continue
+            for path in (job.path, self._sidecar(job.id)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass  # another worker pruned it first
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            active = sum(1 for job in self.jobs.values() if job.status in ("queued", "running"))
+            return {"active_jobs": active, "tracked_jobs": len(self.jobs), **self.stats}
+
+# Process-wide export manager
+export_manager = ExportManager()
@@ -0,0 +1,282 @@
+"""
+WebSocket channel pushing live dashboard updates.
+
+One hub per worker polls the change feed (so writes made by any worker are seen),
+recomputes the department/week aggregates touched by new changes, and fans the
+changed cells plus newly inserted activities out to every connection.
+
+Each connection keeps only a coalesced pending update (latest value per aggregate
+cell, a capped list of inserts) and a sender that waits on an event, so idle
+connections cost one parked coroutine and a few small objects. Sends are throttled
+per connection; a slow client's updates merge while its previous send is in flight,
+and a client that cannot take a send within LIVE_SEND_TIMEOUT_SECONDS is dropped.
+"""
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from sqlalchemy import select, text
+
+from .db.database import SessionLocal
+from .db import models
+from .db.change_log import settled_before, settled_seq
+from .api.fast_json import dumps
+
+# Live update configuration
+LIVE_POLL_SECONDS = float(os.getenv("LIVE_POLL_SECONDS", "0.5"))
+LIVE_MIN_INTERVAL_SECONDS = float(os.getenv("LIVE_MIN_INTERVAL_SECONDS", "1"))
+LIVE_SEND_TIMEOUT_SECONDS = float(os.getenv("LIVE_SEND_TIMEOUT_SECONDS", "10"))
+LIVE_MAX_PENDING_INSERTS = int(os.getenv("LIVE_MAX_PENDING_INSERTS", "200"))
+
+CHANNELS = ("aggregates", "activities")
+
+AGGREGATES_SQL = """
+    SELECT e.department, ea.week_number, COUNT(ea.id) AS activity_count,
+           SUM(ea.hours_worked) AS total_hours, SUM(ea.total_sales) AS total_sales,
+           SUM(ea.meetings_attended) AS total_meetings
+    FROM employee_activities ea
+    JOIN employees e ON e.id = ea.employee_id
+    {where}
+    GROUP BY e.department, ea.week_number
+"""
+
+Cell = Tuple[str, int]
+
+def aggregate_cells(db, weeks: Optional[List[int]] = None) -> Dict[Cell, Dict[str, Any]]:
+    """Department/week aggregate cells, optionally limited to some weeks"""
+    where, params = "", {}
+    if weeks is not None:
+        names = [f"w{i}" for i in range(len(weeks))]
+        where = f"WHERE ea.week_number IN ({', '.join(':' + name for name in names)})"
+        params = dict(zip(names, weeks))
+    rows = db.execute(text(AGGREGATES_SQL.format(where=where)), params).fetchall()
+    return {
+        (row.department, row.week_number): {
+            "department": row.department,
+            "week_number": row.week_number,
+            "activity_count": row.activity_count,
+            "total_hours": round(float(row.total_hours or 0), 2),
+            "total_sales": round(float(row.total_sales or 0), 2),
+            "total_meetings": int(row.total_meetings or 0),
+        }
+        for row in rows
+    }
+
+def _cell_key(cell: Cell) -> str:
+    return f"{cell[0]}|{cell[1]}"
+
+class LiveConnection:
+    """Per-connection coalescing buffer and throttled sender"""
+
+    def __init__(self, websocket: WebSocket, channels: Set[str]):
+        self.websocket = websocket
+        self.channels = channels
+        self.pending_cells: Dict[str, Optional[Dict[str, Any]]] = {}
+        self.pending_inserts: List[Dict[str, Any]] = []
+        self.overflowed = False
+        self.wakeup = asyncio.Event()
+        self.last_sent = 0.0
+        self.sent_messages = 0
+
+    def offer(self, cells: Dict[str, Optional[Dict[str, Any]]], inserts: List[Dict[str, Any]]):
+        """Merge an update into the pending one; never blocks"""
+        if "aggregates" in self.channels and cells:
+            self.pending_cells.update(cells)
+        if "activities" in self.channels and inserts:
+            room = LIVE_MAX_PENDING_INSERTS - len(self.pending_inserts)
+            if len(inserts) > room:
+                # Too far behind: tell the client to refetch rather than buffering without bound
+                self.overflowed = True
+                self.pending_inserts = []
+            else:
+                self.pending_inserts.extend(inserts)
+        if self.pending_cells or self.pending_inserts or self.overflowed:
+            self.wakeup.set()
+
+    def take(self) -> bytes:
+        message = {"type": "update", "aggregates": self.pending_cells, "inserted_activities": self.pending_inserts}
+        if self.overflowed:
+            message["resync"] = True
+        self.pending_cells, self.pending_inserts, self.overflowed = {}, [], False
+        return dumps(message)
+
+    async def send_loop(self):
+        while True:
+            await self.wakeup.wait()
+            # Throttle: let further updates coalesce until the interval has passed
+            delay = self.last_sent + LIVE_MIN_INTERVAL_SECONDS - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.wakeup.clear()
+            payload = self.take()
+            await asyncio.wait_for(self.websocket.send_bytes(payload), LIVE_SEND_TIMEOUT_SECONDS)
+            self.last_sent = time.monotonic()
+            self.sent_messages += 1
+
+class LiveHub:
+    """Polls the change feed once per worker and fans updates out to all connections"""
+
+    def __init__(self):
+        self.connections: Set[LiveConnection] = set()
+        self.cells: Dict[Cell, Dict[str, Any]] = {}
+        self.cursor: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+        self.stats = {"polls": 0, "broadcasts": 0, "dropped_slow_clients": 0}
+
+    def _load_snapshot(self) -> Tuple[int, Dict[Cell, Dict[str, Any]]]:
+        """(settled cursor, all aggregate cells); the poll picks up anything newer"""
+        db = SessionLocal()
+        try:
+            return settled_seq(db), aggregate_cells(db)
+        finally:
+            db.close()
+
+    def _poll(self, cursor: int, cells: Dict[Cell, Dict[str, Any]]):
+        """New changes since the cursor -> (new cursor, new cells, changed cells, inserted activity rows)
+
+        Runs in a worker thread, so it never touches the hub's state: the caller swaps
+        the returned cursor and cells in on the event loop.
+        """
+        log = models.ChangeLogEntry
+        db = SessionLocal()
+        try:
+            entries = db.execute(
+                select(log.seq, log.table_name, log.row_id, log.operation)
+                .where(log.seq > cursor, log.changed_at <= settled_before(db))
+                .order_by(log.seq)
+            ).all()
+            if not entries:
+                return cursor, cells, {}, []
+
+            activity_ids = {entry.row_id for entry in entries
+                            if entry.table_name == "employee_activities" and entry.operation in ("insert", "update")}
+            only_activity_writes = all(
+                entry.table_name == "employee_activities" and entry.operation in ("insert", "update")
+                for entry in entries
+            )
+            rows = []
+            if activity_ids:
+                a, e = models.EmployeeActivity, models.Employee
+                rows = db.execute(
+                    select(a.id, a.employee_id, e.full_name.label("employee_name"), e.department, a.week_number,
+                           a.hours_worked, a.total_sales, a.meetings_attended)
+                    .join(e).where(a.id.in_(activity_ids)).order_by(a.id)
+                ).mappings().all()
+            inserted_ids = {entry.row_id for entry in entries if entry.operation == "insert"}
+            inserts = [dict(row) for row in rows if row["id"] in inserted_ids]
+
+            # Recompute only the weeks we know were touched; deletes, employee edits and bulk writes recompute all
+            weeks = sorted({row["week_number"] for row in rows}) if only_activity_writes else None
+            fresh = aggregate_cells(db, weeks)
+        finally:
+            db.close()
+
+        scope = set(fresh) | {cell for cell in cells if weeks is None or cell[1] in weeks}
+        updated = dict(cells)
+        changed = {}
+        for cell in scope:
+            if fresh.get(cell) != cells.get(cell):
+                changed[_cell_key(cell)] = fresh.get(cell)  # None: the cell no longer exists
+                if cell in fresh:
+                    updated[cell] = fresh[cell]
+                else:
+                    updated.pop(cell, None)
+        return entries[-1].seq, updated, changed, inserts
+
+    async def _run(self):
+        # Every (re)start reloads the snapshot before new subscribers are answered,
+        # so a hub that sat idle never hands out stale cells
+        while self.connections and not self._ready.is_set():
+            try:
+                self.cursor, self.cells = await asyncio.to_thread(self._load_snapshot)
+                self._ready.set()
+            except Exception:
+                await asyncio.sleep(LIVE_POLL_SECONDS)  # database hiccup: try again
+        while self.connections:
+            await asyncio.sleep(LIVE_POLL_SECONDS)
+            self.stats["polls"] += 1
+            try:
+                cursor, cells, changed, inserts = await asyncio.to_thread(self._poll, self.cursor, self.cells)
+            except Exception:
+                continue  # database hiccup: try again next tick
+            # Swapped on the event loop, so serve() always sees a matching cursor and cells
+            self.cursor, self.cells = cursor, cells
+            if changed or inserts:
+                self.stats["broadcasts"] += 1
+                for connection in list(self.connections):
+                    connection.offer(changed, inserts)
+        self._task = None
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._ready = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def serve(self, websocket: WebSocket, channels: Set[str]):
+        await websocket.accept()
+        connection = LiveConnection(websocket, channels)
+        self.connections.add(connection)
+        self._ensure_running()
+        sender = None
+        try:
+            await self._ready.wait()
+            await asyncio.wait_for(websocket.send_bytes(dumps({
+                "type": "snapshot",
+                "cursor": self.cursor,
+                "aggregates": {_cell_key(cell): values for cell, values in self.cells.items()}
+                if "aggregates" in channels else {},
+            })), LIVE_SEND_TIMEOUT_SECONDS)
+            sender = asyncio.create_task(connection.send_loop())
+            receiver = asyncio.create_task(self._receive_until_closed(websocket))
+            done, _ = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            receiver.cancel()
+            if sender in done and isinstance(sender.exception(), asyncio.TimeoutError):
+                await self._drop_slow_client(websocket)
+        except asyncio.TimeoutError:
+            await self._drop_slow_client(websocket)  # never took the snapshot
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+        finally:
+            self.connections.discard(connection)
+            if sender is not None:
+                sender.cancel()
+
+    async def _drop_slow_client(self, websocket: WebSocket):
+        self.stats["dropped_slow_clients"] += 1
+        try:
+            await websocket.close(code=1013)  # try again later
+        except RuntimeError:
+            pass  # already closed
+
+    async def _receive_until_closed(self, websocket: WebSocket):
+        """Drain client messages (e.g. pings) until the client disconnects"""
+        try:
+            while True:
+                await websocket.receive_text()
+        except (WebSocketDisconnect, RuntimeError):
+            return
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"connections": len(self.connections), "cursor": self.cursor, **self.stats}
+
+live_hub = LiveHub()
+
+router = APIRouter()
+
+@router.websocket("/ws/live")
+async def live_updates(websocket: WebSocket, channels: str = ",".join(CHANNELS)):
+    """Push department/week aggregate changes and inserted activities as they happen"""
+    requested = {channel.strip() for channel in channels.split(",")} & set(CHANNELS)
+    await live_hub.serve(websocket, requested or set(CHANNELS))
+
+@router.get("/live/stats")
+def live_stats():
+    """Open live connections and hub counters for this worker"""
+    return live_hub.snapshot()
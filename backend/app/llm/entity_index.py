@@ -0,0 +1,278 @@
+"""
+In-process index of employee names, departments and job titles for resolving mentions.
+
+Users type "Wei Zang", "finance dept" or "sales mgr"; generated SQL then compares against
+a value that does not exist and returns no rows. Before a question reaches the templates
+or the LLM, mentions are resolved to the stored values and rewritten in place ("Wei Zhang",
+"Finance department", "Sales Manager"). Spans are matched longest first by:
+
+- exact: normalized text (lowercase, common abbreviations expanded) equals a value;
+- prefix: every word is a prefix of the value's word ("fin dept"), or a capitalized word
+  is the first name of exactly one employee ("Sarah");
+- fuzzy: character trigram (Dice) similarity above ENTITY_FUZZY_THRESHOLD, clearly ahead
+  of the runner-up, with the same number of words ("Wei Zang", "Sales Manger").
+
+Single everyday words are never resolved on their own: departments need a "department",
+"dept" or "team" suffix unless they span several words, and names and titles need at
+least two words (or a capitalized first name). Fuzzy matches to titles and departments
+need capitalized words, so "data analysis" stays as typed.
+"""
+import bisect
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+# Entity resolution configuration
+ENTITY_RESOLUTION_ENABLED = os.getenv("ENTITY_RESOLUTION_ENABLED", "true").lower() == "true"
+ENTITY_FUZZY_THRESHOLD = float(os.getenv("ENTITY_FUZZY_THRESHOLD", "0.6"))
+ENTITY_FUZZY_MARGIN = float(os.getenv("ENTITY_FUZZY_MARGIN", "0.1"))
+ENTITY_INDEX_REFRESH_SECONDS = float(os.getenv("ENTITY_INDEX_REFRESH_SECONDS", "300"))
+
+KINDS = ("employee", "department", "job_title")
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9]+(?:[-'&.][A-Za-z0-9]+)*")
+ABBREVIATIONS = {
+    "mgr": "manager", "mngr": "manager", "dept": "department", "depts": "department", "eng": "engineer",
+    "engr": "engineer", "dev": "developer", "sr": "senior", "jr": "junior", "asst": "assistant",
+    "exec": "executive", "rep": "representative", "reps": "representative", "admin": "administrator",
+    "sysadmin": "system administrator", "mktg": "marketing", "coord": "coordinator", "spec": "specialist",
+    "dir": "director", "biz": "business", "ops": "operations", "acct": "accountant", "mgmt": "management",
+    "bizdev": "business development", "ux": "ux", "swe": "software engineer",
+}
+DEPARTMENT_SUFFIXES = frozenset({"department", "team", "division", "group", "unit"})
+# Words that never start or end a prefix or fuzzy mention
+STOPWORDS = frozenset("""
+    a an the and or of in on at by for to from with without who whom whose what which when where why how
+    is are was were be been did do does has have had this that these those their his her its it all any
+    each every per most least top total average sum number count many much week weeks month year day
+    hours hour revenue meetings meeting worked work employee employees department team staff
+    list show give find compare between during last first highest lowest more less than did
+""".split())
+PREFIX_MAX_CANDIDATES = 50
+COMMON_TRIGRAM_SHARE = 0.1  # trigrams in more than this share of values are not informative
+
+def _tokens(question: str) -> List[Tuple[int, int, str, str]]:
+    """(start, end, raw, normalized) per word; abbreviations expand to their full form"""
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(question):
+        raw, end = match.group(0), match.end()
+        if raw.lower().endswith("'s"):
+            # Possessive: "Wei Zang's" mentions "Wei Zang"
+            raw, end = raw[:-2], end - 2
+        lowered = raw.lower().rstrip(".")
+        tokens.append((match.start(), end, raw, ABBREVIATIONS.get(lowered, lowered)))
+    return tokens
+
+def normalize(value: str) -> str:
+    return " ".join(token[3] for token in _tokens(value))
+
+def trigrams(value: str) -> frozenset:
+    padded = f" {value} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+class EntityIndex:
+    """Exact, prefix and trigram lookups over employee names, departments and job titles"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.loaded = False
+        self.loaded_at = 0.0
+        self.last_load_seconds = 0.0
+        self.resolved = 0
+        self._reset()
+
+    def _reset(self):
+        # value id -> (kind, canonical, normalized, trigram set)
+        self._values: List[Tuple[str, str, str, frozenset]] = []
+        self._value_ids: Dict[Tuple[str, str], int] = {}
+        self._exact: Dict[str, List[int]] = {}
+        self._sorted: List[Tuple[str, int]] = []
+        self._first_names: Dict[str, List[int]] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._vocabulary: Optional[frozenset] = None
+        self.max_words = 1
+
+    def _add(self, kind: str, canonical: Optional[str]):
+        if not canonical or (kind, canonical) in self._value_ids:
+            return
+        normalized = normalize(canonical)
+        if not normalized:
+            return
+        value_id = len(self._values)
+        grams = trigrams(normalized)
+        self._values.append((kind, canonical, normalized, grams))
+        self._value_ids[(kind, canonical)] = value_id
+        self._exact.setdefault(normalized, []).append(value_id)
+        bisect.insort(self._sorted, (normalized, value_id))
+        if kind == "employee":
+            self._first_names.setdefault(normalized.split()[0], []).append(value_id)
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(value_id)
+        self.max_words = max(self.max_words, len(normalized.split()))
+        self._vocabulary = None
+
+    def load(self, db):
+        """Build the index from the employees table"""
+        started = time.perf_counter()
+        rows = db.execute(text("SELECT full_name, department, job_title FROM employees")).fetchall()
+        with self._lock:
+            self._reset()
+            for full_name, department, job_title in rows:
+                self._add("employee", full_name)
+                self._add("department", department)
+                self._add("job_title", job_title)
+            self.loaded = True
+            self.loaded_at = time.time()
+            self.last_load_seconds = time.perf_counter() - started
+
+    def ensure_fresh(self, db):
+        """Load on first use and periodically, for employees added by other workers"""
+        if not self.loaded or time.time() - self.loaded_at > ENTITY_INDEX_REFRESH_SECONDS:
+            self.load(db)
+
+    def record_employee(self, employee):
+        """Index a committed employee insert"""
+        if not self.loaded:
+            return
+        with self._lock:
+            self._add("employee", employee.full_name)
+            self._add("department", employee.department)
+            self._add("job_title", employee.job_title)
+
+    def _allowed(self, value_id: int, words: int, suffixed: bool, capitalized: bool) -> bool:
+        kind = self._values[value_id][0]
+        if kind == "department":
+            return suffixed or words >= 2
+        return words >= 2 or (capitalized and kind == "job_title")
+
+    def _unique(self, value_ids, words: int, suffixed: bool, capitalized: bool) -> Optional[int]:
+        allowed = {value_id for value_id in value_ids if self._allowed(value_id, words, suffixed, capitalized)}
+        if suffixed and len(allowed) > 1:
+            allowed = {value_id for value_id in allowed if self._values[value_id][0] == "department"}
+        return allowed.pop() if len(allowed) == 1 else None
+
+    def _prefix(self, span: List[str], suffixed: bool, capitalized: bool, name_follows: bool) -> Optional[int]:
+        if len(span) == 1 and capitalized and not suffixed:
+            if name_follows:
+                return None  # "Wei Zang": the first name alone is not the mention
+            employees = self._first_names.get(span[0], [])
+            return employees[0] if len(employees) == 1 else None
+        if any(len(word) < 2 for word in span):
+            return None
+        start = bisect.bisect_left(self._sorted, (span[0], -1))
+        matches = []
+        for normalized, value_id in self._sorted[start:start + PREFIX_MAX_CANDIDATES + 1]:
+            if not normalized.startswith(span[0]):
+                break
+            words = normalized.split()
+            if len(words) == len(span) and all(word.startswith(part) for word, part in zip(words, span)):
+                matches.append(value_id)
+        return self._unique(matches, len(span), suffixed, capitalized) if len(matches) <= PREFIX_MAX_CANDIDATES \
+            else None
+
+    def _fuzzy(self, normalized: str, suffixed: bool, capitalized: bool) -> Optional[Tuple[int, float]]:
+        grams, words = trigrams(normalized), len(normalized.split())
+        # Candidates come from the rarer trigrams; the score uses all of them
+        common = max(PREFIX_MAX_CANDIDATES, int(len(self._values) * COMMON_TRIGRAM_SHARE))
+        candidates = set()
+        for gram in grams:
+            postings = self._postings.get(gram, ())
+            if len(postings) <= common:
+                candidates.update(postings)
+        scored = []
+        for value_id in candidates:
+            kind, _, value, candidate = self._values[value_id]
+            if len(value.split()) != words:
+                continue
+            if (kind == "department" and not (suffixed or capitalized)) or (kind == "job_title" and not capitalized):
+                continue
+            scored.append((2 * len(grams & candidate) / (len(grams) + len(candidate)), value_id))
+        scored.sort(reverse=True)
+        if not scored or scored[0][0] < ENTITY_FUZZY_THRESHOLD:
+            return None
+        if len(scored) > 1 and scored[0][0] - scored[1][0] < ENTITY_FUZZY_MARGIN:
+            return None
+        return scored[0][1], scored[0][0]
+
+    def _match(self, span_tokens, suffixed: bool, name_follows: bool) -> Optional[Tuple[int, str, float]]:
+        """(value id, method, score) for a span of words"""
+        span = [token[3] for token in span_tokens]
+        normalized = " ".join(span)
+        capitalized = all(token[2][:1].isupper() for token in span_tokens)
+        value_id = self._unique(self._exact.get(normalized, []), len(span), suffixed, capitalized)
+        if value_id is not None:
+            return value_id, "exact", 1.0
+        if span[0] in STOPWORDS or span[-1] in STOPWORDS:
+            return None
+        value_id = self._prefix(span, suffixed, capitalized, name_follows)
+        if value_id is not None:
+            return value_id, "prefix", 1.0
+        if len(normalized) >= 5 and (len(span) >= 2 or suffixed):
+            found = self._fuzzy(normalized, suffixed, capitalized)
+            if found is not None:
+                return found[0], "fuzzy", round(found[1], 3)
+        return None
+
+    def resolve(self, question: str) -> Tuple[str, List[Dict[str, Any]]]:
+        """Question with entity mentions rewritten to stored values, and what was rewritten"""
+        if not self.loaded:
+            return question, []
+        tokens = _tokens(question)
+        pieces, resolutions, position, i = [], [], 0, 0
+        with self._lock:
+            while i < len(tokens):
+                for length in range(min(self.max_words, len(tokens) - i), 0, -1):
+                    following = tokens[i + length] if i + length < len(tokens) else None
+                    # "finance dept" but not "'Finance' department": only whitespace before the suffix
+                    suffixed = following is not None and following[3] in DEPARTMENT_SUFFIXES and \
+                        not question[tokens[i + length - 1][1]:following[0]].strip()
+                    name_follows = following is not None and following[2][:1].isupper()
+                    found = self._match(tokens[i:i + length], suffixed, name_follows)
+                    if found is None:
+                        continue
+                    value_id, method, score = found
+                    kind, canonical = self._values[value_id][:2]
+                    end = tokens[i + length - 1][1]
+                    replacement = canonical
+                    if kind == "department" and suffixed:
+                        end, replacement = tokens[i + length][1], f"{canonical} department"
+                    mention = question[tokens[i][0]:end]
+                    if mention != replacement:
+                        pieces += [question[position:tokens[i][0]], replacement]
+                        position = end
+                        resolutions.append({"mention": mention, "value": canonical, "kind": kind,
+                                            "method": method, "score": score})
+                    i += length + (1 if kind == "department" and suffixed else 0)
+                    break
+                else:
+                    i += 1
+            self.resolved += len(resolutions)
+        if not resolutions:
+            return question, []
+        return "".join(pieces) + question[position:], resolutions
+
+    def vocabulary(self) -> frozenset:
+        """Normalized words of every indexed name, department and job title"""
+        with self._lock:
+            if self._vocabulary is None:
+                self._vocabulary = frozenset(word for value in self._values for word in value[2].split())
+            return self._vocabulary
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = Counter(value[0] for value in self._values)
+            return {
+                "enabled": ENTITY_RESOLUTION_ENABLED,
+                "loaded": self.loaded,
+                **{f"{kind}s": counts.get(kind, 0) for kind in KINDS},
+                "trigrams": len(self._postings),
+                "last_load_seconds": self.last_load_seconds,
+                "resolved_mentions": self.resolved,
+            }
+
+# Process-wide index shared by all requests in this worker
+entity_index = EntityIndex()
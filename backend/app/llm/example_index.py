@@ -0,0 +1,212 @@
+"""
+In-process similarity index of known-good (question, SQL) pairs.
+
+Questions are embedded locally as signed hashed word and character n-gram vectors
+(NumPy only, no model download or network call) and compared by cosine similarity.
+The index serves two purposes:
+
+- few-shot retrieval: the k nearest examples replace the static EXAMPLES block of the
+  system prompt, so the model sees patterns relevant to the question at hand;
+- a near-duplicate cache: a question whose nearest example is a very close paraphrase
+  with the same content words and literals (names, numbers, metrics) reuses that SQL.
+
+Only the reference queries and SQL whose result was checked against a reference answer
+are stored; SQL that merely ran could be wrong and would then be served to paraphrases.
+Seeded reference pairs are never replaced or evicted.
+"""
+import os
+import re
+import threading
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .entity_index import entity_index
+
+# Few-shot and semantic cache configuration
+FEW_SHOT_ENABLED = os.getenv("FEW_SHOT_ENABLED", "true").lower() == "true"
+FEW_SHOT_K = int(os.getenv("FEW_SHOT_K", "2"))
+FEW_SHOT_MIN_SIMILARITY = float(os.getenv("FEW_SHOT_MIN_SIMILARITY", "0.3"))
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85"))
+EXAMPLE_INDEX_CAPACITY = int(os.getenv("EXAMPLE_INDEX_CAPACITY", "2000"))
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "1024"))
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+# Values the SQL depends on: numbers and dates, quoted strings
+LITERAL_PATTERN = re.compile(r"\d+(?:[-/.]\d+)*|'[^']+'|\"[^\"]+\"")
+# Words that flip the meaning of an otherwise identical question
+POLARITY_WORDS = frozenset({
+    "most", "least", "highest", "lowest", "top", "bottom", "best", "worst", "fewest",
+    "more", "less", "fewer", "above", "below", "over", "under", "not", "no", "without",
+    "before", "after", "first", "last", "total", "average", "count", "sum", "minimum", "maximum",
+})
+# Metrics and columns: "total sales" and "total hours" are different queries
+SCHEMA_WORDS = frozenset({
+    "hours", "hour", "worked", "sales", "revenue", "meetings", "meeting", "attended", "activities", "activity",
+    "week", "weeks", "employee", "employees", "department", "departments", "dept", "team", "teams",
+    "title", "titles", "job", "role", "roles", "name", "names", "email", "hire", "hired", "date",
+})
+# Filler a paraphrase adds or drops without changing the SQL
+STOPWORDS = frozenset({
+    "a", "an", "the", "of", "in", "on", "at", "for", "to", "from", "with", "during", "is", "are", "was",
+    "were", "be", "been", "do", "does", "did", "has", "have", "had", "who", "which", "what", "me", "us",
+    "show", "list", "give", "find", "tell", "please",
+})
+
+def _normalize(question: str) -> str:
+    return " ".join(question.lower().split())
+
+def _words(question: str) -> List[str]:
+    return [word[:-2] if word.endswith("'s") else word for word in WORD_PATTERN.findall(question.lower())]
+
+def literals(question: str, vocabulary: frozenset = frozenset()) -> frozenset:
+    """Numbers, quoted values, metrics and known names a cached SQL answer would have baked in
+
+    Case-insensitive; `vocabulary` holds the words of known employee names, departments
+    and job titles.
+    """
+    found = {match.strip("'\"") for match in LITERAL_PATTERN.findall(question.lower())}
+    found.update(word for word in _words(question)
+                 if word in POLARITY_WORDS or word in SCHEMA_WORDS or word in vocabulary)
+    return frozenset(found)
+
+def content_words(question: str) -> frozenset:
+    """Lowercase words other than filler; paraphrases sharing SQL must have the same set"""
+    return frozenset(word for word in _words(question) if word not in STOPWORDS)
+
+def embed(text: str, dimensions: int = EMBEDDING_DIMENSIONS) -> np.ndarray:
+    """Unit-length hashed bag of words, word bigrams and character 3-grams"""
+    words = WORD_PATTERN.findall(text.lower())
+    features = list(words)
+    features += [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"#{word}#"
+        features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+    vector = np.zeros(dimensions, dtype=np.float32)
+    if not features:
+        return vector
+    hashes = np.array([zlib.crc32(feature.encode("utf-8")) for feature in features], dtype=np.uint32)
+    # Low bits pick the bucket, the top bit the sign, so collisions tend to cancel out
+    signs = np.where(hashes >> 31, -1.0, 1.0).astype(np.float32)
+    np.add.at(vector, (hashes % dimensions).astype(np.int64), signs)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+class ExampleIndex:
+    """Bounded in-memory index of known-good (question, SQL) pairs per dialect"""
+
+    def __init__(self, capacity: int = EXAMPLE_INDEX_CAPACITY, dimensions: int = EMBEDDING_DIMENSIONS):
+        self.capacity = capacity
+        self.dimensions = dimensions
+        self._vectors = np.zeros((min(capacity, 64), dimensions), dtype=np.float32)
+        self._keys: List[Tuple[str, str]] = []  # (dialect, normalized question) per slot
+        self._questions: List[str] = []
+        self._sql: List[str] = []
+        self._content: List[frozenset] = []
+        self._seeded: List[bool] = []
+        self._positions = {}
+        self._oldest = 0  # next slot to overwrite once full
+        self._lock = threading.Lock()
+        self.stats = {"added": 0, "semantic_hits": 0, "semantic_misses": 0, "retrievals": 0}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, question: str, sql: str, dialect: str, seeded: bool = False):
+        """Store a reference or verified question and its SQL; a seeded pair is never replaced"""
+        key = (dialect, _normalize(question))
+        vector = embed(question, self.dimensions)
+        with self._lock:
+            slot = self._positions.get(key)
+            if slot is not None:
+                if seeded or not self._seeded[slot]:
+                    self._sql[slot], self._seeded[slot] = sql, seeded
+                return
+            if len(self._keys) < self.capacity:
+                slot = len(self._keys)
+                if slot == len(self._vectors):
+                    grown = np.zeros((min(self.capacity, 2 * slot), self.dimensions), dtype=np.float32)
+                    grown[:slot] = self._vectors
+                    self._vectors = grown
+                self._keys.append(key)
+                self._questions.append(question)
+                self._sql.append(sql)
+                self._content.append(content_words(question))
+                self._seeded.append(seeded)
+            else:
+                # Full: overwrite the oldest example that was not seeded
+                for offset in range(self.capacity):
+                    slot = (self._oldest + offset) % self.capacity
+                    if not self._seeded[slot]:
+                        break
+                else:
+                    return
+                self._oldest = (slot + 1) % self.capacity
+                del self._positions[self._keys[slot]]
+                self._keys[slot], self._questions[slot], self._sql[slot] = key, question, sql
+                self._content[slot], self._seeded[slot] = content_words(question), seeded
+            self._vectors[slot] = vector
+            self._positions[key] = slot
+            self.stats["added"] += 1
+
+    def _nearest(self, question: str, dialect: str, k: int, exclude_self: bool) -> List[Tuple[float, int]]:
+        """(similarity, slot) of the k nearest examples in `dialect` (caller holds the lock)"""
+        if not self._keys:
+            return []
+        normalized = _normalize(question)
+        scores = self._vectors[:len(self._keys)] @ embed(question, self.dimensions)
+        results = []
+        for slot in np.argsort(-scores):
+            key = self._keys[slot]
+            if key[0] != dialect or (exclude_self and key[1] == normalized):
+                continue
+            results.append((float(scores[slot]), int(slot)))
+            if len(results) == k:
+                break
+        return results
+
+    def search(self, question: str, dialect: str, k: int, exclude_self: bool = True
+               ) -> List[Tuple[float, str, str]]:
+        """The k most similar (similarity, question, SQL) examples in `dialect`"""
+        with self._lock:
+            return [(score, self._questions[slot], self._sql[slot])
+                    for score, slot in self._nearest(question, dialect, k, exclude_self)]
+
+    def few_shot(self, question: str, dialect: str, k: int = FEW_SHOT_K) -> List[Tuple[str, str]]:
+        """(question, SQL) examples worth showing the model for this question"""
+        with self._lock:
+            self.stats["retrievals"] += 1
+        return [(q, sql) for score, q, sql in self.search(question, dialect, k)
+                if score >= FEW_SHOT_MIN_SIMILARITY]
+
+    def near_duplicate(self, question: str, dialect: str,
+                       threshold: float = SEMANTIC_CACHE_THRESHOLD) -> Optional[str]:
+        """SQL of a stored paraphrase of `question`, if one is close enough to reuse"""
+        vocabulary = entity_index.vocabulary()
+        words = content_words(question)
+        with self._lock:
+            hit = None
+            for score, slot in self._nearest(question, dialect, 1, exclude_self=False):
+                # Similar wording is not enough: the same content words, names, numbers,
+                # metrics and direction must appear, in any case
+                if score >= threshold and self._content[slot] == words and \
+                        literals(self._questions[slot], vocabulary) == literals(question, vocabulary):
+                    hit = self._sql[slot]
+            self.stats["semantic_hits" if hit is not None else "semantic_misses"] += 1
+            return hit
+
+    def snapshot(self):
+        with self._lock:
+            return {"examples": len(self._keys), "capacity": self.capacity,
+                    "memory_bytes": int(self._vectors.nbytes), **self.stats}
+
+def seed_examples(pairs, dialect: str) -> int:
+    """Load known-good (question, SQL) pairs, e.g. the reference queries"""
+    for question, sql in pairs:
+        example_index.add(question, sql, dialect, seeded=True)
+    return len(pairs)
+
+# Process-wide index shared by all requests in this worker
+example_index = ExampleIndex()
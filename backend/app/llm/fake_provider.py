@@ -0,0 +1,163 @@
+"""
+Local stand-in for the OpenAI client, used for load tests and scheduler verification.
+
+Enable it with LLM_PROVIDER=fake. It answers reference questions with their
+canonical SQL and can inject latency, 429s/5xx errors and a requests/min limit.
+
+Run `python -m app.llm.fake_provider` to exercise the scheduler against it.
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+
+from ..db.reference_queries import REFERENCE_QUERIES
+
+FAKE_LLM_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "0.05"))
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+FAKE_LLM_ERROR_STATUS = int(os.getenv("FAKE_LLM_ERROR_STATUS", "500"))
+FAKE_LLM_RATE_LIMIT_PER_MINUTE = int(os.getenv("FAKE_LLM_RATE_LIMIT_PER_MINUTE", "0"))
+
+DEFAULT_SQL = "SELECT COUNT(*) AS total_employees FROM employees"
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+REFERENCE_SQL = {_normalize(question): sql for question, sql in REFERENCE_QUERIES}
+
+class FakeAPIError(Exception):
+    """Provider error carrying a status code and optional Retry-After header, like openai.APIStatusError"""
+
+    def __init__(self, status_code: int, message: str, retry_after: float = None):
+        super().__init__(f"Error code: {status_code} - {message}")
+        self.status_code = status_code
+        headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+class FakeLLMClient:
+    """Mimics `client.chat.completions.create` with configurable latency and failures"""
+
+    def __init__(
+        self,
+        latency_seconds: float = FAKE_LLM_LATENCY_SECONDS,
+        error_rate: float = FAKE_LLM_ERROR_RATE,
+        error_status: int = FAKE_LLM_ERROR_STATUS,
+        rate_limit_per_minute: int = FAKE_LLM_RATE_LIMIT_PER_MINUTE,
+    ):
+        self.latency_seconds = latency_seconds
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit_per_minute = rate_limit_per_minute
+        self.calls = 0
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def _check_rate_limit(self):
+        if not self.rate_limit_per_minute:
+            return
+        with self._lock:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] >= 60:
+                self._recent.popleft()
+            if len(self._recent) >= self.rate_limit_per_minute:
+                raise FakeAPIError(429, "Rate limit reached for requests", retry_after=60 - (now - self._recent[0]))
+            self._recent.append(now)
+
+    def create(self, model, messages, temperature=None, max_tokens=None, timeout=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+        self._check_rate_limit()
+        if self.error_rate and random.random() < self.error_rate:
+            raise FakeAPIError(self.error_status, "Injected provider error")
+        if timeout is not None and self.latency_seconds > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("Request timed out.")
+        time.sleep(self.latency_seconds)
+
+        question = messages[-1]["content"]
+        sql = REFERENCE_SQL.get(_normalize(question), DEFAULT_SQL)
+        content = f"<sql>{sql}</sql>"
+        prompt_tokens = sum(len(message["content"]) for message in messages) // 4
+        completion_tokens = len(content) // 4
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            ),
+        )
+
+def _burst(scheduler, client, calls: int, priority: int):
+    """Fire `calls` concurrent requests through the scheduler and tally outcomes"""
+    outcomes = {}
+    lock = threading.Lock()
+
+    def worker():
+        messages = [{"role": "user", "content": REFERENCE_QUERIES[0][0]}]
+        try:
+            scheduler.call(
+                lambda timeout: client.chat.completions.create(model="fake", messages=messages, timeout=timeout),
+                priority=priority,
+                estimated_tokens=100,
+            )
+            outcome = "ok"
+        except Exception as e:
+            outcome = type(e).__name__
+        with lock:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    threads = [threading.Thread(target=worker) for _ in range(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+if __name__ == "__main__":
+    from .scheduler import LLMScheduler, PRIORITY_INTERACTIVE
+
+    print("1. Burst of 40 calls against a provider limited to 20 requests/min (Retry-After beyond the 2s budget fails fast)")
+    scheduler = LLMScheduler(requests_per_minute=600, max_concurrency=4, queue_timeout_seconds=2,
+                             backoff_base_seconds=0.05, breaker_threshold=100)
+    started = time.perf_counter()
+    print("   outcomes:", _burst(scheduler, FakeLLMClient(latency_seconds=0.02, rate_limit_per_minute=20), 40, PRIORITY_INTERACTIVE))
+    print(f"   elapsed {time.perf_counter() - started:.2f}s, scheduler {scheduler.snapshot()}")
+
+    print("2. Provider returning 503 on every call: breaker opens and later calls fail fast")
+    scheduler = LLMScheduler(max_concurrency=4, max_retries=2, backoff_base_seconds=0.01,
+                             breaker_threshold=5, breaker_cooldown_seconds=30)
+    started = time.perf_counter()
+    print("   outcomes:", _burst(scheduler, FakeLLMClient(latency_seconds=0.01, error_rate=1.0, error_status=503), 20, PRIORITY_INTERACTIVE))
+    print(f"   elapsed {time.perf_counter() - started:.2f}s, scheduler {scheduler.snapshot()}")
+
+    print("3. Per-call timeout: provider slower than the 0.1s budget")
+    scheduler = LLMScheduler(timeout_seconds=0.1, max_retries=1, backoff_base_seconds=0.01)
+    print("   outcomes:", _burst(scheduler, FakeLLMClient(latency_seconds=1.0), 2, PRIORITY_INTERACTIVE))
+    print(f"   scheduler {scheduler.snapshot()}")
+
+    print("4. Priority: with one slot busy, a later interactive call overtakes queued batch calls")
+    from .scheduler import PRIORITY_BATCH
+    scheduler = LLMScheduler(max_concurrency=1)
+    client = FakeLLMClient(latency_seconds=0.05)
+    order = []
+
+    def tagged(tag, priority):
+        messages = [{"role": "user", "content": tag}]
+        scheduler.call(lambda timeout: client.chat.completions.create(model="fake", messages=messages, timeout=timeout),
+                       priority=priority)
+        order.append(tag)
+
+    threads = [threading.Thread(target=tagged, args=(f"batch-{i}", PRIORITY_BATCH)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.005)
+    threads.append(threading.Thread(target=tagged, args=("interactive", PRIORITY_INTERACTIVE)))
+    threads[-1].start()
+    for thread in threads:
+        thread.join()
+    print("   completion order:", order)
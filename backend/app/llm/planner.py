@@ -0,0 +1,115 @@
+"""
+Splits compound questions into independent sub-questions.
+
+Each sub-question is small enough to hit the translation cache, the columnar fast
+path or the fast model on its own, and the parts can run concurrently, so a compound
+question costs about as much as its slowest part instead of one large generated
+statement (plus its retries). Splitting is rule based, with no extra LLM call:
+
+- "Compare the hours worked by 'A' and 'B' during week 1"
+    -> "What were the hours worked by 'A' during week 1?" and the same for 'B';
+- "What is the total hours worked and average sales revenue for employees in Sales?"
+    -> one question per aggregate, each with the shared scope;
+- "Who worked the most hours in week 1 and who attended the most meetings?"
+    -> the two questions, split at the second question word (but not "employees who
+       worked ... and who attended ...", where both clauses describe the same rows).
+
+Questions that match none of these are left alone.
+"""
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+# Decomposition configuration
+QUERY_DECOMPOSITION_ENABLED = os.getenv("QUERY_DECOMPOSITION_ENABLED", "false").lower() == "true"
+DECOMPOSITION_MAX_PARTS = int(os.getenv("DECOMPOSITION_MAX_PARTS", "4"))
+DECOMPOSITION_MAX_WORKERS = int(os.getenv("DECOMPOSITION_MAX_WORKERS", "8"))
+
+# Quoted, or capitalized words (case-sensitive even inside IGNORECASE patterns)
+ENTITY = r"(?:'[^']+'|\"[^\"]+\"|(?-i:[A-Z][\w-]*(?: [A-Z][\w-]*)*))"
+SCOPE = r"(?:in|during|for|on|over|across|within) .+"
+
+COMPARE_PATTERN = re.compile(
+    rf"^compare\s+(?:the\s+)?(?:(?P<metric>.+?)\s+(?P<preposition>of|by|for|between)\s+)?(?:the\s+)?"
+    rf"(?P<entities>{ENTITY}(?:\s*,\s*{ENTITY})*\s*,?\s+(?:and|with|vs\.?|versus)\s+{ENTITY})"
+    rf"(?:\s+(?P<noun>departments|teams))?(?:\s+(?P<scope>{SCOPE}?))?\s*[.?!]?$",
+    re.IGNORECASE,
+)
+ENTITY_SPLIT = re.compile(r"\s*,\s*(?:and\s+)?|\s+(?:and|with|vs\.?|versus)\s+", re.IGNORECASE)
+
+AGGREGATE = r"(?:total|average|avg|mean|sum|number|count|maximum|minimum|max|min|highest|lowest)\b"
+AGGREGATES_PATTERN = re.compile(
+    rf"^(?P<lead>(?:what|how much|how many)\s+(?:is|are|was|were)\s+(?:the\s+)?)"
+    rf"(?P<first>{AGGREGATE}.+?)\s+and\s+(?:the\s+)?(?P<second>{AGGREGATE}.+?)\s+(?P<scope>(?:for|of|by|among)\s.+)$",
+    re.IGNORECASE,
+)
+
+QUESTION_WORD = r"(?:who|what|which|how|when|where|list|show)\b"
+CONJOINED_PATTERN = re.compile(rf"\s*(?:[,;]\s*|\s)(?:and|also)\s+(?={QUESTION_WORD})", re.IGNORECASE)
+INTERROGATIVE_START = re.compile(r"^\s*(?:who|what|which|how|when|where)\b", re.IGNORECASE)
+RELATIVE_START = re.compile(r"^\s*(?:who|which|whose|that)\b", re.IGNORECASE)
+RELATIVE_WORD = re.compile(r"\b(?:who|which|whose|that)\b", re.IGNORECASE)
+SENTENCE_PATTERN = re.compile(r"(?<=[?])\s+(?=[A-Z])")
+# A part that refers back to another ("what did they propose", "and when") cannot run on its own
+DEPENDENT_PATTERN = re.compile(r"\b(?:they|them|their|those|these|he|she|his|her|it|its|that one)\b", re.IGNORECASE)
+MIN_PART_WORDS = 3
+
+def _question(text: str) -> str:
+    text = " ".join(text.split()).rstrip(" .?!")
+    return text[0].upper() + text[1:] + "?"
+
+def _compare(question: str) -> Optional[List[str]]:
+    match = COMPARE_PATTERN.match(question)
+    if not match:
+        return None
+    entities = [entity for entity in ENTITY_SPLIT.split(match.group("entities")) if entity]
+    metric = match.group("metric") or "hours worked, total sales and meetings attended"
+    preposition = match.group("preposition") if match.group("preposition") in ("by", "for") else "of"
+    scope = f" {match.group('scope')}" if match.group("scope") else ""
+    if match.group("noun"):
+        # "the Sales and Marketing departments" -> "the Sales department", "the Marketing department"
+        entities = [f"the {entity} {match.group('noun')[:-1].lower()}" for entity in entities]
+    return [_question(f"What were the {metric} {preposition} {entity}{scope}") for entity in entities]
+
+def _aggregates(question: str) -> Optional[List[str]]:
+    match = AGGREGATES_PATTERN.match(question.strip().rstrip("?."))
+    if not match:
+        return None
+    lead, scope = match.group("lead"), match.group("scope")
+    return [_question(f"{lead}{match.group(part)} {scope}") for part in ("first", "second")]
+
+def _continues_clause(left: str, right: str) -> bool:
+    """Whether `right` ("who attended ...") adds to a clause of `left` rather than asking anew"""
+    if not RELATIVE_START.match(right):
+        return False
+    if not INTERROGATIVE_START.match(left):
+        return True  # "List employees in week 1 and who attended ...": the left part asks no question itself
+    # "Which are the employees who worked ... and who attended ...": both describe the same head noun
+    return bool(RELATIVE_WORD.search(left.split(None, 1)[-1]))
+
+def _conjoined(question: str) -> Optional[List[str]]:
+    parts = []
+    for text in SENTENCE_PATTERN.split(question.strip()):
+        clauses = CONJOINED_PATTERN.split(text)
+        for index, clause in enumerate(clauses):
+            if index and _continues_clause(clauses[index - 1], clause):
+                return None
+        parts += clauses
+    # Strip what _question strips, so a part of punctuation only ("! and what ...") is dropped
+    parts = [part for part in parts if part.strip(" .?!")]
+    if len(parts) < 2 or any(len(part.split()) < MIN_PART_WORDS for part in parts) or \
+            any(DEPENDENT_PATTERN.search(part) for part in parts[1:]):
+        return None
+    return [_question(part) for part in parts]
+
+def decompose(question: str) -> Optional[List[str]]:
+    """Independent sub-questions of a compound question, or None to answer it as a whole"""
+    for rule in (_compare, _aggregates, _conjoined):
+        parts = rule(question)
+        if parts and 1 < len(parts) <= DECOMPOSITION_MAX_PARTS:
+            return parts
+    return None
+
+# Sub-questions run on these threads, each with its own session and pooled connection
+planner_executor = ThreadPoolExecutor(max_workers=DECOMPOSITION_MAX_WORKERS, thread_name_prefix="subquery")
@@ -1,16 +1,145 @@
-from openai import OpenAI
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from ..db.database import DIALECT
+from .scheduler import scheduler, LLMUnavailableError, PRIORITY_INTERACTIVE
+from .router import MODEL_TIERS, route_query
+from .translation_store import get_store, fingerprint, version_hash, schema_version
+from .usage_ledger import usage_ledger
+from .example_index import example_index, FEW_SHOT_ENABLED, SEMANTIC_CACHE_ENABLED
 
-client = OpenAI()
+# LLM provider: "openai" (default) or "fake" for local load tests
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai").lower()
 
-def process_query(query: str) -> str:
-    """Process natural language query and return SQL"""
-    
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {
-                "role": "system",
-                "content": """You are a PostgreSQL SQL expert. Generate PostgreSQL-compatible SQL queries only.
+# Maximum number of question -> LLM response translations kept in memory
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "512"))
+
+_client = None
+_client_lock = threading.Lock()
+
+_translation_cache = OrderedDict()
+_translation_lock = threading.Lock()
+
+def get_client():
+    """Create the OpenAI client on first use instead of at import time"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                if LLM_PROVIDER == "fake":
+                    from .fake_provider import FakeLLMClient
+                    _client = FakeLLMClient()
+                else:
+                    # Importing openai is slow, so it happens here rather than at module import.
+                    # Retries are owned by the scheduler, so the SDK's own are disabled.
+                    from openai import OpenAI
+                    _client = OpenAI(max_retries=0)
+    return _client
+
+def normalize_question(query: str) -> str:
+    """Normalize case and whitespace so trivially different questions share a cache entry"""
+    return " ".join(query.lower().split())
+
+def get_cached_translation(query: str, dialect: str = DIALECT):
+    """Return a cached LLM response for the question from memory or the shared store, if any"""
+    normalized = normalize_question(query)
+    key = (dialect, normalized)
+    with _translation_lock:
+        content = _translation_cache.get(key)
+        if content is not None:
+            _translation_cache.move_to_end(key)
+            return content
+
+    store = get_store()
+    if store is None:
+        return None
+    try:
+        content = store.get(fingerprint(dialect, normalized), prompt_version(dialect), schema_version())
+    except sqlite3.Error:
+        return None
+    if content is not None:
+        _remember(key, content)
+    return content
+
+def _remember(key, content: str):
+    """Insert into the in-process LRU cache"""
+    with _translation_lock:
+        _translation_cache[key] = content
+        _translation_cache.move_to_end(key)
+        while len(_translation_cache) > TRANSLATION_CACHE_SIZE:
+            _translation_cache.popitem(last=False)
+
+def cache_translation(query: str, content: str, dialect: str = DIALECT, model: str = None,
+                      persist: bool = True):
+    """Remember an LLM response that contains extractable SQL, in memory and in the shared store"""
+    if not content or "</sql>" not in content:
+        return
+    normalized = normalize_question(query)
+    _remember((dialect, normalized), content)
+
+    store = get_store()
+    if not persist or store is None:
+        return
+    try:
+        store.put(fingerprint(dialect, normalized), prompt_version(dialect), schema_version(),
+                  dialect, query, content, model)
+    except sqlite3.Error:
+        pass  # The store is an optimization; a failed write only costs a later miss
+
+def evict_translation(query: str, dialect: str = DIALECT):
+    """Forget a cached response that turned out not to work"""
+    normalized = normalize_question(query)
+    with _translation_lock:
+        _translation_cache.pop((dialect, normalized), None)
+    store = get_store()
+    if store is not None:
+        try:
+            store.delete(fingerprint(dialect, normalized))
+        except sqlite3.Error:
+            pass
+
+def load_translation_store(dialect: str = DIALECT) -> int:
+    """Purge entries from older prompt or schema versions and bulk-load the rest into memory"""
+    store = get_store()
+    if store is None:
+        return 0
+    current_prompt, current_schema = prompt_version(dialect), schema_version()
+    store.purge_stale(current_prompt, current_schema)
+    rows = store.load_current(current_prompt, current_schema, TRANSLATION_CACHE_SIZE)
+    # Least used first, so the most used entries end up most recent in the LRU
+    for row_dialect, question, content in reversed(rows):
+        _remember((row_dialect, normalize_question(question)), content)
+    return len(rows)
+
+def preload_translations(pairs, dialect: str = DIALECT) -> int:
+    """Seed the translation cache with known (question, SQL) pairs"""
+    for question, sql in pairs:
+        cache_translation(question, f"<sql>{sql}</sql>", dialect, persist=False)
+    return len(pairs)
+
+DIALECT_NAMES = {
+    "postgresql": "PostgreSQL",
+    "sqlite": "SQLite",
+    "duckdb": "DuckDB",
+}
+
+# Case-insensitive pattern operator per dialect (SQLite LIKE is case-insensitive for ASCII)
+CASE_INSENSITIVE_LIKE = {
+    "postgresql": "ILIKE",
+    "sqlite": "LIKE",
+    "duckdb": "ILIKE",
+}
+
+DIALECT_NOTES = {
+    "sqlite": """
+   - SQLite has no ILIKE; LIKE is already case-insensitive
+   - Dates are stored as 'YYYY-MM-DD' text; compare them with string literals""",
+}
+
+SYSTEM_PROMPT_TEMPLATE = """You are a {dialect_name} SQL expert. Generate {dialect_name}-compatible SQL queries only.
 
 Database Schema:
         
@@ -25,7 +154,8 @@ Table: employees
 Table: employee_activities  
 - id (INTEGER, PRIMARY KEY)
 - employee_id (INTEGER, FOREIGN KEY to employees.id)
-- week_number (INTEGER, 1-10)
+- week_number (INTEGER) - consecutive weeks, week 1 starts 2024-08-26
+- week_start (DATE) - first day of the activity's week
 - hours_worked (DECIMAL)
 - total_sales (DECIMAL) - in RMB (NULL for non-sales roles)
 - meetings_attended (INTEGER)
@@ -43,15 +173,16 @@ CRITICAL RULES FOR ACCURACY:
    - Week 2: 2024-09-02 to 2024-09-08 (first week of September)
    - For "week starting on YYYY-MM-DD", find week where start_date <= date <= end_date
    - For "first week of September 2024", use week containing September 1st
+   - For ranges of dates, months or years, filter on ea.week_start (e.g. ea.week_start >= '2024-09-01') instead of joining calendar_weeks
 
 2. NULL VALUE HANDLING:
    - ALWAYS filter out NULL sales with "WHERE total_sales IS NOT NULL" when ordering by sales
    - Use COALESCE() for aggregations to handle NULLs properly
 
 3. TEXT SEARCH PATTERNS:
-   - For "customer retention", use: activities ILIKE '%retention%' (single condition)
+   - For "customer retention", use: activities {like} '%retention%' (single condition)
    - Don't require multiple keywords with AND - use OR for flexibility
-   - Use ILIKE for case-insensitive matching
+   - Use {like} for case-insensitive matching{dialect_notes}
 
 4. DATE RANGE QUERIES:
    - "Industry recession" = full year 2023: hire_date >= '2023-01-01' AND hire_date <= '2023-12-31'
@@ -69,18 +200,130 @@ EXAMPLES:
 - "Week starting 2024-08-28" → WHERE cw.start_date <= '2024-08-28' AND cw.end_date >= '2024-08-28'
 - "First week of September 2024" → WHERE cw.start_date <= '2024-09-01' AND cw.end_date >= '2024-09-01'
 - "Highest sales revenue" → WHERE total_sales IS NOT NULL ORDER BY total_sales DESC LIMIT 1
-- "Customer retention" → WHERE activities ILIKE '%retention%'
+- "Customer retention" → WHERE activities {like} '%retention%'
 - "Recession hires" → WHERE hire_date >= '2023-01-01' AND hire_date <= '2023-12-31'
 
 Generate the SQL query to answer the following question. Put the SQL query between <sql> and </sql>"""
-            },
-            {
-                "role": "user",
-                "content": query
-            }
-        ],
-        temperature=0.1,
-        max_tokens=2048
+
+@lru_cache(maxsize=None)
+def build_system_prompt(dialect: str = DIALECT) -> str:
+    """Render the system prompt for the given SQL dialect"""
+    return SYSTEM_PROMPT_TEMPLATE.format(
+        dialect_name=DIALECT_NAMES.get(dialect, "ANSI"),
+        like=CASE_INSENSITIVE_LIKE.get(dialect, "LIKE"),
+        dialect_notes=DIALECT_NOTES.get(dialect, ""),
+    )
+
+@lru_cache(maxsize=None)
+def _prompt_parts(dialect: str):
+    """(rules, static examples, closing instruction) of the rendered system prompt"""
+    prompt = build_system_prompt(dialect)
+    rules, _, rest = prompt.partition("\nEXAMPLES:\n")
+    examples, _, closing = rest.partition("\n\nGenerate the SQL query")
+    return rules, examples, "Generate the SQL query" + closing
+
+def system_prompt_for(query: str, dialect: str = DIALECT) -> str:
+    """System prompt with the stored examples nearest to `query` in place of the static ones"""
+    if not FEW_SHOT_ENABLED:
+        return build_system_prompt(dialect)
+    examples = example_index.few_shot(query, dialect)
+    if not examples:
+        return build_system_prompt(dialect)
+    rules, _, closing = _prompt_parts(dialect)
+    lines = "\n".join(f'- "{question}" → {" ".join(sql.split())}' for question, sql in examples)
+    return f"{rules}\nEXAMPLES:\n{lines}\n\n{closing}"
+
+@lru_cache(maxsize=None)
+def prompt_version(dialect: str = DIALECT) -> str:
+    """Version of the rendered system prompt; stored translations are only valid under the same one"""
+    return version_hash(build_system_prompt(dialect))
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough token count (about four characters per token) for rate limiting"""
+    return sum(len(text) for text in texts) // 4
+
+def translate_query(query: str, dialect: str = DIALECT, use_cache: bool = True,
+                    priority: int = PRIORITY_INTERACTIVE, tier: str = None, endpoint: str = "query"):
+    """Translate a question into an LLM response containing SQL; returns (response, tier)
+
+    The tier is "cache" for cached answers, "semantic" for SQL reused from a stored
+    paraphrase, otherwise the model tier that was used.
+    Raises BudgetExceededError when the daily token budget does not allow an LLM call.
+    """
+    started = time.perf_counter()
+    mode = usage_ledger.budget_mode()
+    if mode == "template_only":
+        usage_ledger.reject("Daily LLM token budget exhausted; only template questions are answered")
+
+    if use_cache:
+        cached = get_cached_translation(query, dialect)
+        if cached is not None:
+            usage_ledger.record(endpoint, "cache", cache_hit=True,
+                                latency_ms=(time.perf_counter() - started) * 1000)
+            return cached, "cache"
+        if SEMANTIC_CACHE_ENABLED:
+            sql = example_index.near_duplicate(query, dialect)
+            if sql is not None:
+                usage_ledger.record(endpoint, "semantic", cache_hit=True,
+                                    latency_ms=(time.perf_counter() - started) * 1000)
+                return f"<sql>{sql}</sql>", "semantic"
+
+    if mode == "cache_only":
+        usage_ledger.reject("Daily LLM token budget exhausted; only cached and template questions are answered")
+    if mode == "fast_only" and tier is None:
+        # Most of the budget is spent: stretch the rest on the cheaper model
+        tier = "fast"
+
+    tier = tier or route_query(query)
+    model = MODEL_TIERS[tier]
+    system_prompt = system_prompt_for(query, dialect)
+    messages = [
+        {
+            "role": "system",
+            "content": system_prompt
+        },
+        {
+            "role": "user",
+            "content": query
+        }
+    ]
+
+    try:
+        response = scheduler.call(
+            lambda timeout: get_client().chat.completions.create(
+                model=model["model"],
+                messages=messages,
+                temperature=0.1,
+                max_tokens=model["max_tokens"],
+                timeout=timeout
+            ),
+            priority=priority,
+            estimated_tokens=estimate_tokens(system_prompt, query) + model["max_tokens"],
+            actual_tokens=lambda response: getattr(getattr(response, "usage", None), "total_tokens", None)
+        )
+    except Exception as e:
+        usage_ledger.record(endpoint, tier, model["model"], latency_ms=(time.perf_counter() - started) * 1000,
+                            error=str(e) or type(e).__name__)
+        if not isinstance(e, LLMUnavailableError):
+            raise
+        # Fall back to a previously cached answer while the provider is throttling or down
+        cached = get_cached_translation(query, dialect)
+        if cached is not None:
+            return cached, "cache"
+        raise
+
+    usage = getattr(response, "usage", None)
+    usage_ledger.record(
+        endpoint, tier, model["model"],
+        prompt_tokens=getattr(usage, "prompt_tokens", None) or 0,
+        completion_tokens=getattr(usage, "completion_tokens", None) or 0,
+        latency_ms=(time.perf_counter() - started) * 1000,
     )
-    
-    return response.choices[0].message.content 
\ No newline at end of file
+    content = response.choices[0].message.content
+    cache_translation(query, content, dialect, model=model["model"])
+    return content, tier
+
+def process_query(query: str, dialect: str = DIALECT, use_cache: bool = True,
+                  priority: int = PRIORITY_INTERACTIVE) -> str:
+    """Process natural language query and return SQL"""
+    return translate_query(query, dialect, use_cache, priority)[0]
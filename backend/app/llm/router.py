@@ -0,0 +1,79 @@
+"""
+Complexity-based routing of questions between a fast and a strong model.
+"""
+import os
+import re
+
+# Routing configuration
+LLM_ROUTING_ENABLED = os.getenv("LLM_ROUTING_ENABLED", "true").lower() == "true"
+
+MODEL_TIERS = {
+    "fast": {
+        "model": os.getenv("LLM_FAST_MODEL", "gpt-4o-mini"),
+        "max_tokens": int(os.getenv("LLM_FAST_MAX_TOKENS", "256")),
+    },
+    "strong": {
+        "model": os.getenv("LLM_STRONG_MODEL", "gpt-4o"),
+        "max_tokens": int(os.getenv("LLM_STRONG_MAX_TOKENS", "2048")),
+    },
+}
+
+# Schema entities a question can touch, by table
+TABLE_PATTERNS = {
+    "employees": re.compile(r"\b(?:employees?|who|staff|email|department|job|title|role|hired?|manager)\b"),
+    "employee_activities": re.compile(r"\b(?:hours|worked|sales|revenue|meetings?|activit(?:y|ies)|weekly|week \d+)\b"),
+    "calendar_weeks": re.compile(
+        r"\d{4}-\d{2}-\d{2}|\bweek (?:starting|ending|of)\b|\bfirst week\b|\blast \d+ weeks\b|"
+        r"\b(?:january|february|march|april|may|june|july|august|september|october|november|december)\b"
+    ),
+}
+
+COLUMN_PATTERNS = {
+    "hours_worked": re.compile(r"\bhours\b"),
+    "total_sales": re.compile(r"\b(?:sales|revenue)\b"),
+    "meetings_attended": re.compile(r"\bmeetings?\b"),
+    "department": re.compile(r"\bdepartment\b"),
+    "job_title": re.compile(r"\b(?:job|title|role)\b"),
+    "hire_date": re.compile(r"\bhired?\b"),
+    "email": re.compile(r"\bemail\b"),
+    "week_number": re.compile(r"\bweek\b"),
+}
+
+# Free-text search or domain interpretation needs the strong model
+REASONING_PATTERN = re.compile(
+    r"\b(?:challenges?|solutions?|propose[ds]?|likely|skills?|recession|why|explain|trend|similar)\b"
+)
+
+def classify_query_type(query: str) -> str:
+    """Simple query type determination based on keywords"""
+    query = query.lower()
+    if any(word in query for word in ["total", "sum", "average", "count"]):
+        return "aggregation"
+    if any(word in query for word in ["most", "highest", "top", "best"]):
+        return "ranking"
+    if any(word in query for word in ["compare", "vs", "versus"]):
+        return "comparison"
+    return "basic"
+
+def classify_complexity(query: str) -> str:
+    """Classify a question as "simple" or "complex" from its type and the schema entities it touches"""
+    lowered = query.lower()
+    tables = [table for table, pattern in TABLE_PATTERNS.items() if pattern.search(lowered)]
+    columns = [column for column, pattern in COLUMN_PATTERNS.items() if pattern.search(lowered)]
+
+    if classify_query_type(query) not in ("basic", "aggregation"):
+        return "complex"
+    if "calendar_weeks" in tables or REASONING_PATTERN.search(lowered):
+        return "complex"
+    if len(tables) > 2 or len(columns) > 2:
+        return "complex"
+    # More than one aggregate over different metrics ("total hours and average sales")
+    if len(re.findall(r"\b(?:total|sum|average|avg|count)\b", lowered)) > 1:
+        return "complex"
+    return "simple"
+
+def route_query(query: str) -> str:
+    """Pick the model tier for a question"""
+    if not LLM_ROUTING_ENABLED:
+        return "strong"
+    return "fast" if classify_complexity(query) == "simple" else "strong"
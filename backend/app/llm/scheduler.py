@@ -0,0 +1,283 @@
+"""
+Scheduler around LLM calls: priority queueing, rate limiting, retries and a circuit breaker.
+"""
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Call priorities (lower runs first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BENCHMARK = 10
+PRIORITY_BATCH = 20
+
+# Scheduler configuration
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "30000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.5"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "20"))
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+class LLMUnavailableError(Exception):
+    """The LLM could not be reached within the retry and queueing budget"""
+
+class CircuitOpenError(LLMUnavailableError):
+    """The circuit breaker is open, so the call was rejected without trying"""
+
+class QueueTimeoutError(LLMUnavailableError):
+    """The call waited too long for a concurrency slot or rate-limit capacity"""
+
+def is_retryable(error: Exception) -> bool:
+    """429s, 5xx responses, timeouts and connection errors are worth retrying"""
+    status_code = getattr(error, "status_code", None)
+    if status_code is not None:
+        return status_code == 429 or status_code >= 500
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    # openai.APITimeoutError / APIConnectionError carry no status code
+    return type(error).__name__ in ("APITimeoutError", "APIConnectionError")
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Honour a Retry-After header when the provider sends one"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate_per_minute`"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, amount: float) -> float:
+        """Take `amount` tokens if available; otherwise return seconds until they will be"""
+        amount = min(amount, self.capacity)
+        with self.lock:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def adjust(self, delta: float):
+        """Charge (positive) or refund (negative) tokens once actual usage is known"""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - delta)
+
+class CircuitBreaker:
+    """Opens after consecutive failures; lets a single probe through after the cooldown"""
+
+    def __init__(self, threshold: int, cooldown_seconds: float):
+        self.threshold = threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def cancel_probe(self):
+        """Give the half-open probe back when the call never reached the provider"""
+        with self.lock:
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+class LLMScheduler:
+    """Runs LLM calls through a priority queue, rate limiters, retries and a circuit breaker"""
+
+    def __init__(
+        self,
+        requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = LLM_TOKENS_PER_MINUTE,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        timeout_seconds: float = LLM_TIMEOUT_SECONDS,
+        queue_timeout_seconds: float = LLM_QUEUE_TIMEOUT_SECONDS,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_base_seconds: float = LLM_BACKOFF_BASE_SECONDS,
+        backoff_max_seconds: float = LLM_BACKOFF_MAX_SECONDS,
+        breaker_threshold: int = LLM_BREAKER_THRESHOLD,
+        breaker_cooldown_seconds: float = LLM_BREAKER_COOLDOWN_SECONDS,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.timeout_seconds = timeout_seconds
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown_seconds)
+        self.sleep = sleep
+
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._active = 0
+        self.stats = {"calls": 0, "succeeded": 0, "failed": 0, "retries": 0,
+                      "rejected_open": 0, "queue_timeouts": 0}
+
+    def _count(self, key: str):
+        with self._cond:
+            self.stats[key] += 1
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        ceiling = min(self.backoff_max_seconds, self.backoff_base_seconds * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def _acquire(self, priority: int, estimated_tokens: int, deadline: float):
+        """Wait for the head of the queue, a free slot and rate-limit capacity"""
+        ticket = (priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    if self._waiting[0] == ticket and self._active < self.max_concurrency:
+                        # Hold the head of the queue while waiting for rate-limit capacity
+                        wait = self.request_bucket.try_acquire(1)
+                        if wait == 0.0:
+                            wait = self.token_bucket.try_acquire(estimated_tokens)
+                            if wait > 0:
+                                self.request_bucket.adjust(-1)
+                        if wait == 0.0:
+                            heapq.heappop(self._waiting)
+                            self._active += 1
+                            self._cond.notify_all()
+                            return
+                    else:
+                        wait = None
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise QueueTimeoutError("Timed out waiting for LLM capacity")
+                    self._cond.wait(remaining if wait is None else min(wait, remaining))
+            except BaseException:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+                raise
+
+    def _release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    def call(
+        self,
+        func: Callable[[float], Any],
+        priority: int = PRIORITY_INTERACTIVE,
+        estimated_tokens: int = 0,
+        actual_tokens: Callable[[Any], Optional[int]] = lambda result: None,
+    ) -> Any:
+        """Run `func(timeout)` under the scheduler and return its result"""
+        self._count("calls")
+        deadline = time.monotonic() + self.queue_timeout_seconds
+
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                self._count("rejected_open")
+                raise CircuitOpenError("LLM circuit breaker is open")
+
+            try:
+                self._acquire(priority, estimated_tokens, deadline)
+            except QueueTimeoutError:
+                self.breaker.cancel_probe()
+                self._count("queue_timeouts")
+                raise
+            try:
+                result = func(self.timeout_seconds)
+            except Exception as e:
+                if not is_retryable(e):
+                    # The provider answered (e.g. a 400), so it is not an outage
+                    self.breaker.record_success()
+                    self._count("failed")
+                    raise
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    self._count("failed")
+                    raise LLMUnavailableError(str(e)) from e
+                self._count("retries")
+                delay = retry_after_seconds(e)
+                if delay is None:
+                    delay = self.backoff_delay(attempt)
+                if time.monotonic() + delay > deadline:
+                    self._count("failed")
+                    raise LLMUnavailableError(str(e)) from e
+                self.sleep(delay)
+                continue
+            finally:
+                self._release()
+
+            self.breaker.record_success()
+            self._count("succeeded")
+            used = actual_tokens(result)
+            if used is not None:
+                self.token_bucket.adjust(used - estimated_tokens)
+            return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Queue depth, concurrency, breaker state and call counters"""
+        with self._cond:
+            return {
+                "queued": len(self._waiting),
+                "active": self._active,
+                "max_concurrency": self.max_concurrency,
+                "breaker_state": self.breaker.state,
+                "consecutive_failures": self.breaker.failures,
+                **self.stats,
+            }
+
+# Process-wide scheduler shared by all LLM calls in this worker
+scheduler = LLMScheduler()
@@ -0,0 +1,146 @@
+"""
+Durable question -> SQL translation store shared by all workers on a node.
+
+Backed by a local SQLite file (WAL mode, so many readers and one writer can work
+concurrently). Entries are keyed by question fingerprint plus the prompt and schema
+versions they were generated under, so changing the system prompt or the ORM models
+invalidates them automatically.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from ..db.database import Base
+from ..db import models  # noqa: F401  (registers the tables on Base.metadata)
+
+# Translation store configuration
+TRANSLATION_STORE_ENABLED = os.getenv("TRANSLATION_STORE_ENABLED", "true").lower() == "true"
+TRANSLATION_STORE_PATH = os.getenv("TRANSLATION_STORE_PATH", "translation_store.db")
+TRANSLATION_STORE_RETRY_SECONDS = float(os.getenv("TRANSLATION_STORE_RETRY_SECONDS", "300"))
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS translations (
+        fingerprint TEXT NOT NULL,
+        prompt_version TEXT NOT NULL,
+        schema_version TEXT NOT NULL,
+        dialect TEXT NOT NULL,
+        question TEXT NOT NULL,
+        llm_output TEXT NOT NULL,
+        model TEXT,
+        created_at REAL NOT NULL,
+        last_used_at REAL NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (fingerprint, prompt_version, schema_version)
+    )
+"""
+
+def fingerprint(dialect: str, normalized_question: str) -> str:
+    """Stable key for a normalized question in a given SQL dialect"""
+    return hashlib.sha256(f"{dialect}\n{normalized_question}".encode("utf-8")).hexdigest()
+
+def version_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+def schema_version() -> str:
+    """Hash of every table, column and type in the ORM models"""
+    parts = []
+    for name, table in sorted(Base.metadata.tables.items()):
+        for column in table.columns:
+            parts.append(f"{name}.{column.name}:{column.type}")
+    return version_hash("\n".join(parts))
+
+class TranslationStore:
+    """SQLite-backed translation store with one connection per thread"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connection().execute(CREATE_TABLE_SQL)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str, prompt_version: str, schema: str) -> Optional[str]:
+        """Return the stored LLM output for a fingerprint under the current versions"""
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT llm_output FROM translations WHERE fingerprint = ? AND prompt_version = ? AND schema_version = ?",
+            (key, prompt_version, schema),
+        ).fetchone()
+        if row is None:
+            return None
+        connection.execute(
+            "UPDATE translations SET hits = hits + 1, last_used_at = ? "
+            "WHERE fingerprint = ? AND prompt_version = ? AND schema_version = ?",
+            (time.time(), key, prompt_version, schema),
+        )
+        return row[0]
+
+    def put(self, key: str, prompt_version: str, schema: str, dialect: str, question: str,
+            llm_output: str, model: Optional[str]):
+        now = time.time()
+        self._connection().execute(
+            "INSERT OR REPLACE INTO translations "
+            "(fingerprint, prompt_version, schema_version, dialect, question, llm_output, model, created_at, last_used_at, hits) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)",
+            (key, prompt_version, schema, dialect, question, llm_output, model, now, now),
+        )
+
+    def delete(self, key: str):
+        self._connection().execute("DELETE FROM translations WHERE fingerprint = ?", (key,))
+
+    def purge_stale(self, prompt_version: str, schema: str) -> int:
+        """Drop entries generated under any other prompt or schema version"""
+        cursor = self._connection().execute(
+            "DELETE FROM translations WHERE prompt_version != ? OR schema_version != ?",
+            (prompt_version, schema),
+        )
+        return cursor.rowcount
+
+    def load_current(self, prompt_version: str, schema: str, limit: int) -> List[Tuple[str, str, str]]:
+        """Most used (dialect, question, llm_output) rows under the current versions"""
+        return self._connection().execute(
+            "SELECT dialect, question, llm_output FROM translations "
+            "WHERE prompt_version = ? AND schema_version = ? ORDER BY hits DESC, last_used_at DESC LIMIT ?",
+            (prompt_version, schema, limit),
+        ).fetchall()
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+logger = logging.getLogger(__name__)
+
+_store = None
+_store_failed_at: Optional[float] = None
+_store_lock = threading.Lock()
+
+def get_store() -> Optional[TranslationStore]:
+    """Open the node-local store on first use; None when disabled or the file cannot be opened"""
+    global _store, _store_failed_at
+    if not TRANSLATION_STORE_ENABLED:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                # Read-only or misconfigured deployments run without the store; retry now and then
+                if _store_failed_at is not None and time.time() - _store_failed_at < TRANSLATION_STORE_RETRY_SECONDS:
+                    return None
+                try:
+                    _store = TranslationStore(TRANSLATION_STORE_PATH)
+                except (sqlite3.Error, OSError) as e:
+                    if _store_failed_at is None:
+                        logger.warning("Translation store %s unavailable, continuing without it: %s",
+                                       TRANSLATION_STORE_PATH, e)
+                    _store_failed_at = time.time()
+                    return None
+    return _store
@@ -0,0 +1,303 @@
+"""
+Ledger of LLM usage with token/cost accounting and a daily token budget.
+
+Every translation request (LLM call or cache hit) is recorded with its model, token
+counts, cost, latency and originating endpoint. `record` only appends to a bounded
+in-memory queue; a background thread writes the queue to the `llm_usage` table in
+batches, so request latency never includes a ledger write.
+
+The budget counts today's tokens from the table (all workers) plus this worker's
+not-yet-written entries. Past LLM_BUDGET_DOWNGRADE_RATIO of the budget, questions are
+routed to the fast tier; once it is spent, questions are answered from the translation
+cache and templates only ("cache_only") or from templates only ("template_only").
+"""
+import os
+import queue
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, insert, select
+
+from ..db.database import SessionLocal
+from ..db import models
+from .scheduler import LLMUnavailableError
+
+# Usage ledger configuration
+LLM_LEDGER_ENABLED = os.getenv("LLM_LEDGER_ENABLED", "true").lower() == "true"
+LLM_LEDGER_FLUSH_SECONDS = float(os.getenv("LLM_LEDGER_FLUSH_SECONDS", "1"))
+LLM_LEDGER_BATCH_SIZE = int(os.getenv("LLM_LEDGER_BATCH_SIZE", "500"))
+LLM_LEDGER_MAX_QUEUE = int(os.getenv("LLM_LEDGER_MAX_QUEUE", "10000"))
+
+# Budget configuration (0 disables the budget)
+LLM_DAILY_TOKEN_BUDGET = int(os.getenv("LLM_DAILY_TOKEN_BUDGET", "0"))
+LLM_BUDGET_DOWNGRADE_RATIO = float(os.getenv("LLM_BUDGET_DOWNGRADE_RATIO", "0.8"))
+LLM_BUDGET_EXHAUSTED_MODE = os.getenv("LLM_BUDGET_EXHAUSTED_MODE", "cache_only").lower()
+LLM_BUDGET_REFRESH_SECONDS = float(os.getenv("LLM_BUDGET_REFRESH_SECONDS", "30"))
+
+# USD per million (prompt, completion) tokens; override with LLM_MODEL_PRICES="model=in/out,..."
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+
+BUDGET_MODES = ("normal", "fast_only", "cache_only", "template_only")
+REPORT_GROUPS = ("day", "model", "endpoint", "tier")
+
+def _parse_prices(value: str) -> Dict[str, Tuple[float, float]]:
+    prices = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        model, _, rates = item.partition("=")
+        prompt_rate, _, completion_rate = rates.partition("/")
+        prices[model.strip()] = (float(prompt_rate), float(completion_rate or prompt_rate))
+    return prices
+
+MODEL_PRICES.update(_parse_prices(os.getenv("LLM_MODEL_PRICES", "")))
+
+def token_cost(model: Optional[str], prompt_tokens: int, completion_tokens: int) -> float:
+    """USD cost of a call; 0 for cache hits and unpriced models"""
+    prompt_rate, completion_rate = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_rate + completion_tokens * completion_rate) / 1_000_000
+
+class BudgetExceededError(LLMUnavailableError):
+    """The daily token budget is spent and the question needs the LLM"""
+
+class UsageLedger:
+    """Queues usage entries, writes them in batches and tracks today's token spend"""
+
+    def __init__(self, session_factory=SessionLocal, daily_token_budget: int = LLM_DAILY_TOKEN_BUDGET,
+                 flush_seconds: float = LLM_LEDGER_FLUSH_SECONDS, batch_size: int = LLM_LEDGER_BATCH_SIZE,
+                 max_queue: int = LLM_LEDGER_MAX_QUEUE):
+        self.session_factory = session_factory
+        self.daily_token_budget = daily_token_budget
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()  # serializes writes and budget syncs
+        self._thread = None
+        self._day: Optional[date] = None
+        self._written_tokens = 0  # today's tokens in the table, as of the last sync plus our writes since
+        self._pending_tokens = 0  # today's tokens recorded here but not written yet
+        self._synced_at = 0.0
+        self._sync_attempted_at: Optional[float] = None  # last sync, successful or not
+        self.stats = {"recorded": 0, "written": 0, "dropped": 0, "write_errors": 0, "budget_rejections": 0}
+
+    def _roll_day(self, today: date):
+        """Reset the budget counters at UTC midnight (caller holds the lock)"""
+        if self._day != today:
+            self._day = today
+            self._written_tokens = self._pending_tokens = 0
+            self._synced_at = 0.0
+            self._sync_attempted_at = None
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="llm-usage-ledger", daemon=True)
+                    self._thread.start()
+
+    def record(self, endpoint: str, tier: str, model: Optional[str] = None, cache_hit: bool = False,
+               prompt_tokens: int = 0, completion_tokens: int = 0, latency_ms: float = 0.0,
+               error: Optional[str] = None):
+        """Account for one translation request without blocking on the database"""
+        now = datetime.utcnow()
+        total_tokens = prompt_tokens + completion_tokens
+        entry = {
+            "created_at": now,
+            "usage_date": now.date(),
+            "endpoint": endpoint,
+            "tier": tier,
+            "model": model,
+            "cache_hit": cache_hit,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": total_tokens,
+            "cost_usd": token_cost(model, prompt_tokens, completion_tokens),
+            "latency_ms": latency_ms,
+            "error": error[:500] if error else None,
+        }
+        with self._lock:
+            self._roll_day(entry["usage_date"])
+            self._pending_tokens += total_tokens
+            self.stats["recorded"] += 1
+        if not LLM_LEDGER_ENABLED:
+            return
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            # Shed ledger rows rather than slow requests down; the tokens still count against today's budget
+            with self._lock:
+                self.stats["dropped"] += 1
+            return
+        self._ensure_thread()
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        """Wait for a first entry, then collect more for up to flush_seconds"""
+        try:
+            batch = [self._queue.get(timeout=self.flush_seconds)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch:
+                self._write(batch)
+            if self._sync_due():
+                self._sync()
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        with self._io_lock:
+            db = self.session_factory()
+            try:
+                db.execute(insert(models.LLMUsage), batch)
+                db.commit()
+            except Exception:
+                db.rollback()
+                with self._lock:
+                    self.stats["write_errors"] += len(batch)
+                return
+            finally:
+                db.close()
+            with self._lock:
+                self.stats["written"] += len(batch)
+                today_tokens = sum(entry["total_tokens"] for entry in batch if entry["usage_date"] == self._day)
+                self._written_tokens += today_tokens
+                self._pending_tokens -= today_tokens
+
+    def _sync_due(self) -> bool:
+        attempted = self._sync_attempted_at
+        return attempted is None or time.monotonic() - attempted > LLM_BUDGET_REFRESH_SECONDS
+
+    def _sync(self):
+        """Re-read today's total from the table to include other workers' usage"""
+        with self._io_lock:
+            today = datetime.utcnow().date()
+            with self._lock:
+                self._roll_day(today)
+                self._sync_attempted_at = time.monotonic()
+            db = self.session_factory()
+            try:
+                total = db.execute(
+                    select(func.coalesce(func.sum(models.LLMUsage.total_tokens), 0))
+                    .where(models.LLMUsage.usage_date == today)
+                ).scalar()
+            except Exception:
+                db.rollback()
+                return
+            finally:
+                db.close()
+            with self._lock:
+                self._roll_day(today)
+                self._written_tokens = int(total)
+                self._synced_at = self._sync_attempted_at = time.monotonic()
+
+    def flush(self):
+        """Write everything queued so far on the calling thread (used at shutdown)"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def tokens_today(self) -> int:
+        with self._lock:
+            self._roll_day(datetime.utcnow().date())
+            return self._written_tokens + self._pending_tokens
+
+    def budget_mode(self) -> str:
+        """How questions should be answered given today's spend"""
+        if self.daily_token_budget <= 0:
+            return "normal"
+        if self._synced_at == 0.0 and self._sync_due():
+            # First question of the day (or of this worker): one attempt per refresh interval
+            self._sync()
+        used = self.tokens_today()
+        if used >= self.daily_token_budget:
+            return LLM_BUDGET_EXHAUSTED_MODE if LLM_BUDGET_EXHAUSTED_MODE in BUDGET_MODES else "cache_only"
+        if used >= self.daily_token_budget * LLM_BUDGET_DOWNGRADE_RATIO:
+            return "fast_only"
+        return "normal"
+
+    def reject(self, message: str):
+        """Raise BudgetExceededError, counting the rejection"""
+        with self._lock:
+            self.stats["budget_rejections"] += 1
+        raise BudgetExceededError(message)
+
+    def snapshot(self) -> Dict[str, Any]:
+        mode = self.budget_mode()
+        used = self.tokens_today()
+        budget = self.daily_token_budget
+        with self._lock:
+            return {
+                "daily_token_budget": budget,
+                "tokens_today": used,
+                "remaining_tokens": max(budget - used, 0) if budget > 0 else None,
+                "mode": mode,
+                "queued": self._queue.qsize(),
+                **self.stats,
+            }
+
+def usage_report(db, days: int = 7, group_by: str = "day") -> List[Dict[str, Any]]:
+    """Aggregate ledger rows of the last `days` UTC days by day, model, endpoint or tier"""
+    usage = models.LLMUsage
+    column = {
+        "day": usage.usage_date,
+        "model": func.coalesce(usage.model, "cache"),
+        "endpoint": usage.endpoint,
+        "tier": usage.tier,
+    }[group_by]
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    statement = (
+        select(
+            column.label("key"),
+            func.count().label("requests"),
+            func.sum(case((usage.cache_hit, 1), else_=0)).label("cache_hits"),
+            func.count(usage.error).label("errors"),
+            func.sum(usage.prompt_tokens).label("prompt_tokens"),
+            func.sum(usage.completion_tokens).label("completion_tokens"),
+            func.sum(usage.total_tokens).label("total_tokens"),
+            func.sum(usage.cost_usd).label("cost_usd"),
+            func.avg(usage.latency_ms).label("average_latency_ms"),
+        )
+        .where(usage.usage_date >= since)
+        .group_by(column)
+        .order_by(column)
+    )
+    return [
+        {
+            "key": str(row.key),
+            "requests": row.requests,
+            "cache_hits": int(row.cache_hits or 0),
+            "errors": row.errors,
+            "prompt_tokens": int(row.prompt_tokens or 0),
+            "completion_tokens": int(row.completion_tokens or 0),
+            "total_tokens": int(row.total_tokens or 0),
+            "cost_usd": round(float(row.cost_usd or 0), 6),
+            "average_latency_ms": round(float(row.average_latency_ms or 0), 1),
+        }
+        for row in db.execute(statement)
+    ]
+
+# Process-wide ledger shared by all LLM calls in this worker
+usage_ledger = UsageLedger()
@@ -0,0 +1,338 @@
+"""
+Async load generator for the API, runnable entirely locally against a fake LLM.
+
+Drives /query, /employees/, /activities/ and /export/* with a weighted mix of the
+reference questions, either closed-loop (a ramp of concurrent workers) or open-loop
+(Poisson arrivals at fixed rates), and reports throughput, latency percentiles, a
+latency histogram and error rates per step.
+
+Usage (from backend/):
+    python -m app.loadtest --mode closed --concurrency 1,4,16 --duration 10
+    python -m app.loadtest --mode open --rate 20,50,100 --duration 10 --output run.json
+    python -m app.loadtest --baseline run.json            # compare against an earlier build
+    python -m app.loadtest --base-url http://localhost:8000  # an already running server
+    python -m app.loadtest --spawn                           # start uvicorn in a subprocess
+
+Without --base-url or --spawn the app runs in-process over an ASGI transport. In-process
+and spawned servers default to LLM_PROVIDER=fake and a seeded SQLite file.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from .db.reference_queries import REFERENCE_QUERIES
+
+API_PREFIX = "/api/v1"
+DEFAULT_DATABASE_URL = "sqlite:///./loadtest.db"
+DEFAULT_MIX = "query=6,employees=2,activities=1,export=1"
+
+# Upper bounds (ms) of the latency histogram buckets
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf")]
+
+EXPORT_PATHS = [f"/export/{table}/{fmt}" for table in ("employees", "activities", "summary") for fmt in ("csv", "json")]
+
+def build_request(scenario: str, rng: random.Random):
+    """(method, path, json body) for one request of the given scenario"""
+    if scenario == "query":
+        return "POST", "/query", {"query": rng.choice(REFERENCE_QUERIES)[0]}
+    if scenario == "employees":
+        return "GET", "/employees/", None
+    if scenario == "employee":
+        return "GET", f"/employees/{rng.randint(1, 10)}", None
+    if scenario == "activities":
+        return "GET", "/activities/", None
+    if scenario == "activity_write":
+        return "POST", "/activities/", {
+            "employee_id": rng.randint(1, 10),
+            "week_number": rng.randint(1, 10),
+            "meetings_attended": rng.randint(0, 10),
+            "total_sales": round(rng.uniform(0, 50000), 2),
+            "hours_worked": round(rng.uniform(30, 50), 1),
+            "activities": "Load test activity",
+        }
+    if scenario == "export":
+        return "GET", rng.choice(EXPORT_PATHS), None
+    raise ValueError(f"Unknown scenario '{scenario}'")
+
+SCENARIOS = ["query", "employees", "employee", "activities", "activity_write", "export"]
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse "query=6,employees=2" into scenario weights"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario '{name}', expected one of {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+class StepStats:
+    """Outcomes of one load step"""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.latencies_ms: List[float] = []
+        self.by_scenario: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.dropped = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def record(self, scenario: str, latency_ms: float, error: Optional[str]):
+        self.latencies_ms.append(latency_ms)
+        self.by_scenario.setdefault(scenario, []).append(latency_ms)
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def report(self) -> Dict:
+        total = len(self.latencies_ms)
+        failed = sum(self.errors.values())
+        histogram = {}
+        for latency in self.latencies_ms:
+            bound = next(b for b in HISTOGRAM_BOUNDS_MS if latency <= b)
+            key = f"<={bound:g}ms" if bound != float("inf") else ">5000ms"
+            histogram[key] = histogram.get(key, 0) + 1
+
+        def summary(samples):
+            return {
+                "count": len(samples),
+                "p50_ms": percentile(samples, 0.50),
+                "p90_ms": percentile(samples, 0.90),
+                "p95_ms": percentile(samples, 0.95),
+                "p99_ms": percentile(samples, 0.99),
+                "max_ms": max(samples),
+            } if samples else {"count": 0}
+
+        return {
+            "step": self.label,
+            "requests": total,
+            "duration_seconds": self.elapsed,
+            "throughput_rps": total / self.elapsed if self.elapsed else 0.0,
+            "error_rate": failed / total if total else 0.0,
+            "errors": dict(self.errors),
+            "dropped": self.dropped,
+            "latency": summary(self.latencies_ms),
+            "histogram": {key: histogram[key] for key in sorted(histogram, key=_bucket_order)},
+            "scenarios": {name: summary(samples) for name, samples in sorted(self.by_scenario.items())},
+        }
+
+def _bucket_order(key: str) -> float:
+    return float("inf") if key.startswith(">") else float(key[2:-2])
+
+class LoadGenerator:
+    """Issues requests from a weighted scenario mix against one client"""
+
+    def __init__(self, client: httpx.AsyncClient, mix: Dict[str, float], seed: int):
+        self.client = client
+        self.scenarios = list(mix)
+        self.weights = [mix[name] for name in self.scenarios]
+        self.rng = random.Random(seed)
+
+    async def fire(self, stats: StepStats, scheduled_at: Optional[float] = None):
+        """Send one request; open-loop latency counts from the scheduled arrival time"""
+        scenario = self.rng.choices(self.scenarios, self.weights)[0]
+        method, path, body = build_request(scenario, self.rng)
+        started = scheduled_at if scheduled_at is not None else time.perf_counter()
+        error = None
+        try:
+            response = await self.client.request(method, API_PREFIX + path, json=body)
+            await response.aread()
+            if response.status_code >= 400:
+                error = f"HTTP {response.status_code}"
+        except httpx.HTTPError as e:
+            error = type(e).__name__
+        stats.record(scenario, (time.perf_counter() - started) * 1000, error)
+
+    async def closed_loop(self, concurrency: int, duration: float) -> StepStats:
+        """`concurrency` workers each sending back-to-back requests for `duration` seconds"""
+        stats = StepStats(f"concurrency={concurrency}")
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                await self.fire(stats)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        stats.elapsed = time.perf_counter() - stats.started
+        return stats
+
+    async def open_loop(self, rate: float, duration: float, max_in_flight: int) -> StepStats:
+        """Poisson arrivals at `rate` per second, independent of response times"""
+        stats = StepStats(f"rate={rate:g}/s")
+        deadline = time.perf_counter() + duration
+        in_flight = set()
+        next_arrival = time.perf_counter()
+        while next_arrival < deadline:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= max_in_flight:
+                stats.dropped += 1  # the target is saturated; count rather than queue unboundedly
+            else:
+                task = asyncio.create_task(self.fire(stats, scheduled_at=next_arrival))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            next_arrival += self.rng.expovariate(rate)
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        stats.elapsed = time.perf_counter() - stats.started
+        return stats
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float):
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.05)
+    raise SystemExit(f"Target not ready after {timeout:g}s")
+
+def prepare_local_database():
+    """Create and seed the local database used by in-process and spawned targets"""
+    from .db.database import engine, SessionLocal
+    from .db import models
+    from .db.seed_data import seed_database
+    from .db.partitioning import prepare_schema
+
+    prepare_schema(engine)
+    db = SessionLocal()
+    try:
+        if db.query(models.Employee).count() == 0:
+            seed_database(db)
+    finally:
+        db.close()
+
+async def run_steps(client: httpx.AsyncClient, args) -> List[Dict]:
+    await wait_until_ready(client, args.ready_timeout)
+    generator = LoadGenerator(client, args.mix, args.seed)
+    if args.warmup:
+        await generator.closed_loop(1, args.warmup)
+
+    reports = []
+    levels = args.rate if args.mode == "open" else args.concurrency
+    for level in levels:
+        if args.mode == "open":
+            stats = await generator.open_loop(level, args.duration, args.max_in_flight)
+        else:
+            stats = await generator.closed_loop(int(level), args.duration)
+        report = stats.report()
+        print_step(report)
+        reports.append(report)
+    return reports
+
+async def run_in_process(args) -> List[Dict]:
+    """Run the app inside this process, including its lifespan warm start"""
+    from .main import app
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=args.timeout) as client:
+            return await run_steps(client, args)
+
+async def run_remote(base_url: str, args) -> List[Dict]:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        return await run_steps(client, args)
+
+def print_step(report: Dict):
+    latency = report["latency"]
+    print(f"\n{report['step']}: {report['requests']} requests in {report['duration_seconds']:.1f}s, "
+          f"{report['throughput_rps']:.1f} req/s, error rate {report['error_rate']:.1%}, dropped {report['dropped']}")
+    if latency["count"]:
+        print(f"  latency ms  p50 {latency['p50_ms']:.1f}  p90 {latency['p90_ms']:.1f}  "
+              f"p95 {latency['p95_ms']:.1f}  p99 {latency['p99_ms']:.1f}  max {latency['max_ms']:.1f}")
+    for name, summary in report["scenarios"].items():
+        print(f"  {name:<15} n={summary['count']:<6} p50 {summary['p50_ms']:.1f}  p95 {summary['p95_ms']:.1f}")
+    total = max(1, report["requests"])
+    for bucket, count in report["histogram"].items():
+        print(f"  {bucket:>9} {'#' * max(1, round(40 * count / total))} {count}")
+    if report["errors"]:
+        print(f"  errors: {report['errors']}")
+
+def print_comparison(reports: List[Dict], baseline: List[Dict]):
+    """Throughput, p95 and error-rate change per step against an earlier run"""
+    previous = {report["step"]: report for report in baseline}
+    print("\nComparison with baseline:")
+    for report in reports:
+        old = previous.get(report["step"])
+        if old is None or not old["requests"] or not report["requests"]:
+            print(f"  {report['step']}: no comparable baseline step")
+            continue
+        throughput_change = (report["throughput_rps"] / old["throughput_rps"] - 1) if old["throughput_rps"] else 0.0
+        p95_change = report["latency"]["p95_ms"] / old["latency"]["p95_ms"] - 1 if old["latency"]["p95_ms"] else 0.0
+        print(f"  {report['step']}: throughput {throughput_change:+.1%}, p95 {p95_change:+.1%}, "
+              f"error rate {old['error_rate']:.1%} -> {report['error_rate']:.1%}")
+
+def _floats(text: str) -> List[float]:
+    return [float(part) for part in text.split(",") if part]
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Employee Activity Tracker API")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed",
+                        help="closed: fixed worker concurrency; open: fixed arrival rate")
+    parser.add_argument("--concurrency", type=_floats, default=[1, 4, 16], help="Closed-loop ramp, e.g. 1,4,16")
+    parser.add_argument("--rate", type=_floats, default=[10, 50, 100], help="Open-loop arrivals/s ramp, e.g. 10,50")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per step")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of single-worker warmup")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"Scenario weights (default {DEFAULT_MIX}); scenarios: {', '.join(SCENARIOS)}")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Open-loop cap on outstanding requests")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--ready-timeout", type=float, default=30.0, help="Seconds to wait for /ready")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the request mix")
+    parser.add_argument("--base-url", help="Load an already running server instead of the in-process app")
+    parser.add_argument("--spawn", action="store_true", help="Start uvicorn in a subprocess and load it over HTTP")
+    parser.add_argument("--port", type=int, default=8765, help="Port for --spawn")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report from an earlier run to compare against")
+    args = parser.parse_args()
+
+    if not args.base_url:
+        # Local targets never call the real provider
+        os.environ.setdefault("LLM_PROVIDER", "fake")
+        os.environ.setdefault("DATABASE_URL", DEFAULT_DATABASE_URL)
+        prepare_local_database()
+
+    server = None
+    try:
+        if args.spawn:
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+                env=os.environ.copy(),
+            )
+            reports = asyncio.run(run_remote(f"http://127.0.0.1:{args.port}", args))
+        elif args.base_url:
+            reports = asyncio.run(run_remote(args.base_url.rstrip("/"), args))
+        else:
+            reports = asyncio.run(run_in_process(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"mode": args.mode, "mix": args.mix, "steps": reports}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            print_comparison(reports, json.load(f)["steps"])
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,38 @@
-from fastapi import FastAPI, Depends
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from .api.endpoints import router as api_router
-from .db.database import engine, SessionLocal
-from .db import models
+from .api.http_cache import ContentAwareGZipMiddleware, GZIP_MINIMUM_SIZE
+from .db.database import engine
+from .startup import readiness, warm_start
+from .export_jobs import export_manager
+from .live_updates import router as live_router, live_hub
+from .llm.usage_ledger import usage_ledger
+from .llm.planner import planner_executor
+from .db.approximate import refinements
+import asyncio
 import os
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the worker in the background; /ready reports when it can take traffic"""
+    warm_task = asyncio.create_task(warm_start())
+    yield
+    warm_task.cancel()
+    await live_hub.stop()
+    export_manager.executor.shutdown(wait=False, cancel_futures=True)
+    planner_executor.shutdown(wait=False, cancel_futures=True)
+    refinements.executor.shutdown(wait=False, cancel_futures=True)
+    await asyncio.to_thread(usage_ledger.flush)
+    engine.dispose()
 
 app = FastAPI(
     title="Employee Activity Tracker",
     description="A system that uses LLM to process and analyze employee activity data",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -25,24 +44,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress list and export payloads above the threshold
+app.add_middleware(ContentAwareGZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+
 # Mount static files (frontend)
 frontend_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "frontend")
 if os.path.exists(frontend_path):
     app.mount("/static", StaticFiles(directory=frontend_path), name="static")
 
-# Dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-# Include API router with prefix
-app.include_router(api_router, prefix="/api/v1", dependencies=[Depends(get_db)])
+# Include API router with prefix (endpoints open their own session via Depends(get_db), one per request)
+app.include_router(api_router, prefix="/api/v1")
 
 # Include API router without prefix for backward compatibility
-app.include_router(api_router, dependencies=[Depends(get_db)])
+app.include_router(api_router)
+
+# Live dashboard updates open their own short sessions per poll, not one per connection
+app.include_router(live_router, prefix="/api/v1")
+app.include_router(live_router)
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 once the warm start has finished, 503 before"""
+    status = readiness.status()
+    return JSONResponse(status_code=200 if readiness.ready else 503, content=status)
 
 @app.get("/")
 async def root():
@@ -3,6 +3,7 @@ from typing import Optional, List, Dict, Any
 from datetime import date, datetime
 
 class EmployeeBase(BaseModel):
+    full_name: str
     email: EmailStr
     job_title: str
     department: str
@@ -19,9 +20,9 @@ class Employee(EmployeeBase):
 
 class EmployeeActivityBase(BaseModel):
     employee_id: int
-    week_number: int  # 1-10
+    week_number: int  # Consecutive weeks since CALENDAR_START_DATE
     meetings_attended: int
-    total_sales: float  # In RMB
+    total_sales: Optional[float] = None  # In RMB, NULL for non-sales roles
     hours_worked: float
     activities: str  # Detailed activity description
 
@@ -29,6 +30,7 @@ class EmployeeActivityCreate(EmployeeActivityBase):
     pass
 
 class EmployeeActivity(EmployeeActivityBase):
+    week_start: Optional[date] = None  # First day of the week, derived from week_number
     id: int
     
     class Config:
@@ -37,14 +39,73 @@ class EmployeeActivity(EmployeeActivityBase):
 class EmployeeWithActivities(Employee):
     activities: List[EmployeeActivity] = []
 
+# Sparse views: only the fields a client asked for (`fields=` / `activity_fields=`) are present
+
+class EmployeeActivityView(BaseModel):
+    employee_id: Optional[int] = None
+    week_number: Optional[int] = None
+    meetings_attended: Optional[int] = None
+    total_sales: Optional[float] = None
+    hours_worked: Optional[float] = None
+    activities: Optional[str] = None
+    week_start: Optional[date] = None
+    id: int
+
+class EmployeeView(BaseModel):
+    full_name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    job_title: Optional[str] = None
+    department: Optional[str] = None
+    hire_date: Optional[datetime] = None
+    id: int
+
+class EmployeeWithActivitiesView(EmployeeView):
+    activities: List[EmployeeActivityView] = []
+
 class QueryRequest(BaseModel):
     query: str = Field(..., description="Natural language query about employee activities")
+    approximate: bool = Field(False, description="Answer eligible aggregates from a sample of activity rows")
+    refine: bool = Field(False, description="With approximate, also compute the exact answer in the background")
+
+class ConfidenceInterval(BaseModel):
+    group: Optional[str] = Field(None, description="Group label (department, employee or week); None when ungrouped")
+    estimate: float = Field(..., description="Sampled estimate")
+    lower: float = Field(..., description="Lower bound")
+    upper: float = Field(..., description="Upper bound")
+    level: float = Field(..., description="Confidence level of the interval")
+
+class SubQueryResult(BaseModel):
+    query: str = Field(..., description="Sub-question")
+    sql_query: Optional[str] = Field(None, description="SQL that answered it")
+    model_tier: Optional[str] = Field(None, description="Where the SQL came from (columnar, cache, semantic, fast or strong)")
+    execution_time: float = Field(..., description="Seconds to translate and run it")
+
+class EntityResolution(BaseModel):
+    mention: str = Field(..., description="Text as typed")
+    value: str = Field(..., description="Stored value it was resolved to")
+    kind: str = Field(..., description="employee, department or job_title")
+    method: str = Field(..., description="exact, prefix or fuzzy")
+    score: float = Field(..., description="Match score (trigram similarity for fuzzy matches)")
 
 class QueryResponse(BaseModel):
     response: str = Field(..., description="Natural language response to the query")
     confidence: float = Field(..., ge=0.0, le=1.0, description="Confidence score of the response")
     sql_query: Optional[str] = Field(None, description="SQL query used to generate the response")
     error: Optional[str] = Field(None, description="Error message if query processing failed")
+    model_tier: Optional[str] = Field(None, description="Model tier that produced the SQL (fast, strong, cache, semantic, decomposed, approximate or columnar)")
+    sub_queries: Optional[List[SubQueryResult]] = Field(None, description="Parts a compound question was split into")
+    approximate: Optional[bool] = Field(None, description="Whether the answer was estimated from a sample")
+    sample_fraction: Optional[float] = Field(None, description="Fraction of activity rows sampled")
+    confidence_intervals: Optional[List[ConfidenceInterval]] = Field(None, description="Interval per estimated value")
+    refinement_id: Optional[str] = Field(None, description="Poll /query/refinements/{id} for the exact answer")
+    resolved_query: Optional[str] = Field(None, description="Question as answered, after entity resolution")
+    resolved_entities: Optional[List[EntityResolution]] = Field(None, description="Mentions rewritten to stored values")
+
+class RefinementStatus(BaseModel):
+    id: str = Field(..., description="Refinement identifier")
+    status: str = Field(..., description="running, done or failed")
+    result: Optional[QueryResponse] = Field(None, description="Exact answer once done")
+    error: Optional[str] = Field(None, description="Error message if the exact query failed")
 
 class BenchmarkResult(BaseModel):
     query: str = Field(..., description="The test query")
@@ -53,10 +114,238 @@ class BenchmarkResult(BaseModel):
     success: bool = Field(..., description="Whether the query was processed successfully")
     error: Optional[str] = Field(None, description="Error message if query failed")
     sql_query: Optional[str] = Field(None, description="SQL query used to generate the response")
+    model_tier: Optional[str] = Field(None, description="Model tier that produced the final SQL")
+    escalated: bool = Field(False, description="Whether the query was escalated to the strong model")
+    translate_time: float = Field(0.0, description="Seconds spent getting SQL from the model or caches")
+    execute_time: float = Field(0.0, description="Seconds spent validating and running the SQL")
+    result_checksum: Optional[str] = Field(None, description="Checksum of the normalized result rows")
+    matches_expected: Optional[bool] = Field(None, description="Whether the result contains the reference answer")
+
+class TierStats(BaseModel):
+    queries: int = Field(..., description="Queries whose final SQL came from this tier")
+    successful_queries: int = Field(..., description="Successfully processed queries")
+    escalated_queries: int = Field(..., description="Queries escalated to this tier after a failure")
+    success_rate: float = Field(..., description="Fraction of queries processed successfully")
+    average_execution_time: float = Field(..., description="Average execution time in seconds")
 
 class BenchmarkResponse(BaseModel):
     total_queries: int = Field(..., description="Total number of queries tested")
     successful_queries: int = Field(..., description="Number of successfully processed queries")
     average_execution_time: float = Field(..., description="Average execution time in seconds")
     query_type_distribution: Dict[str, int] = Field(..., description="Distribution of query types")
-    results: List[BenchmarkResult] = Field(..., description="Detailed results for each query") 
\ No newline at end of file
+    tier_stats: Dict[str, TierStats] = Field(default_factory=dict, description="Latency and success rate per model tier")
+    validation_rejections: int = Field(0, description="Generated SQL statements rejected by the static validator")
+    results: List[BenchmarkResult] = Field(..., description="Detailed results for each query")
+    matched_answers: int = Field(0, description="Queries whose result contains the reference answer")
+    run_id: Optional[int] = Field(None, description="Id of the stored run, for GET /benchmark/compare")
+    git_revision: Optional[str] = Field(None, description="Code revision the run was made with")
+    prompt_version: Optional[str] = Field(None, description="Version of the system prompt the run was made with")
+
+class BenchmarkRunSummary(BaseModel):
+    id: int = Field(..., description="Run id")
+    created_at: datetime = Field(..., description="When the run finished (UTC)")
+    git_revision: str = Field(..., description="Code revision the run was made with")
+    dialect: str = Field(..., description="SQL dialect of the database")
+    fast_model: str = Field(..., description="Fast tier model")
+    strong_model: str = Field(..., description="Strong tier model")
+    prompt_version: str = Field(..., description="Version of the system prompt")
+    total_queries: int = Field(..., description="Total number of queries tested")
+    successful_queries: int = Field(..., description="Number of successfully processed queries")
+    matched_answers: int = Field(..., description="Queries whose result contains the reference answer")
+    average_execution_time: float = Field(..., description="Average execution time of successful queries in seconds")
+
+class BenchmarkQueryDiff(BaseModel):
+    query: str = Field(..., description="The test query")
+    base_time: Optional[float] = Field(None, description="Execution time in the base run, in seconds")
+    head_time: Optional[float] = Field(None, description="Execution time in the head run, in seconds")
+    base_translate_time: Optional[float] = Field(None, description="Translation time in the base run")
+    head_translate_time: Optional[float] = Field(None, description="Translation time in the head run")
+    base_execute_time: Optional[float] = Field(None, description="SQL time in the base run")
+    head_execute_time: Optional[float] = Field(None, description="SQL time in the head run")
+    base_success: Optional[bool] = Field(None, description="Whether the query succeeded in the base run")
+    head_success: Optional[bool] = Field(None, description="Whether the query succeeded in the head run")
+    base_matches_expected: Optional[bool] = Field(None, description="Reference answer match in the base run")
+    head_matches_expected: Optional[bool] = Field(None, description="Reference answer match in the head run")
+    answer_changed: bool = Field(..., description="Whether the result checksum differs between the runs")
+    latency_regression: bool = Field(..., description="Whether the head run is slower beyond the threshold")
+    accuracy_regression: bool = Field(..., description="Whether the query failed or lost the reference answer")
+
+class BenchmarkComparison(BaseModel):
+    base: BenchmarkRunSummary = Field(..., description="The run compared against")
+    head: BenchmarkRunSummary = Field(..., description="The newer run")
+    threshold: float = Field(..., description="Relative slowdown flagged as a latency regression")
+    min_seconds: float = Field(..., description="Absolute slowdown below which latency changes are ignored")
+    latency_regressions: int = Field(..., description="Queries slower beyond the threshold")
+    accuracy_regressions: int = Field(..., description="Queries that started failing or lost the reference answer")
+    changed_answers: int = Field(..., description="Queries whose result checksum changed")
+    regressed: bool = Field(..., description="Whether any latency or accuracy regression was found")
+    queries: List[BenchmarkQueryDiff] = Field(..., description="Per-query comparison, flagged queries first")
+
+class ColumnarCacheStats(BaseModel):
+    enabled: bool = Field(..., description="Whether the columnar fast path is enabled")
+    loaded: bool = Field(..., description="Whether the snapshot has been built")
+    rows: int = Field(..., description="Number of activity rows in the snapshot")
+    capacity: int = Field(..., description="Allocated row capacity of the column arrays")
+    employees: int = Field(..., description="Number of employee categories")
+    departments: int = Field(..., description="Number of department categories")
+    array_bytes: int = Field(..., description="Bytes held by the NumPy column arrays")
+    category_bytes: int = Field(..., description="Approximate bytes held by category dictionaries")
+    memory_bytes: int = Field(..., description="Total approximate memory footprint in bytes")
+    full_loads: int = Field(..., description="Number of full snapshot builds")
+    last_load_seconds: float = Field(..., description="Duration of the last full build in seconds")
+    syncs: int = Field(..., description="Number of incremental syncs against the database")
+    last_sync_seconds: float = Field(..., description="Duration of the last incremental sync in seconds")
+    incremental_rows: int = Field(..., description="Rows applied incrementally since the last full build")
+    hits: int = Field(..., description="Questions answered from the snapshot")
+    misses: int = Field(..., description="Aggregate-looking questions that did not match a template")
+
+class LeaderboardEntry(BaseModel):
+    rank: int = Field(..., description="1-based rank")
+    employee_id: int = Field(..., description="Employee ID")
+    full_name: str = Field(..., description="Employee name")
+    department: Optional[str] = Field(None, description="Employee department")
+    value: float = Field(..., description="Metric value of the activity row, or the employee's total")
+    week_number: Optional[int] = Field(None, description="Week of the activity row (activity leaderboards)")
+    activity_id: Optional[int] = Field(None, description="Activity row ID (activity leaderboards)")
+
+class Leaderboard(BaseModel):
+    metric: str = Field(..., description="Ranked metric")
+    by: str = Field(..., description="activity (single rows) or employee (totals)")
+    week: Optional[int] = Field(None, description="Week the activity ranking is limited to")
+    department: Optional[str] = Field(None, description="Department the ranking is limited to")
+    window: Optional[int] = Field(None, description="Latest weeks the employee totals cover; None for all weeks")
+    latest_week: int = Field(..., description="Latest week with activity")
+    entries: List[LeaderboardEntry] = Field(..., description="Highest first")
+
+class LeaderboardStats(BaseModel):
+    enabled: bool = Field(..., description="Whether the ranking fast path is enabled")
+    loaded: bool = Field(..., description="Whether the leaderboards have been built")
+    k: int = Field(..., description="Entries kept per leaderboard")
+    windows: List[int] = Field(..., description="Rolling windows (in weeks) with maintained employee totals")
+    latest_week: int = Field(..., description="Latest week with activity")
+    activities: int = Field(..., description="Activity rows reflected in the leaderboards")
+    employees: int = Field(..., description="Known employees")
+    row_leaderboards: int = Field(..., description="Activity leaderboards (overall, per week, per department)")
+    total_leaderboards: int = Field(..., description="Employee total leaderboards (per window and department)")
+    full_loads: int = Field(..., description="Number of full builds")
+    last_load_seconds: float = Field(..., description="Duration of the last full build in seconds")
+    syncs: int = Field(..., description="Number of incremental syncs against the database")
+    hits: int = Field(..., description="Questions answered from the leaderboards")
+    misses: int = Field(..., description="Ranking-looking questions that did not match a template")
+
+class EntityIndexStats(BaseModel):
+    enabled: bool = Field(..., description="Whether questions are resolved before answering")
+    loaded: bool = Field(..., description="Whether the index has been built")
+    employees: int = Field(..., description="Indexed employee names")
+    departments: int = Field(..., description="Indexed departments")
+    job_titles: int = Field(..., description="Indexed job titles")
+    trigrams: int = Field(..., description="Distinct trigrams in the fuzzy index")
+    last_load_seconds: float = Field(..., description="Duration of the last build in seconds")
+    resolved_mentions: int = Field(..., description="Mentions rewritten since start")
+
+class LLMSchedulerStats(BaseModel):
+    queued: int = Field(..., description="Calls waiting for a slot or rate-limit capacity")
+    active: int = Field(..., description="Calls currently in flight")
+    max_concurrency: int = Field(..., description="Maximum concurrent LLM calls")
+    breaker_state: str = Field(..., description="Circuit breaker state: closed, open or half_open")
+    consecutive_failures: int = Field(..., description="Retryable failures since the last success")
+    calls: int = Field(..., description="Calls submitted to the scheduler")
+    succeeded: int = Field(..., description="Calls that returned a response")
+    failed: int = Field(..., description="Calls that failed after retries")
+    retries: int = Field(..., description="Retries after 429/5xx/timeout errors")
+    rejected_open: int = Field(..., description="Calls rejected because the breaker was open")
+    queue_timeouts: int = Field(..., description="Calls that timed out waiting in the queue")
+
+class LatencySummary(BaseModel):
+    p50_ms: float = Field(..., description="Median over recent samples, in milliseconds")
+    p95_ms: float = Field(..., description="95th percentile over recent samples, in milliseconds")
+    max_ms: float = Field(..., description="Maximum over recent samples, in milliseconds")
+
+class DBPoolStats(BaseModel):
+    pool_class: str = Field(..., description="SQLAlchemy pool implementation")
+    size: Optional[int] = Field(None, description="Persistent connections kept in the pool")
+    max_overflow: Optional[int] = Field(None, description="Extra connections allowed above the pool size")
+    capacity: Optional[int] = Field(None, description="Maximum connections checked out at once")
+    checked_out: int = Field(..., description="Connections currently checked out")
+    idle: Optional[int] = Field(None, description="Connections idle in the pool")
+    overflow: Optional[int] = Field(None, description="Overflow connections currently open")
+    peak_checked_out: int = Field(..., description="Most connections checked out at once since start")
+    saturation: Optional[float] = Field(None, description="checked_out / capacity")
+    peak_saturation: Optional[float] = Field(None, description="peak_checked_out / capacity")
+    checkout_wait: LatencySummary = Field(..., description="Time spent waiting for (or opening) a connection")
+    hold: LatencySummary = Field(..., description="Time a connection stayed checked out")
+    checkouts: int = Field(..., description="Connections checked out since start")
+    waited_checkouts: int = Field(..., description="Checkouts that waited more than a millisecond")
+    timeouts: int = Field(..., description="Checkouts that gave up after DB_POOL_TIMEOUT")
+    connects: int = Field(..., description="New database connections opened")
+    invalidated: int = Field(..., description="Connections discarded as broken (e.g. by pre-ping)")
+
+class ExampleIndexStats(BaseModel):
+    examples: int = Field(..., description="Stored (question, SQL) examples")
+    capacity: int = Field(..., description="Maximum examples before the oldest are replaced")
+    memory_bytes: int = Field(..., description="Size of the embedding matrix")
+    added: int = Field(..., description="Examples added since startup")
+    semantic_hits: int = Field(..., description="Questions answered with a stored paraphrase's SQL")
+    semantic_misses: int = Field(..., description="Lookups without a close enough paraphrase")
+    retrievals: int = Field(..., description="Prompts built with retrieved few-shot examples")
+
+class LLMUsageRow(BaseModel):
+    key: str = Field(..., description="Group value: UTC day, model, endpoint or tier")
+    requests: int = Field(..., description="Translation requests, including cache hits")
+    cache_hits: int = Field(..., description="Requests answered from the translation cache")
+    errors: int = Field(..., description="LLM calls that failed")
+    prompt_tokens: int = Field(..., description="Prompt tokens billed")
+    completion_tokens: int = Field(..., description="Completion tokens billed")
+    total_tokens: int = Field(..., description="Prompt plus completion tokens")
+    cost_usd: float = Field(..., description="Estimated cost from the configured model prices")
+    average_latency_ms: float = Field(..., description="Mean latency including queueing and retries")
+
+class LLMUsageReport(BaseModel):
+    days: int = Field(..., description="Number of UTC days covered, including today")
+    group_by: str = Field(..., description="day, model, endpoint or tier")
+    rows: List[LLMUsageRow] = Field(..., description="One row per group value")
+
+class LLMBudgetStatus(BaseModel):
+    daily_token_budget: int = Field(..., description="Daily token budget; 0 means unlimited")
+    tokens_today: int = Field(..., description="Tokens spent today by all workers, as last synced")
+    remaining_tokens: Optional[int] = Field(None, description="Tokens left today; null without a budget")
+    mode: str = Field(..., description="normal, fast_only, cache_only or template_only")
+    queued: int = Field(..., description="Ledger entries waiting to be written")
+    recorded: int = Field(..., description="Entries recorded by this worker")
+    written: int = Field(..., description="Entries written to the ledger table")
+    dropped: int = Field(..., description="Entries shed because the queue was full")
+    write_errors: int = Field(..., description="Entries lost to failed ledger writes")
+    budget_rejections: int = Field(..., description="Questions refused because of the budget")
+
+class ExportJobRequest(BaseModel):
+    table: str = Field(..., description="Table to export: employees or activities")
+    format: str = Field("csv", description="Artifact format: csv or json")
+    compression: str = Field("gzip", description="Artifact compression: gzip, or zstd when installed")
+
+class ExportJobStatus(BaseModel):
+    id: str = Field(..., description="Job identifier")
+    table: str = Field(..., description="Exported table")
+    format: str = Field(..., description="Artifact format")
+    compression: str = Field(..., description="Artifact compression")
+    status: str = Field(..., description="queued, running, done or failed")
+    rows_written: int = Field(..., description="Rows written to the artifact so far")
+    total_rows: Optional[int] = Field(None, description="Rows to export, once counted")
+    size_bytes: int = Field(..., description="Compressed artifact size once done")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+    reused: bool = Field(False, description="Whether an existing job or artifact was reused for this request")
+    download_url: Optional[str] = Field(None, description="Where to download the artifact once done")
+
+class ChangeEntry(BaseModel):
+    seq: int = Field(..., description="Change sequence number")
+    table: str = Field(..., description="employees or employee_activities")
+    operation: str = Field(..., description="insert, update, delete, bulk_update or bulk_delete")
+    id: Optional[int] = Field(None, description="Changed row id; null for bulk markers")
+    data: Optional[Dict[str, Any]] = Field(None, description="Current row, or null when it no longer exists")
+
+class ChangeFeedResponse(BaseModel):
+    changes: List[ChangeEntry] = Field(..., description="Latest change per row, in sequence order")
+    next_cursor: int = Field(..., description="Pass as `since` to continue after this page")
+    latest_cursor: int = Field(..., description="Settled high-water mark: every change up to it is readable, "
+                                                "so a consumer can resync and continue from it without gaps")
+    has_more: bool = Field(..., description="Whether more settled changes are available")
+
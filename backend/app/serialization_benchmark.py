@@ -0,0 +1,89 @@
+"""
+Measure CPU per row of the list-endpoint serialization paths.
+
+Compares the ORM + Pydantic response_model + stdlib json path with the Core-row +
+fast JSON path used when FAST_JSON_ENABLED is on, on a synthetic in-memory SQLite
+database of the requested size.
+
+Usage:
+    python -m app.serialization_benchmark --rows 1000,10000,50000 --repeat 5
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from .db.database import make_engine
+from .db import models
+from .schemas import EmployeeActivity
+from .api.endpoints import activity_select, activity_rows
+from .api.fast_json import dumps
+
+def build_database(rows: int):
+    """In-memory SQLite with 100 employees and `rows` activity records"""
+    engine = make_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    rng = random.Random(0)
+    with engine.begin() as connection:
+        connection.execute(insert(models.Employee), [
+            {"id": i, "email": f"employee{i}@company.com", "full_name": f"Employee {i}",
+             "job_title": "Analyst", "department": "Finance"}
+            for i in range(1, 101)
+        ])
+        connection.execute(insert(models.EmployeeActivity), [
+            {"id": i, "employee_id": rng.randint(1, 100), "week_number": rng.randint(1, 10),
+             "meetings_attended": rng.randint(0, 15), "hours_worked": round(rng.uniform(30, 50), 1),
+             "total_sales": round(rng.uniform(0, 100000), 2) if rng.random() < 0.4 else None,
+             "activities": "Prepared quarterly forecasts and reviewed budget variances with the team"}
+            for i in range(1, rows + 1)
+        ])
+    return sessionmaker(bind=engine)
+
+ACTIVITY_LIST = TypeAdapter(List[EmployeeActivity])
+
+def orm_path(db) -> bytes:
+    """What a response_model endpoint does: ORM load, validate, dump, stdlib json"""
+    activities = db.query(models.EmployeeActivity).all()
+    validated = ACTIVITY_LIST.validate_python(activities, from_attributes=True)
+    return json.dumps(ACTIVITY_LIST.dump_python(validated, mode="json")).encode("utf-8")
+
+def fast_path(db) -> bytes:
+    """Core rows encoded directly"""
+    return dumps(activity_rows(db, activity_select()))
+
+def measure(Session, func, repeat: int):
+    """Median process CPU seconds of `func` over fresh sessions"""
+    samples = []
+    for _ in range(repeat + 1):
+        db = Session()
+        try:
+            started = time.process_time()
+            body = func(db)
+            samples.append(time.process_time() - started)
+        finally:
+            db.close()
+    return statistics.median(samples[1:]), body  # first run warms caches
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list-endpoint serialization CPU per row")
+    parser.add_argument("--rows", default="1000,10000,50000", help="Comma-separated activity row counts")
+    parser.add_argument("--repeat", type=int, default=5, help="Measured runs per path")
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'orm us/row':>12} {'fast us/row':>12} {'speedup':>8} {'bytes':>10}")
+    for rows in [int(part) for part in args.rows.split(",")]:
+        Session = build_database(rows)
+        orm_seconds, orm_body = measure(Session, orm_path, args.repeat)
+        fast_seconds, fast_body = measure(Session, fast_path, args.repeat)
+        assert json.loads(orm_body) == json.loads(fast_body), "serialization paths disagree"
+        print(f"{rows:>8} {orm_seconds / rows * 1e6:>12.2f} {fast_seconds / rows * 1e6:>12.2f} "
+              f"{orm_seconds / fast_seconds:>7.1f}x {len(fast_body):>10}")
+
+if __name__ == "__main__":
+    main()
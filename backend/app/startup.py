@@ -0,0 +1,149 @@
+"""
+Application warm start: lazy client initialization, pool pre-warming and cache preloading.
+"""
+import asyncio
+import os
+import time
+from typing import Any, Dict
+
+from sqlalchemy import text
+
+from .db.database import engine, SessionLocal, DIALECT
+from .db import models  # noqa: F401  (registers the tables on Base.metadata for create_schema)
+from .db.data_versions import ensure_versions
+from .db.partitioning import prepare_schema
+from .db.change_log import prune_change_log
+from .db.columnar import columnar_cache
+from .db.leaderboards import LEADERBOARDS_ENABLED, leaderboards
+from .db.reference_queries import REFERENCE_QUERIES
+from .llm.query_processor import get_client, build_system_prompt, preload_translations, load_translation_store
+from .llm.example_index import seed_examples
+from .llm.entity_index import ENTITY_RESOLUTION_ENABLED, entity_index
+
+# Warm start configuration
+DB_POOL_PREWARM = int(os.getenv("DB_POOL_PREWARM", "2"))
+DB_STARTUP_RETRY_SECONDS = float(os.getenv("DB_STARTUP_RETRY_SECONDS", "2"))
+PRELOAD_REFERENCE_TRANSLATIONS = os.getenv("PRELOAD_REFERENCE_TRANSLATIONS", "true").lower() == "true"
+PRELOAD_COLUMNAR_CACHE = os.getenv("PRELOAD_COLUMNAR_CACHE", "true").lower() == "true"
+PRELOAD_LEADERBOARDS = os.getenv("PRELOAD_LEADERBOARDS", "true").lower() == "true"
+
+class Readiness:
+    """Tracks warm-start progress for the /ready endpoint"""
+
+    def __init__(self):
+        self.ready = False
+        self.started_at = time.perf_counter()
+        self.ready_after_seconds = None
+        self.phases: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.db_attempts = 0
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "status": "ready" if self.ready else "starting",
+            "ready_after_seconds": self.ready_after_seconds,
+            "phases": dict(self.phases),
+            "errors": dict(self.errors),
+            "db_attempts": self.db_attempts,
+        }
+
+readiness = Readiness()
+
+async def _timed(name: str, func, *args):
+    """Run a blocking warm-up step in a thread and record its duration"""
+    started = time.perf_counter()
+    try:
+        return await asyncio.to_thread(func, *args)
+    except Exception as e:
+        # Optional caches must not keep the worker from serving
+        readiness.errors[name] = str(e)
+    finally:
+        readiness.phases[name] = time.perf_counter() - started
+
+def create_schema():
+    """Create database tables (no-op when they already exist), partitions and calendar weeks"""
+    prepare_schema(engine)
+    with engine.begin() as connection:
+        ensure_versions(connection)
+
+def prewarm_pool(connections: int):
+    """Open pooled connections up front so the first requests skip the handshake"""
+    checked_out = []
+    try:
+        for _ in range(connections):
+            connection = engine.connect()
+            connection.execute(text("SELECT 1"))
+            checked_out.append(connection)
+    finally:
+        for connection in checked_out:
+            connection.close()
+
+def preload_columnar_cache():
+    db = SessionLocal()
+    try:
+        columnar_cache.load(db)
+    finally:
+        db.close()
+
+def preload_leaderboards():
+    db = SessionLocal()
+    try:
+        leaderboards.load(db)
+    finally:
+        db.close()
+
+def preload_entity_index():
+    db = SessionLocal()
+    try:
+        entity_index.load(db)
+    finally:
+        db.close()
+
+def prune_changes():
+    """Drop change feed entries past their retention window"""
+    db = SessionLocal()
+    try:
+        return prune_change_log(db)
+    finally:
+        db.close()
+
+async def wait_for_database():
+    """Create the schema, retrying until the database accepts connections"""
+    while True:
+        readiness.db_attempts += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(create_schema)
+            readiness.phases["schema"] = time.perf_counter() - started
+            readiness.errors.pop("schema", None)
+            return
+        except Exception as e:
+            readiness.errors["schema"] = str(e)
+            await asyncio.sleep(DB_STARTUP_RETRY_SECONDS)
+
+async def warm_database():
+    """Schema first, then pooled connections and data caches concurrently"""
+    await wait_for_database()
+    steps = [_timed("pool_prewarm", prewarm_pool, DB_POOL_PREWARM)]
+    if PRELOAD_REFERENCE_TRANSLATIONS:
+        steps.append(_timed("translations", preload_translations, REFERENCE_QUERIES))
+    if PRELOAD_COLUMNAR_CACHE:
+        steps.append(_timed("columnar_cache", preload_columnar_cache))
+    if PRELOAD_LEADERBOARDS and LEADERBOARDS_ENABLED:
+        steps.append(_timed("leaderboards", preload_leaderboards))
+    if ENTITY_RESOLUTION_ENABLED:
+        steps.append(_timed("entity_index", preload_entity_index))
+    steps.append(_timed("change_log_prune", prune_changes))
+    await asyncio.gather(*steps)
+
+async def warm_start():
+    """Bring the worker to a ready state; steps without a database dependency run alongside"""
+    await asyncio.gather(
+        warm_database(),
+        _timed("llm_client", get_client),
+        _timed("schema_prompt", build_system_prompt, DIALECT),
+        _timed("translation_store", load_translation_store, DIALECT),
+        _timed("example_index", seed_examples, REFERENCE_QUERIES, DIALECT),
+    )
+    readiness.ready = True
+    readiness.ready_after_seconds = time.perf_counter() - readiness.started_at
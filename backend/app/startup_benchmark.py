@@ -0,0 +1,54 @@
+"""
+Measure worker cold start: module import time and time until /ready.
+
+Usage:
+    python -m app.startup_benchmark --runs 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+READY_SNIPPET = """
+import time
+t = time.perf_counter()
+from fastapi.testclient import TestClient
+from app.main import app
+with TestClient(app) as client:
+    while client.get("/ready").status_code != 200:
+        if time.perf_counter() - t > {timeout}:
+            raise SystemExit("not ready after {timeout}s")
+        time.sleep(0.005)
+    print(time.perf_counter() - t)
+    print(client.get("/ready").json())
+"""
+
+def run_snippet(code: str) -> str:
+    """Run a snippet in a fresh interpreter so every measurement is a cold start"""
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return completed.stdout.strip()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark worker cold start")
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold starts to measure")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for readiness")
+    args = parser.parse_args()
+
+    import_times, ready_times, last_status = [], [], ""
+    for _ in range(args.runs):
+        import_times.append(float(run_snippet(IMPORT_SNIPPET)))
+        output = run_snippet(READY_SNIPPET.format(timeout=args.timeout)).splitlines()
+        ready_times.append(float(output[0]))
+        last_status = output[1]
+
+    print(f"Import app.main:   median {statistics.median(import_times) * 1000:.1f} ms "
+          f"(min {min(import_times) * 1000:.1f}, max {max(import_times) * 1000:.1f})")
+    print(f"Import to /ready:  median {statistics.median(ready_times) * 1000:.1f} ms "
+          f"(min {min(ready_times) * 1000:.1f}, max {max(ready_times) * 1000:.1f})")
+    print(f"Last warm start:   {last_status}")
+
+if __name__ == "__main__":
+    main()
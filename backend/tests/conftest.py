@@ -0,0 +1,57 @@
+"""
+Shared setup for the backend tests: an embedded SQLite database seeded with the demo data
+and the fake LLM provider, so the suite runs without PostgreSQL or an API key.
+
+test_queries.py is a manual script against a running server and is not collected.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+_workdir = tempfile.mkdtemp(prefix="employee-tracker-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_workdir}/tests.db")
+os.environ.setdefault("TRANSLATION_STORE_PATH", os.path.join(_workdir, "translation_store.db"))
+os.environ.setdefault("EXPORT_DIR", os.path.join(_workdir, "exports"))
+os.environ.setdefault("LLM_PROVIDER", "fake")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+collect_ignore = ["test_queries.py"]
+
+@pytest.fixture(scope="session")
+def seeded_db():
+    """Schema and demo data in the test database"""
+    from app.db.database import SessionLocal
+    from app.db.seed_data import seed_database
+    from app.startup import create_schema
+
+    create_schema()
+    db = SessionLocal()
+    try:
+        seed_database(db)
+    finally:
+        db.close()
+
+@pytest.fixture
+def db(seeded_db):
+    from app.db.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture(scope="session")
+def client(seeded_db):
+    """API client for a warmed-up app"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        deadline = time.time() + 60
+        while client.get("/ready").status_code != 200 and time.time() < deadline:
+            time.sleep(0.05)
+        yield client
@@ -0,0 +1,56 @@
+import math
+
+import numpy as np
+import pytest
+from sqlalchemy import text
+
+from app.db import approximate as approximate_module
+from app.db.approximate import approximate, estimate
+from app.db.columnar import columnar_cache
+
+@pytest.fixture
+def sampled(monkeypatch):
+    """Sample a few dozen rows of the small test table instead of reading it all"""
+    monkeypatch.setattr(approximate_module, "APPROXIMATE_SAMPLE_ROWS", 40)
+    monkeypatch.setattr(approximate_module, "APPROXIMATE_MIN_GROUP_ROWS", 1)
+
+@pytest.mark.parametrize("question", [
+    "What is the average hours worked by Data Analysts?",
+    "What is the total sales revenue of the engineering team?",
+    "What is the average hours worked by employees hired before 2020?",
+])
+def test_unbound_filters_are_not_approximated(db, sampled, question):
+    assert approximate(question, db) is None
+
+def test_sampled_answer_carries_intervals(db, sampled):
+    result = approximate("What is the total hours worked?", db)
+    assert result["approximate"] and 0 < result["sample_fraction"] < 1
+    exact = db.execute(text("SELECT SUM(hours_worked) FROM employee_activities")).scalar()
+    (interval,) = result["intervals"]
+    assert interval["lower"] <= interval["estimate"] <= interval["upper"]
+    assert abs(interval["estimate"] - exact) < exact  # same order of magnitude
+
+def test_snapshot_sample_draws_distinct_rows(db):
+    columnar_cache.ensure_fresh(db)
+    values = [row[0] for row in db.execute(text("SELECT hours_worked FROM employee_activities"))]
+    n = columnar_cache.size
+    _, [(_, count, full_sum, _)] = columnar_cache.moments("hours_worked")
+    for seed in range(5):
+        _, [(_, sampled_count, sampled_sum, _)] = columnar_cache.moments(
+            "hours_worked", sample_rows=n - 1, rng=np.random.default_rng(seed))
+        # Without replacement, all rows but one are in the sample exactly once
+        assert sampled_count == count - 1
+        assert any(math.isclose(full_sum - sampled_sum, value, abs_tol=1e-6) for value in values)
+
+def test_full_sample_has_no_sampling_error():
+    spec = {"metric": "hours_worked", "func": "sum", "group_by": None}
+    rows, [interval] = estimate(spec, 1.0, [(None, 10, 400.0, 16_400.0)])
+    assert rows == [(400.0,)] and interval["lower"] == interval["upper"] == 400.0
+
+def test_query_reports_the_approximate_tier(client, sampled):
+    body = client.post("/api/v1/query", json={"query": "What is the total hours worked?", "approximate": True}).json()
+    assert body["approximate"] is True and body["model_tier"] == "approximate"
+
+def test_exact_fallback_reports_the_columnar_tier(client):
+    body = client.post("/api/v1/query", json={"query": "What is the total hours worked?", "approximate": True}).json()
+    assert body["approximate"] is False and body["model_tier"] == "columnar"
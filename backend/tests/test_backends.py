@@ -0,0 +1,24 @@
+import pytest
+from sqlalchemy import text
+
+from app.db.database import make_engine
+from app.db.partitioning import prepare_schema
+from app.llm.query_processor import build_system_prompt
+
+@pytest.mark.parametrize("scheme, suffix", [("sqlite", "db"), ("duckdb", "duckdb")])
+def test_embedded_schema_generates_ids_for_raw_inserts(tmp_path, scheme, suffix):
+    engine = make_engine(f"{scheme}:///{tmp_path}/embedded.{suffix}")
+    try:
+        prepare_schema(engine)
+        with engine.begin() as connection:
+            connection.execute(text("INSERT INTO employees (full_name, email) VALUES ('Raw Insert', 'raw@example.com')"))
+            connection.execute(text("INSERT INTO employees (full_name, email) VALUES ('Second', 'second@example.com')"))
+            ids = connection.execute(text("SELECT id FROM employees ORDER BY id")).scalars().all()
+        assert ids == [1, 2]
+    finally:
+        engine.dispose()
+
+def test_system_prompt_names_the_dialect():
+    assert "SQLite" in build_system_prompt("sqlite")
+    assert "DuckDB" in build_system_prompt("duckdb")
+    assert "PostgreSQL" in build_system_prompt("postgresql")
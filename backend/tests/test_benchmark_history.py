@@ -0,0 +1,68 @@
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from app.benchmark_history import answers_match, compare_runs, result_checksum
+
+def test_checksum_ignores_row_order_and_numeric_types():
+    assert result_checksum([(1, "a"), (2.0, "b")]) == result_checksum([(2, "b"), (Decimal("1.000"), "a")])
+    assert result_checksum([(1, "a")]) != result_checksum([(1, "b")])
+
+@pytest.mark.parametrize("expected, actual, matches", [
+    ([(1, "a")], [("a", 1)], True),  # any column order
+    ([(1,)], [(1, "Wei Zhang")], True),  # extra columns
+    ([(1,), (2,)], [(2,), (1,)], True),
+    ([(1,)], [(1,), (1,)], False),  # extra rows
+    ([(1,)], [(2,)], False),
+    ([(41.999,)], [(42.0,)], True),  # AVG precision differs between backends
+])
+def test_answers_match(expected, actual, matches):
+    assert answers_match(expected, actual) is matches
+
+def run(run_id, *queries):
+    return SimpleNamespace(
+        id=run_id, created_at=datetime(2024, 9, 1), git_revision="abc", dialect="sqlite", fast_model="fast",
+        strong_model="strong", prompt_version="v1", total_queries=len(queries),
+        successful_queries=sum(query.success for query in queries), matched_answers=0,
+        average_execution_time=0.0, queries=list(queries),
+    )
+
+def query(question, seconds, success=True, checksum="c1", matches=True):
+    return SimpleNamespace(query=question, execution_time=seconds, translate_time=seconds, execute_time=0.0,
+                           success=success, result_checksum=checksum, matches_expected=matches)
+
+def test_compare_flags_latency_accuracy_and_changed_answers():
+    base = run(1, query("slow", 1.0), query("broken", 0.5), query("changed", 0.2), query("dropped", 0.1),
+               query("noise", 0.01))
+    head = run(2, query("slow", 1.5), query("broken", 0.1, success=False, matches=None),
+               query("changed", 0.2, checksum="c2"), query("noise", 0.04))
+    comparison = compare_runs(base, head, threshold=0.2, min_seconds=0.05)
+    flags = {diff["query"]: (diff["latency_regression"], diff["accuracy_regression"], diff["answer_changed"])
+             for diff in comparison["queries"]}
+    assert flags == {
+        "slow": (True, False, False),
+        "broken": (False, True, False),
+        "changed": (False, False, True),
+        "dropped": (False, True, False),
+        "noise": (False, False, False),  # 4x slower but under min_seconds
+    }
+    assert comparison["regressed"] and comparison["latency_regressions"] == 1
+    assert comparison["accuracy_regressions"] == 2 and comparison["changed_answers"] == 1
+    assert comparison["queries"][-1]["query"] == "noise"  # regressions sort first
+
+def test_benchmark_runs_are_stored_and_compared(client):
+    first = client.post("/api/v1/benchmark").json()
+    second = client.post("/api/v1/benchmark").json()
+    assert second["run_id"] > first["run_id"]
+    assert second["matched_answers"] == second["total_queries"]
+
+    runs = client.get("/api/v1/benchmark/runs", params={"limit": 2}).json()
+    assert [summary["id"] for summary in runs] == [second["run_id"], first["run_id"]]
+    comparison = client.get("/api/v1/benchmark/compare").json()
+    assert comparison["base"]["id"] == first["run_id"] and comparison["head"]["id"] == second["run_id"]
+    assert comparison["accuracy_regressions"] == 0 and comparison["changed_answers"] == 0
+
+def test_compare_unknown_run_is_404(client):
+    assert client.get("/api/v1/benchmark/compare", params={"head": 10 ** 9}).status_code == 404
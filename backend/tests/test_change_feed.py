@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from app.db import change_log, models
+from app.db.change_log import database_now, latest_seq, settled_seq
+from app.db.database import SessionLocal
+
+def create_employee(client, email):
+    response = client.post("/api/v1/employees/", json={
+        "full_name": "Feed Probe", "email": email, "job_title": "IT Manager", "department": "IT",
+        "hire_date": "2024-01-01",
+    })
+    assert response.status_code == 200
+    return response.json()["id"]
+
+def test_latest_cursor_excludes_unsettled_changes(client, db, monkeypatch):
+    monkeypatch.setattr(change_log, "CHANGE_FEED_SETTLE_SECONDS", 3600)
+    before = settled_seq(db)
+    create_employee(client, "feed-unsettled@example.com")
+    db.rollback()
+    body = client.get("/api/v1/changes", params={"since": before}).json()
+    # Just written: a lower sequence number could still be uncommitted, so neither is reported yet
+    assert body["changes"] == []
+    assert body["latest_cursor"] == before < latest_seq(db)
+
+def test_settled_changes_carry_the_current_row(client, db, monkeypatch):
+    monkeypatch.setattr(change_log, "CHANGE_FEED_SETTLE_SECONDS", 0)
+    cursor = settled_seq(db)
+    employee_id = create_employee(client, "feed-settled@example.com")
+
+    body = client.get("/api/v1/changes", params={"since": cursor, "table": "employees"}).json()
+    entries = [entry for entry in body["changes"] if entry["id"] == employee_id]
+    assert len(entries) == 1 and entries[0]["operation"] == "insert"
+    assert entries[0]["data"]["email"] == "feed-settled@example.com"
+    assert body["latest_cursor"] == body["next_cursor"] >= entries[0]["seq"]
+
+    empty = client.get("/api/v1/changes", params={"since": body["next_cursor"]}).json()
+    assert empty["changes"] == [] and empty["next_cursor"] == body["next_cursor"]
+
+def test_entries_are_written_at_commit_by_the_database_clock(seeded_db):
+    db = SessionLocal()
+    try:
+        before = latest_seq(db)
+        employee = models.Employee(full_name="Feed Commit", email="feed-commit@example.com", department="IT",
+                                   job_title="IT Manager", hire_date=date(2024, 1, 1))
+        db.add(employee)
+        db.flush()
+        # The sequence number is taken at commit, not while the transaction is still open
+        assert latest_seq(db) == before
+        db.commit()
+        entry = db.execute(select(models.ChangeLogEntry).where(models.ChangeLogEntry.seq > before)).scalar_one()
+        assert (entry.table_name, entry.row_id, entry.operation) == ("employees", employee.id, "insert")
+        assert abs(database_now(db) - entry.changed_at) < timedelta(seconds=5)
+    finally:
+        db.close()
+
+def test_rolled_back_writes_are_not_logged(seeded_db):
+    db = SessionLocal()
+    try:
+        before = latest_seq(db)
+        db.add(models.Employee(full_name="Feed Rollback", email="feed-rollback@example.com", department="IT",
+                               job_title="IT Manager", hire_date=date(2024, 1, 1)))
+        db.flush()
+        db.rollback()
+        db.commit()
+        assert latest_seq(db) == before
+    finally:
+        db.close()
+
+def test_unknown_table_is_rejected(client):
+    assert client.get("/api/v1/changes", params={"table": "payroll"}).status_code == 400
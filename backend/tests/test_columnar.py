@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import text
+
+from app.db.columnar import ColumnarActivityCache
+
+EMPLOYEES = [(1, "Sarah Johnson", "Sales"), (2, "Wei Zhang", "Finance"), (3, "Na Li", "IT"),
+             (4, "Tao Huang", "Business Development")]
+
+@pytest.fixture
+def cache():
+    """Snapshot of three weeks of synthetic activity rows"""
+    cache = ColumnarActivityCache()
+    rows, activity_id = [], 0
+    for week in (1, 2, 3):
+        for employee_id, full_name, department in EMPLOYEES:
+            activity_id += 1
+            rows.append((activity_id, employee_id, full_name, department, week,
+                         40.0 + employee_id, 1000.0 * employee_id, employee_id))
+    cache._append_rows(rows)
+    cache.loaded = True
+    return cache
+
+@pytest.mark.parametrize("question, expected", [
+    ("What is the total sales revenue generated by the Sales department?",
+     {"metric": "total_sales", "func": "sum", "department": "Sales"}),
+    ("What is the total hours worked by the finance team?", {"metric": "hours_worked", "department": "Finance"}),
+    ("What is the average hours worked by all employees during week 2?",
+     {"metric": "hours_worked", "func": "avg", "week": 2}),
+    ("How many meetings did Na Li attend?", {"metric": "meetings_attended", "employee": (3, "Na Li")}),
+    ("What is Wei Zhang's total sales in week 2?", {"employee": (2, "Wei Zhang"), "week": 2}),
+    ("Sales revenue total by department", {"metric": "total_sales", "group_by": "department"}),
+])
+def test_match_binds_filters(cache, question, expected):
+    spec = cache.match(question)
+    assert spec is not None
+    assert {key: spec[key] for key in expected} == expected
+
+@pytest.mark.parametrize("question", [
+    # Departments without a "department" / "team" suffix
+    "What is the total hours worked by Finance employees?",
+    "Total sales by Sales employees",
+    "What is the total hours worked in week 2 by Finance employees?",
+    # Job titles
+    "What is the average hours worked by Data Analysts?",
+    "What is the total hours worked by Sales Managers?",
+    # Names that are not an exact full name
+    "What is the total sales of Sarah?",
+    "How many meetings did Wei Zang attend?",
+    # Time filters
+    "What is the total hours worked in weeks 2 and 3?",
+    "What is the total hours worked in week 2 and week 3?",
+    "Average hours worked over the last 4 weeks",
+    "Total sales revenue in March",
+    "What is the total hours worked by employees hired recently?",
+    # Thresholds and rankings
+    "What is the total hours worked by employees with more than 40 hours?",
+    "Total sales of the top employee",
+])
+def test_match_declines_unbound_filters(cache, question):
+    assert cache.match(question) is None
+
+def test_aggregate_filters(cache):
+    _, rows = cache.aggregate("hours_worked", "sum", department="Finance")
+    assert rows == [(126.0,)]
+    _, rows = cache.aggregate("total_sales", "avg", group_by="department", week=1)
+    assert rows == [("Business Development", 4000.0), ("Finance", 2000.0), ("IT", 3000.0), ("Sales", 1000.0)]
+
+def test_record_activity_appends(cache):
+    class Activity:
+        id, employee_id, week_number = 100, 2, 4
+        hours_worked, total_sales, meetings_attended = 10.0, None, 1
+
+    cache.record_activity(Activity)
+    _, rows = cache.aggregate("hours_worked", "sum", employee_id=2, week=4)
+    assert rows == [(10.0,)]
+    assert not cache.stale
+
+def test_answer_matches_database(db):
+    cache = ColumnarActivityCache()
+    columns, rows, sql = cache.answer("What is the total hours worked by the Finance department?", db)
+    expected = db.execute(text(
+        "SELECT SUM(ea.hours_worked) FROM employee_activities ea JOIN employees e ON e.id = ea.employee_id "
+        "WHERE e.department = 'Finance'"
+    )).scalar()
+    assert rows == [(round(expected, 2),)]
+    assert "e.department = 'Finance'" in sql
+    assert cache.answer("What is the total hours worked by Finance employees?", db) is None
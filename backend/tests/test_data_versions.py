@@ -0,0 +1,71 @@
+from datetime import date
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.db import data_versions, models
+from app.db.data_versions import read_versions
+from app.db.database import SessionLocal
+
+def employee_version():
+    db = SessionLocal()
+    try:
+        return read_versions(db, ["employees"])["employees"]
+    finally:
+        db.close()
+
+def new_employee(email):
+    return models.Employee(full_name="Version Probe", email=email, department="IT",
+                           job_title="IT Manager", hire_date=date(2024, 1, 1))
+
+def test_version_is_bumped_with_the_write(seeded_db):
+    before = employee_version()
+    db = SessionLocal()
+    try:
+        db.add(new_employee("version-probe@example.com"))
+        db.commit()
+    finally:
+        db.close()
+    assert employee_version() == before + 1
+
+def test_failed_bump_rolls_the_write_back(seeded_db, monkeypatch):
+    def locked(connection, tables):
+        raise OperationalError("UPDATE data_versions", {}, Exception("database is locked"))
+
+    before = employee_version()
+    monkeypatch.setattr(data_versions, "bump_versions", locked)
+    db = SessionLocal()
+    try:
+        db.add(new_employee("failed-bump@example.com"))
+        with pytest.raises(OperationalError):
+            db.commit()
+        db.rollback()
+        assert db.query(models.Employee).filter_by(email="failed-bump@example.com").count() == 0
+    finally:
+        db.close()
+    monkeypatch.undo()
+    assert employee_version() == before
+
+def test_rolled_back_writes_do_not_bump(seeded_db):
+    before = employee_version()
+    db = SessionLocal()
+    try:
+        db.add(new_employee("rolled-back@example.com"))
+        db.flush()
+        db.rollback()
+        db.commit()
+    finally:
+        db.close()
+    assert employee_version() == before
+
+def test_etag_changes_with_the_data(client):
+    first = client.get("/api/v1/employees/")
+    etag = first.headers["etag"]
+    assert client.get("/api/v1/employees/", headers={"If-None-Match": etag}).status_code == 304
+
+    created = client.post("/api/v1/employees/", json={
+        "full_name": "Etag Probe", "email": "etag-probe@example.com", "job_title": "IT Manager",
+        "department": "IT", "hire_date": "2024-01-01",
+    })
+    assert created.status_code == 200
+    assert client.get("/api/v1/employees/", headers={"If-None-Match": etag}).status_code == 200
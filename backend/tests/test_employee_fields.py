@@ -0,0 +1,45 @@
+from sqlalchemy import func, select
+
+from app.api import endpoints
+from app.db import models
+
+def test_fields_select_only_those_columns(client):
+    employees = client.get("/api/v1/employees/", params={"fields": "email,department", "limit": 5}).json()
+    assert len(employees) == 5
+    assert all(set(employee) == {"id", "email", "department"} for employee in employees)
+
+def test_all_fields_by_default(client):
+    employee = client.get("/api/v1/employees/", params={"limit": 1}).json()[0]
+    assert set(employee) == set(endpoints.EMPLOYEE_FIELDS)
+
+def test_unknown_fields_are_rejected(client):
+    assert client.get("/api/v1/employees/", params={"fields": "salary"}).status_code == 400
+    assert client.get("/api/v1/employees/1", params={"activity_fields": "salary"}).status_code == 400
+
+def test_missing_employee_is_404(client):
+    assert client.get("/api/v1/employees/999999").status_code == 404
+
+def test_nested_activities_omit_the_description_unless_asked(client):
+    employee = client.get("/api/v1/employees/1").json()
+    assert employee["activities"] and all("activities" not in activity for activity in employee["activities"])
+    detailed = client.get("/api/v1/employees/1", params={"activity_fields": "week_number,activities"}).json()
+    assert all(set(activity) == {"id", "week_number", "activities"} for activity in detailed["activities"])
+
+def test_activities_default_to_the_last_weeks_on_record(client, db):
+    latest = db.execute(select(func.max(models.EmployeeActivity.week_number))
+                        .where(models.EmployeeActivity.employee_id == 1)).scalar()
+    weeks = client.get("/api/v1/employees/1", params={"weeks": 2}).json()["activities"]
+    assert {activity["week_number"] for activity in weeks} == {latest - 1, latest}
+
+    window = client.get("/api/v1/employees/1", params={"from_week": 2, "to_week": 3}).json()["activities"]
+    assert {activity["week_number"] for activity in window} == {2, 3}
+    assert [activity["week_number"] for activity in window] == sorted(activity["week_number"] for activity in window)
+
+def test_weeks_must_be_positive(client):
+    assert client.get("/api/v1/employees/1", params={"weeks": 0}).status_code == 400
+
+def test_sparse_bodies_match_between_fast_and_model_paths(client, monkeypatch):
+    params = {"fields": "job_title", "activity_fields": "hours_worked", "weeks": 3}
+    fast = client.get("/api/v1/employees/2", params=params).json()
+    monkeypatch.setattr(endpoints, "FAST_JSON_ENABLED", False)
+    assert client.get("/api/v1/employees/2", params=params).json() == fast
@@ -0,0 +1,52 @@
+import pytest
+
+from app.api import endpoints
+from app.llm.entity_index import entity_index
+
+@pytest.fixture
+def loaded(db):
+    entity_index.load(db)
+
+@pytest.mark.parametrize("question, resolved", [
+    ("How many hours did Wei Zang work in week 1?", "How many hours did Wei Zhang work in week 1?"),
+    ("What is the total sales of the fin dept?", "What is the total sales of the Finance department?"),
+    ("List the sales mgr emails", "List the Sales Manager emails"),
+])
+def test_mentions_are_rewritten_to_stored_values(loaded, question, resolved):
+    assert entity_index.resolve(question)[0] == resolved
+
+@pytest.mark.parametrize("question", [
+    "Which employees work in roles that likely require data analysis or reporting skills?",
+    "How many employees does the company have in total?",
+])
+def test_everyday_words_are_left_alone(loaded, question):
+    assert entity_index.resolve(question) == (question, [])
+
+def test_resolved_title_reaches_the_model(client, monkeypatch):
+    # The templates decline job title filters, so the canonical title is for the generated SQL
+    asked = []
+
+    def translate(question, db):
+        asked.append(question)
+        return original(question, db)
+
+    original = endpoints.translate_and_execute
+    monkeypatch.setattr(endpoints, "translate_and_execute", translate)
+    body = client.post("/api/v1/query", json={"query": "What is the average hours worked by Data Analysts?"}).json()
+    assert asked == ["What is the average hours worked by Data Analyst?"]
+    assert body["resolved_entities"][0]["value"] == "Data Analyst"
+
+def test_employees_include_full_name(client):
+    employees = client.get("/api/v1/employees/", params={"fields": "full_name", "limit": 3}).json()
+    assert all(set(employee) == {"id", "full_name"} and employee["full_name"] for employee in employees)
+    assert client.get("/api/v1/employees/1").json()["full_name"]
+
+def test_created_employee_is_resolved_immediately(client, loaded):
+    created = client.post("/api/v1/employees/", json={
+        "full_name": "Xiaoming Qiao", "email": "xiaoming.qiao@example.com", "job_title": "Sales Manager",
+        "department": "Sales", "hire_date": "2024-01-15T00:00:00",
+    })
+    assert created.status_code == 200 and created.json()["full_name"] == "Xiaoming Qiao"
+    assert entity_index.resolve("How many meetings did Xiaoming Qiao attend?")[1] == []
+    assert entity_index.resolve("How many meetings did Xiaoming Qiau attend?")[0] == \
+        "How many meetings did Xiaoming Qiao attend?"
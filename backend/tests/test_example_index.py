@@ -0,0 +1,70 @@
+import pytest
+
+from app.db.reference_queries import REFERENCE_QUERIES
+from app.llm.example_index import ExampleIndex, content_words, literals
+
+SALES_SQL = dict(REFERENCE_QUERIES)["How much total sales revenue has the Sales department generated to date?"]
+HOURS_SQL = dict(REFERENCE_QUERIES)["Who are the top 3 employees by total hours worked during the last 4 weeks?"]
+
+@pytest.fixture
+def index():
+    index = ExampleIndex(capacity=100, dimensions=1024)
+    for question, sql in REFERENCE_QUERIES:
+        index.add(question, sql, "sqlite", seeded=True)
+    return index
+
+@pytest.mark.parametrize("question, sql", [
+    ("how much total sales revenue has the sales department generated to date?", SALES_SQL),
+    ("How much total sales revenue has the Sales department generated to date", SALES_SQL),
+    ("Who were the top 3 employees by total hours worked in the last 4 weeks?", HOURS_SQL),
+])
+def test_paraphrases_reuse_the_sql(index, question, sql):
+    assert index.near_duplicate(question, "sqlite", threshold=0.8) == sql
+
+@pytest.mark.parametrize("question", [
+    # Another department, metric or filter needs other SQL, however similar the wording
+    "How much total sales revenue has the Marketing department generated to date?",
+    "How much total sales revenue has the marketing department generated to date?",
+    "Who are the top 3 employees by total sales worked during the last 4 weeks?",
+    "Who are the top 5 employees by total hours worked during the last 4 weeks?",
+    "Who are the top 3 employees by total hours worked during the last 4 weeks in Finance?",
+    "List all employees who work in the engineering team within the company.",
+    "How much total sales revenue has the Sales department generated to date? Not counting week 1",
+])
+def test_different_questions_do_not_reuse_the_sql(index, question):
+    assert index.near_duplicate(question, "sqlite", threshold=0.5) is None
+
+def test_literals_are_case_insensitive():
+    vocabulary = frozenset({"sales", "wei", "zhang"})
+    assert literals("Sales department", vocabulary) == literals("sales department", vocabulary)
+    assert literals("Hours of Wei Zhang", vocabulary) == {"hours", "wei", "zhang"}
+    assert literals("Hours of Wei Zhang", vocabulary) != literals("Hours of Na Li", frozenset({"na", "li"}))
+    assert content_words("Show the hours of Wei Zhang's team") == {"hours", "wei", "zhang", "team"}
+
+def test_seeded_examples_are_never_replaced(index):
+    question = REFERENCE_QUERIES[0][0]
+    index.add(question, "SELECT 1", "sqlite")
+    assert index.search(question, "sqlite", 1, exclude_self=False)[0][2] == REFERENCE_QUERIES[0][1]
+
+def test_full_index_evicts_only_unseeded_examples():
+    index = ExampleIndex(capacity=3, dimensions=64)
+    index.add("seeded question", "SELECT 1", "sqlite", seeded=True)
+    index.add("verified one", "SELECT 2", "sqlite")
+    index.add("verified two", "SELECT 3", "sqlite")
+    index.add("verified three", "SELECT 4", "sqlite")
+    index.add("verified four", "SELECT 5", "sqlite")
+    stored = {question for _, question, _ in index.search("question", "sqlite", 3, exclude_self=False)}
+    assert stored == {"seeded question", "verified three", "verified four"}
+
+    seeded_only = ExampleIndex(capacity=1, dimensions=64)
+    seeded_only.add("seeded question", "SELECT 1", "sqlite", seeded=True)
+    seeded_only.add("verified one", "SELECT 2", "sqlite")
+    assert len(seeded_only) == 1 and seeded_only.search("verified one", "sqlite", 1)[0][2] == "SELECT 1"
+
+def test_llm_sql_that_merely_ran_is_not_stored(client, monkeypatch):
+    from app.llm import example_index as module
+
+    before = len(module.example_index)
+    response = client.post("/api/v1/query", json={"query": "Which employees have the longest job titles?"})
+    assert response.status_code == 200
+    assert len(module.example_index) == before
@@ -0,0 +1,55 @@
+import csv
+import gzip
+import io
+import time
+
+from app.api.endpoints import parse_byte_range
+from app.export_jobs import ExportJob, ExportManager
+
+def wait_for(client, job_id, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = client.get(f"/api/v1/export/jobs/{job_id}").json()
+        if status["status"] in ("done", "failed"):
+            return status
+        time.sleep(0.02)
+    raise AssertionError(f"export job {job_id} did not finish")
+
+def test_export_job_produces_a_compressed_artifact_and_is_reused(client, db):
+    response = client.post("/api/v1/export/jobs", json={"table": "employees", "format": "csv"})
+    assert response.status_code == 202
+    status = wait_for(client, response.json()["id"])
+    assert status["status"] == "done"
+
+    download = client.get(status["download_url"])
+    rows = list(csv.reader(io.StringIO(gzip.decompress(download.content).decode("utf-8"))))
+    assert rows[0][:2] == ["ID", "Full Name"]
+    assert len(rows) - 1 == status["total_rows"] == status["rows_written"]
+
+    again = client.post("/api/v1/export/jobs", json={"table": "employees", "format": "csv"}).json()
+    assert again["reused"] and again["id"] == status["id"]
+
+    partial = client.get(status["download_url"], headers={"Range": "bytes=0-9"})
+    assert partial.status_code == 206 and partial.content == download.content[:10]
+
+def test_reusable_ignores_a_done_job_without_finished_at(seeded_db):
+    """A job seen between its final status and finished_at must not break lookups"""
+    manager = ExportManager(workers=1)
+    try:
+        job = ExportJob("employees", "csv", "gzip", "v1")
+        job.status = "done"
+        manager.jobs[job.id] = job
+        assert manager._reusable("employees", "csv", "gzip", "v1") is None
+    finally:
+        manager.executor.shutdown()
+
+def test_invalid_export_requests_are_rejected(client):
+    response = client.post("/api/v1/export/jobs", json={"table": "payroll", "format": "csv"})
+    assert response.status_code == 400
+    assert client.get("/api/v1/export/jobs/doesnotexist").status_code == 404
+
+def test_parse_byte_range():
+    assert parse_byte_range("bytes=0-9", 100) == (0, 9)
+    assert parse_byte_range("bytes=-10", 100) == (90, 99)
+    assert parse_byte_range("bytes=50-", 100) == (50, 99)
+    assert parse_byte_range("bytes=100-", 100) is None
@@ -0,0 +1,20 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from app.api import endpoints
+from app.api.fast_json import as_datetime, dumps
+
+def test_dumps_handles_database_types():
+    assert dumps({"d": date(2024, 8, 26), "n": Decimal("1.5")}) == b'{"d":"2024-08-26","n":1.5}'
+    assert as_datetime(date(2024, 8, 26)) == datetime(2024, 8, 26)
+
+@pytest.mark.parametrize("path", ["/api/v1/employees/", "/api/v1/employees/1", "/api/v1/activities/?limit=50",
+                                  "/api/v1/employees/?fields=email,department"])
+def test_fast_path_matches_the_response_model_path(client, monkeypatch, path):
+    fast = client.get(path)
+    monkeypatch.setattr(endpoints, "FAST_JSON_ENABLED", False)
+    validated = client.get(path)
+    assert fast.status_code == validated.status_code == 200
+    assert fast.json() == validated.json()
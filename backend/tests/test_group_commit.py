@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import text
+
+from app.db.data_versions import read_versions
+from app.db.group_commit import ActivityGroupCommitter
+
+def activity(employee_id, hours):
+    return {"employee_id": employee_id, "week_number": 3, "meetings_attended": 1, "total_sales": 0.0,
+            "hours_worked": hours, "activities": "Group commit test"}
+
+def test_concurrent_inserts_share_batches(db):
+    committer = ActivityGroupCommitter(max_delay_ms=50, max_rows=100)
+    before = read_versions(db, ["employee_activities"])["employee_activities"]
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        rows = list(pool.map(lambda i: committer.submit(activity(1 + i % 5, 30.0 + i)), range(20)))
+
+    assert len({row.id for row in rows}) == 20
+    assert committer.stats["rows"] == 20
+    assert committer.stats["batches"] < 20
+    db.rollback()
+    ids = ", ".join(str(row.id) for row in rows)
+    stored = db.execute(text(f"SELECT id, hours_worked FROM employee_activities WHERE id IN ({ids})")).fetchall()
+    assert dict(stored) == {row.id: row.hours_worked for row in rows}
+    assert read_versions(db, ["employee_activities"])["employee_activities"] > before
+
+def test_a_bad_row_fails_only_its_own_request(db):
+    committer = ActivityGroupCommitter(max_delay_ms=50, max_rows=100)
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(committer.submit, activity(employee_id, 40.0)) for employee_id in (1, 999999, 2)]
+    good = [futures[0].result(), futures[2].result()]
+    assert all(row.id for row in good)
+    with pytest.raises(Exception):
+        futures[1].result()
+    assert committer.stats["failed_rows"] == 1
@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import text
+
+from app.api.endpoints import format_query_results
+from app.db.leaderboards import leaderboards
+
+@pytest.mark.parametrize("question", [
+    # A department without its suffix, a title or a team adjective is a filter the leaderboards can't apply
+    "Which employee in Finance worked the most hours?",
+    "Which Data Analyst worked the most hours?",
+    "Who are the top 5 Sales employees by revenue?",
+    "Which remote employee attended the most meetings?",
+])
+def test_unbound_filters_are_not_matched(db, question):
+    leaderboards.ensure_fresh(db)
+    assert leaderboards.match(question) is None
+
+@pytest.mark.parametrize("question, spec", [
+    ("Who are the top 3 employees by total hours worked during the last 4 weeks?",
+     {"by": "employee", "metric": "hours_worked", "k": 3, "window": 4, "department": None}),
+    ("Which employee attended the most meetings during week 2?",
+     {"by": "activity", "metric": "meetings_attended", "k": 1, "week": 2}),
+    ("Who worked the most hours in the Finance department?",
+     {"by": "employee", "metric": "hours_worked", "department": "Finance"}),
+])
+def test_ranking_questions_are_matched(db, question, spec):
+    leaderboards.ensure_fresh(db)
+    matched = leaderboards.match(question)
+    assert matched is not None and spec.items() <= matched.items()
+
+@pytest.mark.parametrize("question", [
+    "Who are the top 3 employees by total sales revenue?",
+    "Who are the top 3 employees by total hours worked during the last 4 weeks?",
+])
+def test_answer_matches_its_sql_and_survives_formatting(db, question):
+    columns, rows, sql = leaderboards.answer(question, db)
+    expected = db.execute(text(sql)).all()
+    assert [name for name, _ in expected] == [name for name, _ in rows]
+    assert [value for _, value in expected] == pytest.approx([value for _, value in rows])
+    assert f"{columns[1]}: " in format_query_results(columns, rows)
+
+def test_hits_and_misses_are_counted(db):
+    before = leaderboards.stats()
+    leaderboards.answer("Who worked the most hours?", db)
+    leaderboards.answer("Which employee in Finance worked the most hours?", db)
+    after = leaderboards.stats()
+    assert (after["hits"] - before["hits"], after["misses"] - before["misses"]) == (1, 1)
@@ -0,0 +1,87 @@
+import asyncio
+import json
+import time
+
+from app import live_updates
+from app.db import change_log, models
+from app.live_updates import LiveHub, aggregate_cells, live_hub
+
+def add_activity(db, week_number, hours):
+    db.add(models.EmployeeActivity(employee_id=1, week_number=week_number, meetings_attended=1,
+                                   total_sales=0.0, hours_worked=hours, activities="Live probe"))
+    db.commit()
+
+def test_poll_returns_new_cells_instead_of_mutating(db, monkeypatch):
+    monkeypatch.setattr(change_log, "CHANGE_FEED_SETTLE_SECONDS", 0)
+    hub = LiveHub()
+    cursor, cells = hub._load_snapshot()
+    before = dict(cells)
+    add_activity(db, 5, 7.5)
+
+    new_cursor, new_cells, changed, inserts = hub._poll(cursor, cells)
+    assert new_cursor > cursor
+    # The snapshot being served stays untouched; the hub swaps the new dict in on the event loop
+    assert cells == before and new_cells is not cells
+    assert changed and all(key.endswith("|5") for key in changed)
+    assert [row["hours_worked"] for row in inserts] == [7.5]
+    assert new_cells == aggregate_cells(db)
+
+def test_poll_without_changes_keeps_state(db, monkeypatch):
+    monkeypatch.setattr(change_log, "CHANGE_FEED_SETTLE_SECONDS", 0)
+    hub = LiveHub()
+    cursor, cells = hub._load_snapshot()
+    assert hub._poll(cursor, cells) == (cursor, cells, {}, [])
+
+def test_snapshot_cursor_is_settled(db, monkeypatch):
+    monkeypatch.setattr(change_log, "CHANGE_FEED_SETTLE_SECONDS", 3600)
+    add_activity(db, 6, 1.0)
+    cursor, _ = LiveHub()._load_snapshot()
+    assert cursor == change_log.settled_seq(db) < change_log.latest_seq(db)
+
+def receive_snapshot(client):
+    with client.websocket_connect("/api/v1/ws/live?channels=aggregates") as websocket:
+        return json.loads(websocket.receive_bytes())
+
+def wait_for_idle_hub():
+    deadline = time.time() + 5
+    while live_hub._task is not None and time.time() < deadline:
+        time.sleep(0.01)
+    assert live_hub._task is None
+
+def test_restarted_hub_reloads_the_snapshot(client, db, monkeypatch):
+    monkeypatch.setattr(live_updates, "LIVE_POLL_SECONDS", 0.01)
+    first = receive_snapshot(client)
+    assert first["type"] == "snapshot"
+    wait_for_idle_hub()
+
+    # Written while nobody was subscribed, so the idle hub never polled it
+    add_activity(db, 7, 12.25)
+    second = receive_snapshot(client)
+    expected = {f"{department}|{week}": values for (department, week), values in aggregate_cells(db).items()}
+    assert second["aggregates"] == expected != first["aggregates"]
+    wait_for_idle_hub()
+
+class StalledWebSocket:
+    """Accepts the connection but never finishes a send"""
+
+    def __init__(self):
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_bytes(self, payload):
+        await asyncio.Event().wait()
+
+    async def receive_text(self):
+        await asyncio.Event().wait()
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+def test_client_that_never_takes_the_snapshot_is_dropped(db, monkeypatch):
+    monkeypatch.setattr(live_updates, "LIVE_SEND_TIMEOUT_SECONDS", 0.05)
+    hub, websocket = LiveHub(), StalledWebSocket()
+    asyncio.run(asyncio.wait_for(hub.serve(websocket, {"aggregates"}), 5))
+    assert websocket.close_code == 1013
+    assert hub.stats["dropped_slow_clients"] == 1 and not hub.connections
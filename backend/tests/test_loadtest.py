@@ -0,0 +1,56 @@
+import argparse
+import asyncio
+import random
+
+import httpx
+import pytest
+
+from app.loadtest import LoadGenerator, StepStats, build_request, parse_mix, percentile
+
+def test_parse_mix():
+    assert parse_mix("query=6,employees=2,export") == {"query": 6.0, "employees": 2.0, "export": 1.0}
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("query=1,unknown=2")
+
+def test_percentile_is_nearest_rank():
+    samples = list(range(1, 101))
+    assert percentile(samples, 0.5) == 50
+    assert percentile(samples, 0.99) == 99
+    assert percentile([7], 0.95) == 7
+
+def test_build_request_for_every_scenario():
+    rng = random.Random(1)
+    method, path, body = build_request("activity_write", rng)
+    assert (method, path) == ("POST", "/activities/") and body["employee_id"] in range(1, 11)
+    assert build_request("query", rng)[2]["query"]
+    with pytest.raises(ValueError):
+        build_request("nope", rng)
+
+def test_step_report_counts_errors_and_buckets():
+    stats = StepStats("concurrency=1")
+    stats.record("query", 3.0, None)
+    stats.record("query", 40.0, "HTTP 500")
+    stats.record("employees", 9000.0, None)
+    stats.elapsed = 2.0
+    report = stats.report()
+    assert report["requests"] == 3 and report["throughput_rps"] == 1.5
+    assert report["error_rate"] == pytest.approx(1 / 3)
+    assert report["histogram"] == {"<=5ms": 1, "<=50ms": 1, ">5000ms": 1}
+    assert report["scenarios"]["query"]["count"] == 2
+
+def test_closed_and_open_loops_against_a_mock_transport():
+    def handler(request):
+        return httpx.Response(500 if request.url.path.endswith("/employees/") else 200, json={})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://test") as client:
+            generator = LoadGenerator(client, {"query": 1, "employees": 1}, seed=7)
+            closed = (await generator.closed_loop(concurrency=2, duration=0.05)).report()
+            opened = (await generator.open_loop(rate=200, duration=0.05, max_in_flight=10)).report()
+            return closed, opened
+
+    closed, opened = asyncio.run(run())
+    for report in (closed, opened):
+        assert report["requests"] > 0
+        assert set(report["errors"]) <= {"HTTP 500"}
+        assert 0 < report["error_rate"] < 1
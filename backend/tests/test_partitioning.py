@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.db import models
+from app.db.partitioning import (
+    CALENDAR_START_DATE, add_week_start_column, ensure_calendar_weeks, ensure_partitions, interval_start,
+    next_interval, partition_name, prepare_schema, week_number_for, week_start_for,
+)
+
+def test_week_numbers_and_starts_round_trip():
+    assert week_start_for(1) == CALENDAR_START_DATE
+    for week in (1, 2, 10, 53):
+        assert week_number_for(week_start_for(week)) == week
+        assert week_number_for(week_start_for(week) + timedelta(days=6)) == week
+
+@pytest.mark.parametrize("day, interval, start, following, name", [
+    (date(2024, 8, 28), "quarter", date(2024, 7, 1), date(2024, 10, 1), "employee_activities_2024q3"),
+    (date(2024, 11, 4), "quarter", date(2024, 10, 1), date(2025, 1, 1), "employee_activities_2024q4"),
+    (date(2024, 11, 4), "year", date(2024, 1, 1), date(2025, 1, 1), "employee_activities_2024"),
+])
+def test_partition_intervals(day, interval, start, following, name):
+    assert interval_start(day, interval) == start
+    assert next_interval(start, interval) == following
+    assert partition_name(start, interval) == name
+
+def test_inserts_derive_week_start(db):
+    activity = models.EmployeeActivity(employee_id=1, week_number=3, meetings_attended=0, total_sales=0.0,
+                                       hours_worked=1.0, activities="Partition probe")
+    db.add(activity)
+    db.commit()
+    assert activity.week_start == week_start_for(3)
+    assert db.execute(text("SELECT COUNT(*) FROM employee_activities WHERE week_start IS NULL")).scalar() == 0
+
+def test_upgrade_adds_and_backfills_week_start(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE employees (id INTEGER PRIMARY KEY)"))
+        connection.execute(text(
+            "CREATE TABLE employee_activities (id INTEGER PRIMARY KEY, employee_id INTEGER, week_number INTEGER, "
+            "meetings_attended INTEGER, total_sales FLOAT, hours_worked FLOAT, activities VARCHAR)"
+        ))
+        connection.execute(text("INSERT INTO employee_activities (id, employee_id, week_number) VALUES (1, 1, 2)"))
+    prepare_schema(engine)
+    with engine.begin() as connection:
+        assert not add_week_start_column(connection)  # already upgraded
+        start = connection.execute(text("SELECT week_start FROM employee_activities WHERE id = 1")).scalar()
+        assert date.fromisoformat(str(start)) == week_start_for(2)
+        assert ensure_partitions(connection) == []  # only Postgres is partitioned
+
+def test_calendar_is_extended_to_the_latest_week(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/calendar.db")
+    prepare_schema(engine)
+    with engine.begin() as connection:
+        last = week_number_for(date(2030, 1, 1))
+        assert ensure_calendar_weeks(connection, through=date(2030, 1, 1)) > 0
+        assert connection.execute(text("SELECT MAX(week_number) FROM calendar_weeks")).scalar() == last
+        assert ensure_calendar_weeks(connection, through=date(2030, 1, 1)) == 0
+
+def test_reseeding_keeps_the_extended_calendar(db):
+    # seed_database clears calendar_weeks; the seeded calendar must still reach past the 10 activity weeks
+    weeks = db.execute(text("SELECT MIN(week_number), MAX(week_number), COUNT(*) FROM calendar_weeks")).one()
+    assert weeks[0] == 1 and weeks[1] >= week_number_for(date.today()) and weeks[2] == weeks[1]
+
+def test_summary_export_filters_on_week_start(client):
+    everything = client.get("/api/v1/export/summary/json").json()
+    first_week = client.get("/api/v1/export/summary/json", params={
+        "since": week_start_for(1).isoformat(), "until": week_start_for(2).isoformat(),
+    }).json()
+    assert 0 < first_week["summary"]["total_activity_records"] < everything["summary"]["total_activity_records"]
+    assert first_week["summary"]["period_start"] == week_start_for(1).isoformat()
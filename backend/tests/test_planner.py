@@ -0,0 +1,82 @@
+import pytest
+
+from app.api import endpoints
+from app.llm.planner import decompose
+
+@pytest.mark.parametrize("question, parts", [
+    ("Compare the hours worked by 'Wei Zhang' and 'Tao Huang' during week 1.", [
+        "What were the hours worked by 'Wei Zhang' during week 1?",
+        "What were the hours worked by 'Tao Huang' during week 1?",
+    ]),
+    ("Compare the sales of the Sales and Marketing departments", [
+        "What were the sales of the Sales department?",
+        "What were the sales of the Marketing department?",
+    ]),
+    ("What is the total number of hours worked and average sales revenue for employees in the IT department?", [
+        "What is the total number of hours worked for employees in the IT department?",
+        "What is the average sales revenue for employees in the IT department?",
+    ]),
+    ("Who worked the most hours in week 1 and who attended the most meetings?", [
+        "Who worked the most hours in week 1?",
+        "Who attended the most meetings?",
+    ]),
+])
+def test_compound_questions_are_split(question, parts):
+    assert decompose(question) == parts
+
+@pytest.mark.parametrize("question", [
+    # Both relative clauses describe the same employees: splitting would drop the intersection
+    "Show employees who worked more than 40 hours in week 1 and who attended more than 10 meetings",
+    "List all employees in week 1 and who attended more than 10 meetings",
+    # Lowercase words are not entities to compare
+    "Compare the sales of employees in week 1 and week 2",
+    # The second part refers back to the first
+    "Who are the employees that faced challenges with customer retention, and what solutions did they propose?",
+    "How many employees does the company have in total?",
+    # A part of punctuation only is no question
+    "! and what is the total hours worked in week 1?",
+])
+def test_other_questions_are_not_split(question):
+    assert decompose(question) is None
+
+def test_planner_failure_answers_the_whole_question(monkeypatch):
+    def broken(question):
+        raise IndexError("string index out of range")
+
+    monkeypatch.setattr(endpoints, "QUERY_DECOMPOSITION_ENABLED", True)
+    monkeypatch.setattr(endpoints, "decompose", broken)
+    assert endpoints.plan_question("Who worked the most hours in week 1 and who attended the most meetings?") is None
+
+def outcome(question, error=None):
+    return {"question": question, "columns": ["n"], "rows": [(1,)], "sql": "SELECT 1 AS n", "error": error,
+            "tier": "fast", "seconds": 0.01}
+
+def test_decomposed_answer_merges_the_parts(monkeypatch):
+    monkeypatch.setattr(endpoints, "answer_sub_question", outcome)
+    merged = endpoints.answer_decomposed("A and B", ["Part one?", "Part two?"])
+    assert merged.model_tier == "decomposed" and [part.query for part in merged.sub_queries] == ["Part one?",
+                                                                                                  "Part two?"]
+
+@pytest.mark.parametrize("failure", ["error", "raise"])
+def test_failed_part_falls_back_to_the_whole_question(monkeypatch, failure):
+    def answer(question):
+        if question == "Part two?":
+            if failure == "raise":
+                raise RuntimeError("model unavailable")
+            return outcome(question, error="no such column")
+        return outcome(question)
+
+    monkeypatch.setattr(endpoints, "answer_sub_question", answer)
+    assert endpoints.answer_decomposed("A and B", ["Part one?", "Part two?"]) is None
+
+def test_query_answers_as_a_whole_when_a_part_raises(client, monkeypatch):
+    def broken(question):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(endpoints, "QUERY_DECOMPOSITION_ENABLED", True)
+    monkeypatch.setattr(endpoints, "answer_sub_question", broken)
+    response = client.post("/api/v1/query", json={
+        "query": "Who worked the most hours in week 1 and who attended the most meetings?",
+    })
+    assert response.status_code == 200
+    assert response.json()["model_tier"] != "decomposed"
@@ -0,0 +1,61 @@
+import sqlite3
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.db.pool_metrics import InstrumentedQueuePool, PoolMetrics
+
+def make_pool(tmp_path, **kwargs):
+    return InstrumentedQueuePool(lambda: sqlite3.connect(tmp_path / "pool.db", check_same_thread=False), **kwargs)
+
+def instrumented(pool):
+    metrics = PoolMetrics()
+    pool.metrics = metrics
+    metrics.attach(pool)
+    return metrics
+
+def test_uninstrumented_pool_checks_out_normally(tmp_path):
+    pool = make_pool(tmp_path, pool_size=1, max_overflow=0)
+    connection = pool.connect()
+    connection.close()
+    assert pool.checkedin() == 1
+
+def test_snapshot_reports_the_configured_capacity(tmp_path):
+    pool = make_pool(tmp_path, pool_size=2, max_overflow=3)
+    metrics = instrumented(pool)
+    connection = pool.connect()
+    snapshot = metrics.snapshot(pool)
+    connection.close()
+    assert (snapshot["size"], snapshot["max_overflow"], snapshot["capacity"]) == (2, 3, 5)
+    assert snapshot["checked_out"] == 1 and snapshot["saturation"] == 0.2
+    assert metrics.snapshot(pool)["checked_out"] == 0
+    assert metrics.snapshot(pool)["hold"]["max_ms"] > 0
+
+def test_unbounded_overflow_has_no_capacity(tmp_path):
+    pool = make_pool(tmp_path, pool_size=1, max_overflow=-1)
+    snapshot = instrumented(pool).snapshot(pool)
+    assert snapshot["max_overflow"] == -1 and snapshot["capacity"] == 1
+
+def test_checkout_timeouts_are_counted(tmp_path):
+    pool = make_pool(tmp_path, pool_size=1, max_overflow=0, timeout=0.05)
+    metrics = instrumented(pool)
+    held = pool.connect()
+    with pytest.raises(PoolTimeoutError):
+        pool.connect()
+    held.close()
+    snapshot = metrics.snapshot(pool)
+    assert snapshot["timeouts"] == 1 and snapshot["checkouts"] == 1
+    assert snapshot["checkout_wait"]["max_ms"] >= 50
+
+def test_recreated_pool_keeps_metrics_and_configuration(tmp_path):
+    pool = make_pool(tmp_path, pool_size=2, max_overflow=4)
+    metrics = instrumented(pool)
+    recreated = pool.recreate()
+    assert recreated.metrics is metrics and recreated.max_overflow == 4
+    recreated.connect().close()
+    assert metrics.snapshot(recreated)["checkouts"] == 1
+
+def test_pool_endpoint(client):
+    body = client.get("/api/v1/db/pool").json()
+    assert body["pool_class"] == "InstrumentedQueuePool"
+    assert body["capacity"] == body["size"] + body["max_overflow"]
@@ -0,0 +1,32 @@
+import pytest
+
+from app.llm import router
+from app.llm.router import classify_complexity, route_query
+
+@pytest.mark.parametrize("question", [
+    "Which employees work in the Finance department?",
+    "How many meetings did Na Li attend?",
+    "What is the average hours worked by all employees during week 2?",
+])
+def test_simple_questions_use_the_fast_model(question):
+    assert classify_complexity(question) == "simple"
+    assert route_query(question) == "fast"
+
+@pytest.mark.parametrize("question", [
+    # Ranking and comparison
+    "Who worked the most hours in weeks 36 and 37?",
+    "Compare the hours worked by Wei Zhang and Tao Huang in week 1",
+    # Several aggregates over different metrics
+    "What is the total number of hours worked and average sales revenue for employees in the Business Development department?",
+    # Dates need calendar_weeks
+    "What is the total sales revenue generated by Wei Zhang in week 2024-08-28?",
+    # Free-text interpretation
+    "What challenges did the sales team face?",
+])
+def test_complex_questions_use_the_strong_model(question):
+    assert classify_complexity(question) == "complex"
+    assert route_query(question) == "strong"
+
+def test_routing_disabled_always_uses_the_strong_model(monkeypatch):
+    monkeypatch.setattr(router, "LLM_ROUTING_ENABLED", False)
+    assert route_query("How many meetings did Na Li attend?") == "strong"
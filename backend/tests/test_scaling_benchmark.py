@@ -0,0 +1,48 @@
+import argparse
+
+import pytest
+
+from app.db.database import make_engine
+from app.db.reference_queries import REFERENCE_QUERIES
+from app.db.scaling_benchmark import (
+    activity_count, growth_exponents, parse_size, print_report, seed_scaled, time_queries,
+)
+
+@pytest.mark.parametrize("value, rows", [("1k", 1_000), ("100K", 100_000), ("1m", 1_000_000), ("2.5k", 2_500),
+                                         ("750", 750)])
+def test_parse_size(value, rows):
+    assert parse_size(value) == rows
+
+def test_parse_size_rejects_garbage():
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_size("lots")
+
+@pytest.mark.parametrize("url", ["sqlite:///{path}/scale.db", "duckdb:///{path}/scale.duckdb"])
+def test_seeded_sizes_and_query_report(tmp_path, url):
+    engine = make_engine(url.format(path=tmp_path))
+    try:
+        seed_scaled(engine, 600, weeks=10)
+        assert activity_count(engine) == 600
+        results = time_queries(engine, repeat=3, warmup=0, max_seconds=1.0)
+    finally:
+        engine.dispose()
+    assert [result["question"] for result in results] == [question for question, _ in REFERENCE_QUERIES]
+    for result in results:
+        assert result["samples"] == 3
+        assert result["min_ms"] <= result["median_ms"] <= result["max_ms"]
+        assert result["plan"] and not result["plan"].startswith("unavailable")
+
+def report(rows, median_ms, plan="SCAN employee_activities"):
+    return {"rows": rows, "queries": [{"query": "Q1", "median_ms": median_ms, "p95_ms": median_ms, "plan": plan}]}
+
+def test_growth_exponent_is_the_log_log_slope():
+    linear = [report(1_000, 1.0), report(100_000, 100.0)]
+    quadratic = [report(1_000, 1.0), report(10_000, 100.0)]
+    assert growth_exponents(linear, 0) == [pytest.approx(1.0)]
+    assert growth_exponents(quadratic, 0) == [pytest.approx(2.0)]
+
+def test_report_flags_superlinear_growth_and_plan_changes(capsys):
+    print_report([report(1_000, 1.0), report(10_000, 100.0, plan="SEARCH employee_activities")], superlinear=1.2)
+    output = capsys.readouterr().out
+    assert "SUPERLINEAR" in output and "PLAN CHANGED" in output
+    assert " *Q1" in output
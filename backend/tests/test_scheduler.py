@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+
+from app.llm.scheduler import (
+    CircuitOpenError, LLMScheduler, LLMUnavailableError, PRIORITY_BATCH, PRIORITY_INTERACTIVE, TokenBucket,
+)
+
+class ProviderError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+def make_scheduler(**overrides):
+    options = dict(requests_per_minute=6000, tokens_per_minute=1e9, max_retries=2,
+                   breaker_threshold=3, breaker_cooldown_seconds=60, sleep=lambda seconds: None)
+    options.update(overrides)
+    return LLMScheduler(**options)
+
+def test_retries_transient_errors_then_succeeds():
+    scheduler, calls = make_scheduler(), []
+
+    def flaky(timeout):
+        calls.append(timeout)
+        if len(calls) < 3:
+            raise ProviderError(503)
+        return "ok"
+
+    assert scheduler.call(flaky) == "ok"
+    assert len(calls) == 3
+    assert scheduler.snapshot()["retries"] == 2
+
+def test_client_errors_are_not_retried():
+    scheduler, calls = make_scheduler(), []
+
+    def bad_request(timeout):
+        calls.append(timeout)
+        raise ProviderError(400)
+
+    with pytest.raises(ProviderError):
+        scheduler.call(bad_request)
+    assert len(calls) == 1
+    assert scheduler.breaker.state == "closed"
+
+def test_breaker_opens_after_consecutive_failures():
+    scheduler = make_scheduler(max_retries=0)
+
+    def down(timeout):
+        raise ProviderError(500)
+
+    for _ in range(3):
+        with pytest.raises(LLMUnavailableError):
+            scheduler.call(down)
+    assert scheduler.breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        scheduler.call(lambda timeout: "never called")
+    assert scheduler.snapshot()["rejected_open"] == 1
+
+def test_half_open_breaker_lets_one_probe_through():
+    scheduler = make_scheduler(max_retries=0, breaker_cooldown_seconds=0)
+
+    def down(timeout):
+        raise ProviderError(500)
+
+    for _ in range(3):
+        with pytest.raises(LLMUnavailableError):
+            scheduler.call(down)
+    assert scheduler.breaker.state == "half_open"
+    assert scheduler.call(lambda timeout: "recovered") == "recovered"
+    assert scheduler.breaker.state == "closed"
+
+def test_token_bucket_reports_wait_when_empty():
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)
+    assert bucket.try_acquire(2) == 0.0
+    assert bucket.try_acquire(1) == pytest.approx(1.0, abs=0.05)
+    bucket.adjust(-1)
+    assert bucket.try_acquire(1) == 0.0
+
+def test_interactive_calls_run_before_batch_calls():
+    scheduler = make_scheduler(max_concurrency=1)
+    order = []
+    scheduler._active = 1  # hold the only slot while both calls queue up
+
+    threads = [threading.Thread(target=scheduler.call, args=(lambda timeout, tag=tag: order.append(tag),),
+                                kwargs={"priority": priority})
+               for tag, priority in (("batch", PRIORITY_BATCH), ("interactive", PRIORITY_INTERACTIVE))]
+    threads[0].start()
+    while scheduler.snapshot()["queued"] < 1:
+        time.sleep(0.001)
+    threads[1].start()
+    while scheduler.snapshot()["queued"] < 2:
+        time.sleep(0.001)
+    scheduler._release()
+    for thread in threads:
+        thread.join(5)
+    assert order == ["interactive", "batch"]
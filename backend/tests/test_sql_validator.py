@@ -0,0 +1,34 @@
+import pytest
+
+from app.db.reference_queries import REFERENCE_QUERIES
+from app.db.sql_validator import SQLValidationError, validate_sql
+
+@pytest.mark.parametrize("question, sql", REFERENCE_QUERIES)
+def test_reference_sql_is_accepted(question, sql):
+    validate_sql(sql)
+
+def test_ctes_and_aliases_are_accepted():
+    validate_sql(
+        "WITH t AS (SELECT employee_id, SUM(hours_worked) AS h FROM employee_activities GROUP BY employee_id) "
+        "SELECT e.full_name, t.h FROM t JOIN employees e ON e.id = t.employee_id ORDER BY t.h DESC;"
+    )
+
+@pytest.mark.parametrize("sql, code, identifier", [
+    ("", "empty", None),
+    ("DELETE FROM employees", "not_select", None),
+    ("SELECT 1; DROP TABLE employees", "multiple_statements", None),
+    ("SELECT * INTO backup FROM employees", "write_operation", "into"),
+    ("SELECT (1", "syntax", None),
+    ("SELECT * FROM payroll", "unknown_table", "payroll"),
+    # Internal accounting tables are not part of the queryable schema
+    ("SELECT * FROM llm_usage", "unknown_table", "llm_usage"),
+    ("SELECT sql, error FROM benchmark_queries", "unknown_table", "benchmark_queries"),
+    ("SELECT salary FROM employees", "unknown_column", "salary"),
+    ("SELECT e.salary FROM employees e", "unknown_column", "e.salary"),
+    ("SELECT x.full_name FROM employees e", "unknown_table", "x"),
+])
+def test_invalid_sql_is_rejected(sql, code, identifier):
+    with pytest.raises(SQLValidationError) as error:
+        validate_sql(sql)
+    assert error.value.code == code
+    assert error.value.identifier == identifier
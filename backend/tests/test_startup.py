@@ -0,0 +1,25 @@
+import asyncio
+
+from app import startup
+from app.startup import Readiness, _timed
+
+def test_ready_after_warm_start(client):
+    response = client.get("/ready")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert {"schema", "pool_prewarm", "columnar_cache", "llm_client", "schema_prompt"} <= set(body["phases"])
+    assert body["errors"] == {}
+
+def test_failed_warm_up_step_is_recorded_not_raised(monkeypatch):
+    monkeypatch.setattr(startup, "readiness", Readiness())
+
+    def broken():
+        raise RuntimeError("cache unavailable")
+
+    assert asyncio.run(_timed("broken_cache", broken)) is None
+    assert startup.readiness.errors == {"broken_cache": "cache unavailable"}
+    assert "broken_cache" in startup.readiness.phases
+
+def test_not_ready_before_warm_start():
+    assert Readiness().status()["status"] == "starting"
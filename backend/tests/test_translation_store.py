@@ -0,0 +1,47 @@
+import pytest
+
+from app.llm import query_processor, translation_store
+from app.llm.translation_store import TranslationStore, fingerprint
+
+@pytest.fixture
+def unopenable_store(monkeypatch, tmp_path):
+    """Point the store at a path that cannot be created"""
+    monkeypatch.setattr(translation_store, "TRANSLATION_STORE_PATH", str(tmp_path / "missing" / "store.db"))
+    monkeypatch.setattr(translation_store, "_store", None)
+    monkeypatch.setattr(translation_store, "_store_failed_at", None)
+
+def test_store_round_trip(tmp_path):
+    store = TranslationStore(str(tmp_path / "store.db"))
+    key = fingerprint("sqlite", "how many employees are there?")
+    store.put(key, "prompt-1", "schema-1", "sqlite", "How many employees are there?", "<sql>SELECT 1</sql>", "m")
+    assert store.get(key, "prompt-1", "schema-1") == "<sql>SELECT 1</sql>"
+    assert store.get(key, "prompt-2", "schema-1") is None
+    assert store.purge_stale("prompt-2", "schema-1") == 1
+    assert store.count() == 0
+
+def test_unopenable_store_degrades_to_memory_only(unopenable_store, monkeypatch):
+    attempts = []
+    original = translation_store.TranslationStore
+
+    def counting(path):
+        attempts.append(path)
+        return original(path)
+
+    monkeypatch.setattr(translation_store, "TranslationStore", counting)
+    assert translation_store.get_store() is None
+    assert translation_store.get_store() is None
+    assert len(attempts) == 1  # the failure is remembered, not retried on every call
+
+    question = "Which employees have an unopenable store?"
+    query_processor.cache_translation(question, "<sql>SELECT 1</sql>", "sqlite")
+    assert query_processor.get_cached_translation(question, "sqlite") == "<sql>SELECT 1</sql>"
+    query_processor.evict_translation(question, "sqlite")
+    assert query_processor.get_cached_translation(question, "sqlite") is None
+    assert query_processor.load_translation_store("sqlite") == 0
+
+def test_store_is_retried_after_the_retry_interval(unopenable_store, monkeypatch, tmp_path):
+    assert translation_store.get_store() is None
+    monkeypatch.setattr(translation_store, "TRANSLATION_STORE_PATH", str(tmp_path / "store.db"))
+    assert translation_store.get_store() is None
+    monkeypatch.setattr(translation_store, "TRANSLATION_STORE_RETRY_SECONDS", 0)
+    assert translation_store.get_store() is not None
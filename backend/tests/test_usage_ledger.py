@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.db.database import SessionLocal
+from app.llm import usage_ledger
+from app.llm.usage_ledger import BudgetExceededError, UsageLedger, token_cost
+
+class DownSession:
+    """Session whose database is unreachable"""
+
+    def execute(self, *args, **kwargs):
+        raise OperationalError("SELECT 1", {}, Exception("connection refused"))
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+class CountingFactory:
+    def __init__(self, factory):
+        self.factory = factory
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.factory()
+
+def test_failed_sync_is_not_retried_per_request():
+    factory = CountingFactory(DownSession)
+    ledger = UsageLedger(session_factory=factory, daily_token_budget=1000)
+    assert [ledger.budget_mode() for _ in range(5)] == ["normal"] * 5
+    assert factory.calls == 1
+
+def test_failed_sync_is_retried_after_the_refresh_interval(monkeypatch):
+    factory = CountingFactory(DownSession)
+    ledger = UsageLedger(session_factory=factory, daily_token_budget=1000)
+    ledger.budget_mode()
+    monkeypatch.setattr(usage_ledger, "LLM_BUDGET_REFRESH_SECONDS", 0)
+    ledger.budget_mode()
+    assert factory.calls == 2
+
+def test_budget_modes_follow_todays_spend(seeded_db, monkeypatch):
+    monkeypatch.setattr(usage_ledger, "LLM_LEDGER_ENABLED", False)
+    factory = CountingFactory(SessionLocal)
+    ledger = UsageLedger(session_factory=factory, daily_token_budget=1000)
+    ledger.budget_mode()
+    assert factory.calls == 1
+    baseline = ledger.tokens_today()  # earlier tests may have recorded usage today
+
+    ledger.record("/query", "fast", model="gpt-4o-mini", prompt_tokens=800 - baseline, completion_tokens=0)
+    assert ledger.budget_mode() == "fast_only"
+    ledger.record("/query", "fast", model="gpt-4o-mini", prompt_tokens=200, completion_tokens=0)
+    assert ledger.budget_mode() == "cache_only"
+    assert factory.calls == 1  # synced once; later checks use the in-memory counters
+
+    with pytest.raises(BudgetExceededError):
+        ledger.reject("budget spent")
+    assert ledger.snapshot()["budget_rejections"] == 1
+
+def test_no_budget_never_touches_the_database():
+    factory = CountingFactory(DownSession)
+    assert UsageLedger(session_factory=factory, daily_token_budget=0).budget_mode() == "normal"
+    assert factory.calls == 0
+
+def test_token_cost():
+    assert token_cost("gpt-4o", 1_000_000, 1_000_000) == pytest.approx(12.5)
+    assert token_cost(None, 100, 100) == 0.0